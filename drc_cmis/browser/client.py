@@ -2,9 +2,10 @@ import datetime
 import logging
 import uuid
 from io import BytesIO
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from uuid import UUID
 
+from django.conf import settings
 from django.utils.crypto import constant_time_compare
 
 from drc_cmis.browser.drc_document import (
@@ -18,9 +19,15 @@ from drc_cmis.browser.drc_document import (
 )
 from drc_cmis.browser.request import Request
 from drc_cmis.browser.utils import create_json_request_body
-from drc_cmis.client import CMISClient
+from drc_cmis.bulk import BulkItemResult, chunked
+from drc_cmis.cache import get_cache
+from drc_cmis.client import CMISClient, QueryPage
+from drc_cmis.metadata_cache import invalidate_document_properties
+from drc_cmis.query_cache import invalidate_queries
 from drc_cmis.utils.exceptions import (
     CmisInvalidArgumentException,
+    CmisNotSupportedException,
+    CmisObjectNotFoundException,
     CmisUpdateConflictException,
     DocumentDoesNotExistError,
     DocumentExistsError,
@@ -31,12 +38,13 @@ from drc_cmis.utils.exceptions import (
     LockDidNotMatchException,
 )
 from drc_cmis.utils.mapper import mapper
-from drc_cmis.utils.query import CMISQuery
-from drc_cmis.utils.utils import (
-    build_query_filters,
-    extract_latest_version,
-    get_random_string,
+from drc_cmis.utils.query import (
+    Comparison,
+    Query,
+    build_filter_predicates,
+    build_property_filter,
 )
+from drc_cmis.utils.utils import extract_latest_version, get_random_string
 
 logger = logging.getLogger(__name__)
 
@@ -92,6 +100,11 @@ class CMISDRCClient(CMISClient):
 
     @property
     def repository_info(self) -> dict:
+        if not self._repository_info:
+            cache = get_cache("repository_info")
+            if cache is not None:
+                self._repository_info = cache.get(self.base_url)
+
         if not self._repository_info:
             logger.debug(
                 "CMIS_ADAPTER: get_repository_info: GET request url: %s", self.base_url
@@ -101,6 +114,8 @@ class CMISDRCClient(CMISClient):
 
             logger.debug("CMIS_ADAPTER: get_repository_info: response: %s", response)
             self._repository_info = response["-default-"]
+            if cache is not None:
+                cache.set(self.base_url, self._repository_info)
 
         return self._repository_info
 
@@ -109,16 +124,16 @@ class CMISDRCClient(CMISClient):
         """Returns the objectId of the root folder"""
         return self.repository_info["rootFolderId"]
 
-    def get_first_result(self, json, return_type):
+    def get_first_result(self, json, return_type, partial: bool = False):
         if len(json.get("results")) == 0:
             raise GetFirstException()
 
-        return return_type(json.get("results")[0])
+        return return_type(json.get("results")[0], partial=partial)
 
-    def get_all_results(self, json, return_type):
+    def get_all_results(self, json, return_type, partial: bool = False):
         results = []
         for item in json.get("results"):
-            results.append(return_type(item))
+            results.append(return_type(item, partial=partial))
         return results
 
     def get_all_objects(self, json, return_type):
@@ -129,20 +144,52 @@ class CMISDRCClient(CMISClient):
 
     # generic querying
     def query(
-        self, return_type_name: str, lhs: List[str] = None, rhs: List[str] = None
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        properties: List[str] = None,
+        columnar: bool = False,
     ):
         return_type = self.get_return_type(return_type_name)
-        table = return_type.table
-        where = (" WHERE " + " AND ".join(lhs)) if lhs else ""
-        query = CMISQuery("SELECT * FROM %s%s" % (table, where))
-        statement = query(*rhs) if rhs else query()
+        statement = self._build_query_statement(
+            return_type_name, lhs, rhs, properties=properties
+        )
+        if columnar:
+            return self._query_columnar(statement)
+
+        partial = bool(properties)
+        cached_results = self._get_cached_query_results(
+            return_type, statement, partial=partial
+        )
+        if cached_results is not None:
+            return cached_results
 
+        results = self._query_page(return_type, statement, partial=partial).results
+        self._cache_query_results(return_type, statement, results)
+        return results
+
+    def _query_data_page(
+        self,
+        statement: str,
+        max_items: Optional[int] = None,
+        skip_count: Optional[int] = None,
+    ) -> QueryPage:
         body = {"cmisaction": "query", "statement": statement}
+        if max_items is not None:
+            body["maxItems"] = max_items
+        if skip_count is not None:
+            body["skipCount"] = skip_count
+
         logger.debug("CMIS_ADAPTER: query: request data: %s", body)
         response = self.post_request(self.base_url, body)
         logger.debug("CMIS_ADAPTER: query: response: %s", response)
 
-        return self.get_all_results(response, return_type)
+        return QueryPage(
+            results=response.get("results", []),
+            has_more_items=bool(response.get("hasMoreItems")),
+            num_items=response.get("numItems"),
+        )
 
     def create_folder(self, name: str, parent_id: str, properties: dict = None):
         data = {
@@ -165,21 +212,33 @@ class CMISDRCClient(CMISClient):
 
         json_response = self.post_request(self.root_folder_url, data=data)
         logger.debug("CMIS_ADAPTER: create_folder: response data: %s", json_response)
+        invalidate_queries("folder", "zaaktype", "zaak")
 
         return Folder(json_response)
 
-    def get_folder(self, object_id: str) -> Folder:
-        """Retrieve folder with objectId given"""
+    def get_folder(self, object_id: str, properties: List[str] = None) -> Folder:
+        """Retrieve folder with objectId given
 
-        query = CMISQuery("SELECT * FROM cmis:folder WHERE cmis:objectId = '%s'")
+        :param object_id: string, the objectId of the folder
+        :param properties: list of strings, the properties to retrieve (default all)
+        :return: Folder, partial if only some properties are retrieved
+        """
+
+        query = Query(
+            "cmis:folder",
+            where=[Comparison("cmis:objectId", object_id)],
+            properties=properties,
+        )
 
-        body = {"cmisaction": "query", "statement": query(object_id)}
+        body = {"cmisaction": "query", "statement": query.get_statement()}
         logger.debug("CMIS_ADAPTER: get_folder: request data: %s", body)
         json_response = self.post_request(self.base_url, body)
         logger.debug("CMIS_ADAPTER: get_folder: response data: %s", json_response)
 
         try:
-            return self.get_first_result(json_response, Folder)
+            return self.get_first_result(
+                json_response, Folder, partial=bool(properties)
+            )
         except GetFirstException:
             error_string = (
                 f"Folder met objectId '{object_id}' bestaat niet in het CMIS connection"
@@ -222,17 +281,72 @@ class CMISDRCClient(CMISClient):
         logger.debug(
             "CMIS_ADAPTER: copy_gebruiksrechten: response data: %s", json_response
         )
+        invalidate_queries("gebruiksrechten")
 
         return Gebruiksrechten(json_response)
 
     def copy_document(self, document: Document, destination_folder: Folder) -> Document:
         """Copy document to a folder
 
+        The document is copied by the DMS (with createDocumentFromSource), so the
+        content doesn't need to be downloaded and uploaded again. If the DMS doesn't
+        support this, the content is copied through the adapter.
+
         :param document: Document, the document to copy
         :param destination_folder: Folder, the folder in which to place the copied document
         :return: the copied document
         """
+        copied_document = None
+        if self.supports_operation("createDocumentFromSource"):
+            try:
+                copied_document = self._copy_document_from_source(
+                    document, destination_folder
+                )
+            except CmisNotSupportedException:
+                logger.info(
+                    "CMIS_ADAPTER: createDocumentFromSource is not supported, "
+                    "copying the content of documents instead."
+                )
+                self.mark_operation_unsupported("createDocumentFromSource")
+
+        if copied_document is None:
+            copied_document = self._copy_document_with_content(
+                document, destination_folder
+            )
+        self._register_document(copied_document)
+        invalidate_queries("document")
+        return copied_document
+
+    def _copy_document_from_source(
+        self, document: Document, destination_folder: Folder
+    ) -> Document:
+        # The DMS copies all the properties, except the ones given here
+        properties = {
+            mapper("titel", type="document"): f"{document.titel} - copy",
+            "drc:kopie_van": document.uuid,  # Keep tack of where this is copied from.
+            "drc:document__uuid": str(uuid.uuid4()),
+            # Update the cmis:name to make it more unique
+            "cmis:name": f"{document.titel}-{get_random_string()}",
+        }
+
+        data = {
+            "objectId": destination_folder.objectId,
+            "cmisaction": "createDocumentFromSource",
+            "sourceId": document.objectId,
+        }
+        for prop_count, (prop_key, prop_value) in enumerate(properties.items()):
+            data[f"propertyId[{prop_count}]"] = prop_key
+            data[f"propertyValue[{prop_count}]"] = prop_value
+        logger.debug("CMIS_ADAPTER: copy_document: request data: %s", data)
 
+        json_response = self.post_request(self.root_folder_url, data=data)
+        logger.debug("CMIS_ADAPTER: copy_document: response data: %s", json_response)
+
+        return Document(json_response)
+
+    def _copy_document_with_content(
+        self, document: Document, destination_folder: Folder
+    ) -> Document:
         # copy the properties from the source document
         properties = {
             property_name: property_details["value"]
@@ -322,19 +436,126 @@ class CMISDRCClient(CMISClient):
         logger.debug(
             "CMIS_ADAPTER: create_content_object: response data: %s", json_response
         )
+        invalidate_queries(object_type)
 
         if object_type == "gebruiksrechten":
             return Gebruiksrechten(json_response)
         elif object_type == "oio":
             return ObjectInformatieObject(json_response)
 
+    def bulk_update_properties(
+        self,
+        objects: List[Union[Document, Gebruiksrechten]],
+        properties: dict,
+        concurrency: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> List[BulkItemResult]:
+        """Update the same properties of several objects with bulkUpdate requests
+
+        The objects are updated with the CMIS 1.1 ``bulkUpdate`` action, with at most
+        ``chunk_size`` objects per request. The response only contains the objects
+        that were updated, so the other objects are updated one by one to report
+        their errors. If the DMS doesn't support ``bulkUpdate``, all objects are
+        updated one by one (concurrently). If the DMS rejects the properties, the
+        ``CmisInvalidArgumentException`` is raised.
+
+        The given objects are not refreshed, they should be retrieved again to get
+        the updated properties.
+
+        :param objects: list of documents/gebruiksrechten/oios
+        :param properties: dict, the new values by CMIS property name
+        :param concurrency: int, the maximum number of objects that are updated at
+            the same time if they are updated one by one. Defaults to the setting
+            ``CMIS_BULK_CONCURRENCY`` (or 4).
+        :param chunk_size: int, the maximum number of objects per bulkUpdate request.
+            Defaults to the setting ``CMIS_BULK_UPDATE_CHUNK_SIZE`` (or 100).
+        :return: list of BulkItemResult, with the objectId of every object and its
+            objectId after the update (which changes if a new version is created)
+        """
+        if chunk_size is None:
+            chunk_size = getattr(settings, "CMIS_BULK_UPDATE_CHUNK_SIZE", 100)
+
+        objects = list(objects)
+        results = {}
+        for chunk in chunked(objects, chunk_size):
+            if not self.supports_operation("bulkUpdate"):
+                break
+
+            try:
+                new_object_ids = self._bulk_update(chunk, properties)
+            except CmisNotSupportedException:
+                logger.info(
+                    "CMIS_ADAPTER: bulkUpdate is not supported, "
+                    "updating the objects one by one instead."
+                )
+                self.mark_operation_unsupported("bulkUpdate")
+                break
+            except CmisInvalidArgumentException:
+                # The objects would fail the same way one by one, but the previous
+                # chunks may have been updated
+                self._forget_updated_objects(objects)
+                raise
+
+            for cmis_object in chunk:
+                new_object_id = new_object_ids.get(cmis_object.objectId)
+                if new_object_id is not None:
+                    results[cmis_object.objectId] = BulkItemResult(
+                        cmis_object.objectId, result=new_object_id
+                    )
+                else:
+                    logger.warning(
+                        "CMIS_ADAPTER: bulkUpdate did not update object %s, "
+                        "retrying it on its own.",
+                        cmis_object.objectId,
+                    )
+
+        remaining = [
+            cmis_object
+            for cmis_object in objects
+            if cmis_object.objectId not in results
+        ]
+        for result in self._update_properties_concurrently(
+            remaining, properties, concurrency
+        ):
+            results[result.item] = result
+
+        self._forget_updated_objects(objects)
+        return [results[cmis_object.objectId] for cmis_object in objects]
+
+    def _bulk_update(
+        self, objects: List[CMISContentObject], properties: dict
+    ) -> Dict[str, str]:
+        """Update the properties of the objects with one bulkUpdate request
+
+        :return: dict, the new objectIds of the objects that were updated, by their
+            original objectId
+        """
+        data = {"cmisaction": "bulkUpdate"}
+        for index, cmis_object in enumerate(objects):
+            data[f"objectId[{index}]"] = cmis_object.objectId
+        data.update(CMISContentObject.get_property_update_data(properties))
+        logger.debug("CMIS_ADAPTER: bulk_update: request data: %s", data)
+
+        json_response = self.post_request(self.base_url, data=data)
+        logger.debug("CMIS_ADAPTER: bulk_update: response data: %s", json_response)
+        for type_name in {cmis_object.type_name for cmis_object in objects}:
+            invalidate_queries(type_name)
+
+        return {
+            item["id"]: item.get("newId") or item["id"] for item in json_response or []
+        }
+
     def get_content_object(
-        self, drc_uuid: Union[str, UUID], object_type: str
+        self,
+        drc_uuid: Union[str, UUID],
+        object_type: str,
+        properties: List[str] = None,
     ) -> CMISContentObject:
         """Get the gebruiksrechten/oio with specified uuid
 
         :param drc_uuid: string or UUID, the value of drc:oio__uuid or drc:gebruiksrechten__uuid
         :param object_type: string, either "gebruiksrechten" or "oio"
+        :param properties: list of strings, the properties to retrieve (default all)
         :return: Either a Gebruiksrechten or ObjectInformatieObject
         """
 
@@ -343,12 +564,13 @@ class CMISDRCClient(CMISClient):
             "oio",
         ], "'object_type' can be only 'gebruiksrechten' or 'oio'"
 
-        query = CMISQuery("SELECT * FROM drc:%s WHERE drc:%s__uuid = '%s'")
+        query = Query(
+            f"drc:{object_type}",
+            where=[Comparison(f"drc:{object_type}__uuid", str(drc_uuid))],
+            properties=properties,
+        )
 
-        data = {
-            "cmisaction": "query",
-            "statement": query(object_type, object_type, str(drc_uuid)),
-        }
+        data = {"cmisaction": "query", "statement": query.get_statement()}
         logger.debug("CMIS_ADAPTER: get_content_object: request data: %s", data)
 
         json_response = self.post_request(self.base_url, data)
@@ -358,7 +580,9 @@ class CMISDRCClient(CMISClient):
 
         try:
             return self.get_first_result(
-                json_response, self.get_return_type(object_type)
+                json_response,
+                self.get_return_type(object_type),
+                partial=bool(properties),
             )
         except GetFirstException:
             object_title = object_type.capitalize()
@@ -372,6 +596,9 @@ class CMISDRCClient(CMISClient):
         data: dict,
         content: BytesIO = None,
         check_if_already_exists: bool = True,
+        zaak_data: Optional[dict] = None,
+        zaaktype_data: Optional[dict] = None,
+        other_data: Optional[dict] = None,
     ) -> Document:
         """Create a cmis document.
 
@@ -379,11 +606,33 @@ class CMISDRCClient(CMISClient):
         :param bronorganisatie: string, The identifier of the organisation.
         :param data: dict, A dict with all the data that needs to be saved on the document.
         :param content: BytesIO, The content of the document.
+        :param zaak_data: dict, the details of the zaak the document will be related to. If given
+            (together with ``zaaktype_data``), the document is created directly in the zaak folder.
+        :param zaaktype_data: dict, the details of the zaaktype of that zaak.
+        :param other_data: dict, the details of the verzoek the document will be related to.
         :return: document
         """
         if identification and bronorganisatie:
             self.check_document_exists(identification, bronorganisatie)
 
+        properties = self._build_new_document_properties(
+            identification, bronorganisatie, data
+        )
+
+        destination_folder = self._get_or_create_document_folder(
+            zaak_data=zaak_data, zaaktype_data=zaaktype_data, other_data=other_data
+        )
+
+        cmis_doc = self._create_document_in_folder(
+            properties, content, data.get("bestandsnaam"), destination_folder
+        )
+        self._register_document(cmis_doc)
+        invalidate_queries("document")
+        return cmis_doc
+
+    def _build_new_document_properties(
+        self, identification: str, bronorganisatie: str, data: dict
+    ) -> dict:
         data.setdefault("versie", 1)
         data.setdefault(
             "object_type_id",
@@ -392,22 +641,26 @@ class CMISDRCClient(CMISClient):
         data["bronorganisatie"] = bronorganisatie
         data["identificatie"] = identification
 
+        return Document.build_properties(data, new=True)
+
+    def _create_document_in_folder(
+        self,
+        properties: dict,
+        content: Optional[BytesIO],
+        filename: Optional[str],
+        destination_folder: Folder,
+    ) -> Document:
         if content is None:
             content = BytesIO()
 
-        # Create Document in default folder
-        other_folder = self.get_or_create_other_folder()
-
-        properties = Document.build_properties(data, new=True)
-
-        json_data = create_json_request_body(other_folder, properties)
+        json_data = create_json_request_body(destination_folder, properties)
         logger.debug("CMIS_ADAPTER: create_document: request data: %s", json_data)
 
         json_response = self.post_request(self.root_folder_url, data=json_data)
         logger.debug("CMIS_ADAPTER: create_document: response data: %s", json_response)
         cmis_doc = Document(json_response)
         content.seek(0)
-        return cmis_doc.set_content_stream(content, filename=data.get("bestandsnaam"))
+        return cmis_doc.set_content_stream(content, filename=filename)
 
     def lock_document(self, drc_uuid: str, lock: str):
         """
@@ -419,10 +672,16 @@ class CMISDRCClient(CMISClient):
             "Document was already checked out", code="double_lock"
         )
 
+        # If the document is checked out, the query returns the PWC
+        if cmis_doc.lock:
+            raise already_locked
+
         try:
             pwc = cmis_doc.checkout()
         except CmisInvalidArgumentException:
             raise already_locked
+        invalidate_document_properties(drc_uuid)
+        invalidate_queries("document")
 
         if pwc.lock:
             raise already_locked
@@ -438,7 +697,11 @@ class CMISDRCClient(CMISClient):
     ) -> Document:
         """Unlock a document with objectId workspace://SpacesStore/<uuid>"""
         cmis_doc = self.get_document(drc_uuid)
-        pwc = cmis_doc.get_private_working_copy()
+        # If the document is checked out, the query already returns the PWC
+        if cmis_doc.versionLabel == "pwc":
+            pwc = cmis_doc
+        else:
+            pwc = cmis_doc.get_private_working_copy()
 
         # If bestandsomvang is explicitly defined, but does not match the actual size
         # of the content, that means that the upload has not been completed yet ->
@@ -453,9 +716,12 @@ class CMISDRCClient(CMISClient):
             )
 
         if constant_time_compare(pwc.lock, lock) or force:
-            pwc.update_properties({mapper("lock"): ""})
-            new_doc = pwc.checkin("Updated via Documenten API")
-            return new_doc
+            document = pwc.checkin(
+                "Updated via Documenten API", properties={mapper("lock"): ""}
+            )
+            invalidate_document_properties(drc_uuid)
+            invalidate_queries("document")
+            return document
 
         raise LockDidNotMatchException("Lock did not match", code="unlock-failed")
 
@@ -479,23 +745,63 @@ class CMISDRCClient(CMISClient):
         if uuid is None:
             raise does_not_exist
 
-        # this always selects the latest version, and if there is a pwc, also the pwc is returned
-        query = CMISQuery(
-            "SELECT * FROM drc:document WHERE drc:document__uuid = '%s' %s"
-        )
+        if not filters:
+            document = self._get_known_document(drc_uuid)
+            if document is not None:
+                return document
 
-        filter_string = build_query_filters(
-            filters, filter_string="AND ", strip_end=True
+        # this always selects the latest version, and if there is a pwc, also the pwc is returned
+        query = Query(
+            "drc:document",
+            where=[
+                Comparison("drc:document__uuid", str(drc_uuid)),
+                *build_filter_predicates(filters),
+            ],
         )
-        data = {
-            "cmisaction": "query",
-            "statement": query(drc_uuid, filter_string),
-        }
+        data = {"cmisaction": "query", "statement": query.get_statement()}
         logger.debug("CMIS_ADAPTER: get_document: request data: %s", data)
         json_response = self.post_request(self.base_url, data)
         logger.debug("CMIS_ADAPTER: get_document: response data: %s", json_response)
 
-        return extract_latest_version(self.document_type, json_response.get("results"))
+        document = extract_latest_version(
+            self.document_type, json_response.get("results")
+        )
+        self._remember_document(document, drc_uuid)
+        return document
+
+    def get_object_of_latest_version(
+        self, version_series_id: str, properties: List[str] = None
+    ) -> Document:
+        """Retrieve the latest version of a document by the ID of its version series
+
+        The private working copy is not considered a version, so if the document is
+        checked out, the latest checked in version is returned.
+
+        :param version_series_id: string, the cmis:versionSeriesId of the document
+        :param properties: list of strings, the properties to retrieve (default all)
+        :return: Document, the latest version
+        """
+        params = {
+            "cmisselector": "object",
+            "objectId": version_series_id,
+            "returnVersion": "latest",
+        }
+        if properties:
+            params["filter"] = build_property_filter(properties)
+        logger.debug(
+            "CMIS_ADAPTER: get_object_of_latest_version: request params: %s", params
+        )
+        try:
+            json_response = self.get_request(self.root_folder_url, params=params)
+        except CmisObjectNotFoundException as exc:
+            raise DocumentDoesNotExistError(
+                f"Document met cmis:versionSeriesId {version_series_id} bestaat niet in het CMIS connection"
+            ) from exc
+        logger.debug(
+            "CMIS_ADAPTER: get_object_of_latest_version: response data: %s",
+            json_response,
+        )
+        return Document(json_response)
 
     def check_document_exists(
         self, identification: Union[str, UUID], bronorganisatie: str
@@ -505,20 +811,12 @@ class CMISDRCClient(CMISClient):
         cmis_identificatie = mapper("identificatie", type="document")
         cmis_bronorganisatie = mapper("bronorganisatie", type="document")
 
-        query = CMISQuery(
-            f"SELECT * FROM drc:document WHERE {cmis_identificatie} = '%s' AND {cmis_bronorganisatie} = '%s'"
-        )
-
-        data = {
-            "cmisaction": "query",
-            "statement": query(str(identification), bronorganisatie),
-        }
-        logger.debug("CMIS_ADAPTER: check_document_exists: request data: %s", data)
-        json_response = self.post_request(self.base_url, data)
-        logger.debug(
-            "CMIS_ADAPTER: check_document_exists: response data: %s", json_response
+        document_exists = self.exists(
+            "document",
+            lhs=[f"{cmis_identificatie} = '%s'", f"{cmis_bronorganisatie} = '%s'"],
+            rhs=[str(identification), bronorganisatie],
         )
-        if json_response["numItems"] > 0:
+        if document_exists:
             raise DocumentExistsError(
                 "Een document met dezelfde identificatie en bronorganisatie al bestaat."
             )
@@ -4,14 +4,22 @@ import mimetypes
 import uuid
 from datetime import date
 from io import BytesIO
-from typing import List, Optional, Union
+from typing import BinaryIO, List, Optional, Union
 
 from django.utils import timezone
 
 import pytz
 from furl import furl
 
-from drc_cmis.mixins import RearrangeFilesOnDeleteMixin
+from drc_cmis.content_cache import get_content_cache
+from drc_cmis.identity_map import add_to_identity_map, get_from_identity_map
+from drc_cmis.mixins import RELATED_DOCUMENT_PROPERTIES, RearrangeFilesOnDeleteMixin
+from drc_cmis.query_cache import invalidate_queries
+from drc_cmis.utils.exceptions import (
+    CmisInvalidArgumentException,
+    CmisNotSupportedException,
+)
+from drc_cmis.utils.folder import forget_folder
 from drc_cmis.utils.mapper import (
     DOCUMENT_MAP,
     GEBRUIKSRECHTEN_MAP,
@@ -20,8 +28,12 @@ from drc_cmis.utils.mapper import (
     ZAAKTYPE_MAP,
     mapper,
 )
-from drc_cmis.utils.query import CMISQuery
-from drc_cmis.utils.utils import extract_latest_version, get_random_string
+from drc_cmis.utils.query import Comparison, InFolder, Or, Query
+from drc_cmis.utils.utils import (
+    extract_latest_version,
+    get_random_string,
+    property_values_equal,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +43,13 @@ class CMISBaseObject:
     type_name = None
     type_class = None
 
-    def __init__(self, data):
+    # Partial objects only hold the properties that were selected. The other
+    # properties are retrieved from the DMS the first time one of them is read.
+    _partial = False
+
+    def __init__(self, data, partial: bool = False):
         self.data = data
+        self._partial = partial
 
         from drc_cmis.browser.client import CMISDRCClient
 
@@ -41,7 +58,10 @@ class CMISBaseObject:
         # Convert any timestamps to datetime objects
         properties = data.get("properties", {})
         for prop_name, prop_details in properties.items():
-            if prop_details["type"] == "datetime" and prop_details["value"] is not None:
+            if (
+                prop_details.get("type") == "datetime"
+                and prop_details["value"] is not None
+            ):
                 prop_details["value"] = timezone.make_aware(
                     datetime.datetime.fromtimestamp(int(prop_details["value"]) / 1000),
                     pytz.timezone(self.client.time_zone),
@@ -49,7 +69,48 @@ class CMISBaseObject:
 
         self.properties = properties
 
+    def get_changed_properties(self, properties: dict) -> dict:
+        """Select the properties that differ from the current properties
+
+        :param properties: dict, the new properties, in the format returned by
+            ``build_properties``
+        :return: dict, the new properties whose value differs from the current value
+        """
+        return {
+            prop_name: value
+            for prop_name, value in properties.items()
+            if prop_name not in self.properties
+            or not property_values_equal(self.properties[prop_name]["value"], value)
+        }
+
+    def refresh(self) -> None:
+        """Retrieve all the properties of the object from the DMS"""
+        params = {
+            "cmisselector": "object",
+            "objectId": self.properties["cmis:objectId"]["value"],
+        }
+        logger.debug("CMIS_ADAPTER: refresh: request params: %s", params)
+        json_response = self.client.get_request(self.client.root_folder_url, params)
+        logger.debug("CMIS_ADAPTER: refresh: response data: %s", json_response)
+
+        refreshed_object = type(self)(json_response)
+        self.data = refreshed_object.data
+        self.properties = refreshed_object.properties
+        self._partial = False
+
     def __getattr__(self, name: str):
+        if self._partial and not name.startswith("_"):
+            try:
+                return self._get_property(name)
+            except AttributeError:
+                logger.debug(
+                    "CMIS_ADAPTER: Property '%s' not known locally, refreshing object",
+                    name,
+                )
+                self.refresh()
+        return self._get_property(name)
+
+    def _get_property(self, name: str):
         if name in self.properties:
             return self.properties[name]["value"]
 
@@ -83,6 +144,14 @@ class CMISBaseObject:
 
         return props
 
+    @classmethod
+    def build_update_properties(cls, properties: dict) -> dict:
+        """Convert properties by CMIS property name to the format of ``update_properties``
+
+        The browser binding takes the raw values, so the properties are only copied.
+        """
+        return dict(properties)
+
 
 class CMISContentObject(CMISBaseObject):
     def delete_object(self):
@@ -90,6 +159,7 @@ class CMISContentObject(CMISBaseObject):
         data = {"objectId": self.objectId, "cmisaction": "delete"}
         logger.debug("CMIS_ADAPTER: delete_object: request data: %s", data)
         json_response = self.client.post_request(self.client.root_folder_url, data=data)
+        invalidate_queries(self.type_name)
         logger.debug("CMIS_ADAPTER: delete_object: response data: %s", json_response)
         return json_response
 
@@ -112,8 +182,11 @@ class CMISContentObject(CMISBaseObject):
         )
         return self.client.get_all_objects(json_response, Folder)
 
-    def move_object(self, target_folder: "Folder"):
-        source_folder = self.get_parent_folders()[0]
+    def move_object(
+        self, target_folder: "Folder", source_folder: Optional["Folder"] = None
+    ):
+        if source_folder is None:
+            source_folder = self.get_parent_folders()[0]
 
         data = {
             "objectId": self.objectId,
@@ -126,13 +199,16 @@ class CMISContentObject(CMISBaseObject):
 
         # invoke the URL
         json_response = self.client.post_request(self.client.root_folder_url, data=data)
+        invalidate_queries(self.type_name)
         logger.debug("CMIS_ADAPTER: move_object: response data: %s", json_response)
         self.data = json_response
         self.properties = json_response.get("properties")
         return self
 
-    def _update_properties(self, properties: dict) -> "CMISContentObject":
-        data = {"objectId": self.objectId, "cmisaction": "update"}
+    @staticmethod
+    def get_property_update_data(properties: dict) -> dict:
+        """Convert the properties to the request data of an update/bulkUpdate"""
+        data = {}
         prop_count = 0
         for prop_key, prop_value in properties.items():
             # Skip property because update is not allowed
@@ -145,10 +221,16 @@ class CMISContentObject(CMISBaseObject):
             data["propertyId[%s]" % prop_count] = prop_key
             data["propertyValue[%s]" % prop_count] = prop_value
             prop_count += 1
+        return data
+
+    def _update_properties(self, properties: dict) -> "CMISContentObject":
+        data = {"objectId": self.objectId, "cmisaction": "update"}
+        data.update(self.get_property_update_data(properties))
         logger.debug("CMIS_ADAPTER: update_properties: request data: %s", data)
 
         # invoke the URL
         json_response = self.client.post_request(self.client.root_folder_url, data=data)
+        invalidate_queries(self.type_name)
         logger.debug(
             "CMIS_ADAPTER: update_properties: response data: %s", json_response
         )
@@ -160,6 +242,7 @@ class CMISContentObject(CMISBaseObject):
 
 class Document(CMISContentObject):
     table = "drc:document"
+    type_name = "document"
     name_map = DOCUMENT_MAP
 
     @classmethod
@@ -203,6 +286,29 @@ class Document(CMISContentObject):
     def update_content(self, content: BytesIO, filename: Optional[str] = None):
         self.set_content_stream(content, filename)
 
+    def update(
+        self,
+        properties: dict,
+        content: Optional[BytesIO] = None,
+        filename: Optional[str] = None,
+    ) -> "Document":
+        """Update the content and the properties of the document
+
+        The DMS returns the updated object with each write, so the document is not
+        retrieved again afterwards.
+
+        :param properties: dict, the properties to update (only the changed ones)
+        :param content: BytesIO, the new content of the document
+        :param filename: string, the name of the new content file
+        :return: Document, the updated document
+        """
+        document = self
+        if content is not None:
+            document = document.set_content_stream(content, filename)
+        if properties:
+            document = document._update_properties(properties)
+        return document
+
     def update_properties(self, properties: dict):
         return self._update_properties(properties)
 
@@ -216,11 +322,14 @@ class Document(CMISContentObject):
         )
 
         if self.versionSeriesCheckedOutId is None:
-            all_versions = self.get_all_versions()
-            for document in all_versions:
-                if document.versionLabel == "pwc":
-                    return document
+            latest_version = self.get_latest_version()
+            if latest_version.versionLabel == "pwc":
+                return latest_version
         else:
+            pwc = get_from_identity_map("objectId", self.versionSeriesCheckedOutId)
+            if pwc is not None:
+                return pwc
+
             # http://docs.oasis-open.org/cmis/CMIS/v1.1/os/CMIS-v1.1-os.html#x1-5590004
             params = {
                 "cmisselector": "object",  # get the object rather than the content
@@ -234,16 +343,53 @@ class Document(CMISContentObject):
             logger.debug(
                 "CMIS_ADAPTER: get_private_working_copy: response data: %s", data
             )
-            return type(self)(data)
+            pwc = type(self)(data)
+            add_to_identity_map(pwc)
+            return pwc
 
     def get_latest_version(self):
-        """Get the latest version or the PWC"""
-        query = CMISQuery("SELECT * FROM drc:document WHERE drc:document__uuid = '%s'")
+        """Get the latest version or the PWC
 
-        data = {
-            "cmisaction": "query",
-            "statement": query(self.uuid),
-        }
+        The versions are resolved by ID. Only if that is not possible, the index is
+        queried with the uuid of the document.
+        """
+        latest_version = self._get_object_of_latest_version()
+        if latest_version is None:
+            return self._query_latest_version()
+
+        if latest_version.isVersionSeriesCheckedOut:
+            if not latest_version.versionSeriesCheckedOutId:
+                return self._query_latest_version()
+            return latest_version.get_private_working_copy()
+        return latest_version
+
+    def _get_object_of_latest_version(self) -> Optional["Document"]:
+        """Get the latest checked in version with the cmis:versionSeriesId
+
+        :return: the latest version, or None if the version series is not known or the
+            DMS doesn't support getObjectOfLatestVersion.
+        """
+        version_series_id = self.properties.get("cmis:versionSeriesId", {}).get("value")
+        if not version_series_id or not self.client.supports_operation(
+            "getObjectOfLatestVersion"
+        ):
+            return None
+
+        try:
+            return self.client.get_object_of_latest_version(version_series_id)
+        except CmisNotSupportedException:
+            logger.info(
+                "CMIS_ADAPTER: getObjectOfLatestVersion is not supported, "
+                "querying the latest versions instead."
+            )
+            self.client.mark_operation_unsupported("getObjectOfLatestVersion")
+
+    def _query_latest_version(self) -> "Document":
+        query = Query(
+            "drc:document", where=[Comparison("drc:document__uuid", self.uuid)]
+        )
+
+        data = {"cmisaction": "query", "statement": query.get_statement()}
         logger.debug("CMIS_ADAPTER: get_latest_version: request data: %s", data)
         json_response = self.client.post_request(self.client.base_url, data)
         logger.debug(
@@ -252,13 +398,17 @@ class Document(CMISContentObject):
 
         return extract_latest_version(type(self), json_response.get("results"))
 
-    def checkin(self, checkin_comment, major=True):
+    def checkin(self, checkin_comment, major=True, properties=None):
         props = {
             "objectId": self.objectId,
             "cmisaction": "checkIn",
             "checkinComment": checkin_comment,
             "major": major,
         }
+        # Properties to update while checking in
+        for prop_count, (prop_key, prop_value) in enumerate((properties or {}).items()):
+            props["propertyId[%s]" % prop_count] = prop_key
+            props["propertyValue[%s]" % prop_count] = prop_value
         logger.debug("CMIS_ADAPTER: checkin: request data: %s", props)
 
         # invoke the URL
@@ -290,7 +440,14 @@ class Document(CMISContentObject):
         )
         return Document(json_response)
 
-    def get_content_stream(self) -> BytesIO:
+    def get_content_stream(self) -> BinaryIO:
+        content_cache = get_content_cache()
+        key = content_cache.get_key(self) if content_cache else None
+        if key is None:
+            return self._fetch_content_stream()
+        return content_cache.get_or_fetch(key, self._fetch_content_stream)
+
+    def _fetch_content_stream(self) -> BytesIO:
         params = {"objectId": self.objectId, "cmisaction": "content"}
         logger.debug("CMIS_ADAPTER: get_content_stream: request params: %s", params)
         file_content = self.client.get_request(
@@ -328,26 +485,45 @@ class Document(CMISContentObject):
         the document is currently locked (i.e. there is a private working copy), we need
         to cancel that checkout first.
         """
-        latest_version = self.get_latest_version()
+        latest_version = (
+            self._get_object_of_latest_version() or self._query_latest_version()
+        )
         if latest_version.isVersionSeriesCheckedOut:
-            cancel_checkout_data = {
-                "cmisaction": "cancelCheckout",
-                "objectId": latest_version.objectId,
-            }
-            logger.debug(
-                "CMIS_ADAPTER: delete_object: request data: %s", cancel_checkout_data
-            )
+            latest_version.cancel_checkout()
 
-            response = self.client.post_request(
-                self.client.root_folder_url, data=cancel_checkout_data
-            )
+            # The PWC doesn't exist anymore
+            if latest_version.versionLabel == "pwc":
+                latest_version = self.get_latest_version()
+
+        return latest_version.delete_all_versions()
 
-            logger.debug("CMIS_ADAPTER: delete_object: response data: %s", response)
+    def delete_all_versions(self):
+        """Delete all versions of the document, without looking up the latest version
 
-            refreshed_document = self.get_latest_version()
-            return refreshed_document.delete_object()
+        The document must not be checked out, since a private working copy can't be
+        deleted. Use ``delete_object`` if the state of the version series is unknown.
+        """
         return super().delete_object()
 
+    def cancel_checkout(self) -> None:
+        """Cancel the checkout of the version series, deleting the PWC
+
+        This is either called on the PWC or on the latest version of a checked out
+        document.
+        """
+        cancel_checkout_data = {
+            "cmisaction": "cancelCheckout",
+            "objectId": self.versionSeriesCheckedOutId or self.objectId,
+        }
+        logger.debug(
+            "CMIS_ADAPTER: cancel_checkout: request data: %s", cancel_checkout_data
+        )
+
+        response = self.client.post_request(
+            self.client.root_folder_url, data=cancel_checkout_data
+        )
+        logger.debug("CMIS_ADAPTER: cancel_checkout: response data: %s", response)
+
 
 class Gebruiksrechten(CMISContentObject):
     table = "drc:gebruiksrechten"
@@ -376,23 +552,30 @@ class ObjectInformatieObject(RearrangeFilesOnDeleteMixin, CMISContentObject):
         document. This means that we can't just filter the documents on drc:document__uuid, but we also need
         to consider drc:kopie_van.
 
-        Note:
-        If we changed the property drc:kopie_van to be indexed, we could retrieve the document with the query:
-
-        SELECT *
-        FROM drc:document
-        WHERE IN_FOLDER('<zaakfolder.objectId>')
-        AND (
-          drc:document__uuid = '<informatieobject uuid>'"
-          OR drc:kopie_van = '<informatieobject uuid>'
-        )
+        If the property drc:kopie_van is not queryable in the DMS, all the documents
+        in the zaak folder are retrieved instead.
         """
-        related_documents = self.zaakfolder.get_children_documents(
-            convert_to_document_type=False
-        )
         informatieobject_url = furl(self.informatieobject)
         informatieobject_uuid = informatieobject_url.path.segments[-1]
 
+        related_documents = None
+        if self.client.supports_operation("query_kopie_van"):
+            try:
+                related_documents = self._query_related_documents(informatieobject_uuid)
+            except (CmisInvalidArgumentException, CmisNotSupportedException) as exc:
+                logger.info(
+                    "CMIS_ADAPTER: query on drc:kopie_van failed (%s), "
+                    "retrieving all the documents in the zaak folder instead.",
+                    exc,
+                )
+                self.client.operation_failed("query_kopie_van", exc)
+
+        if related_documents is None:
+            related_documents = self.zaakfolder.get_children_documents(
+                convert_to_document_type=False,
+                properties=RELATED_DOCUMENT_PROPERTIES,
+            )
+
         for document in related_documents:
             if (
                 document["properties"]["drc:document__uuid"]["value"]
@@ -400,7 +583,7 @@ class ObjectInformatieObject(RearrangeFilesOnDeleteMixin, CMISContentObject):
                 or document["properties"]["drc:kopie_van"]["value"]
                 == informatieobject_uuid
             ):
-                return Document(document)
+                return Document(document, partial=True)
         else:
             logger.error(
                 "Could not find the document %s in zaakfolder %s before deleting the OIO.",
@@ -408,16 +591,40 @@ class ObjectInformatieObject(RearrangeFilesOnDeleteMixin, CMISContentObject):
                 self.zaakfolder.name,
             )
 
-    def _get_gebruiksrechten(self) -> Optional["Gebruiksrechten"]:
-        related_data_folder = self.get_parent_folders()[0]
-        query = CMISQuery(
-            "SELECT * FROM drc:gebruiksrechten WHERE IN_FOLDER('%s') AND drc:gebruiksrechten__informatieobject = '%s'"
+    def _query_related_documents(self, informatieobject_uuid: str) -> List[dict]:
+        query = Query(
+            "drc:document",
+            where=[
+                InFolder(self.zaakfolder.objectId),
+                Or(
+                    Comparison("drc:document__uuid", informatieobject_uuid),
+                    Comparison("drc:kopie_van", informatieobject_uuid),
+                ),
+            ],
+            properties=RELATED_DOCUMENT_PROPERTIES,
         )
+        data = {"cmisaction": "query", "statement": query.get_statement()}
 
-        data = {
-            "cmisaction": "query",
-            "statement": query(related_data_folder.objectId, self.informatieobject),
-        }
+        logger.debug("Request data: %s", data)
+        json_response = self.client.post_request(self.client.base_url, data=data)
+        logger.debug("Response data: %s", json_response)
+
+        return json_response.get("results", [])
+
+    def _get_gebruiksrechten(
+        self, related_data_folder: "Folder"
+    ) -> Optional["Gebruiksrechten"]:
+        query = Query(
+            "drc:gebruiksrechten",
+            where=[
+                InFolder(related_data_folder.objectId),
+                Comparison(
+                    "drc:gebruiksrechten__informatieobject", self.informatieobject
+                ),
+            ],
+        )
+
+        data = {"cmisaction": "query", "statement": query.get_statement()}
 
         logger.debug("Request data: %s", data)
         json_response = self.client.post_request(self.client.base_url, data=data)
@@ -437,6 +644,7 @@ class ObjectInformatieObject(RearrangeFilesOnDeleteMixin, CMISContentObject):
 
 class Folder(CMISBaseObject):
     table = "cmis:folder"
+    type_name = "folder"
 
     def get_children_folders(self, child_type: Union[str, dict] = None) -> List:
         """Get all the folders in the current folder
@@ -492,14 +700,12 @@ class Folder(CMISBaseObject):
         else:
             object_type_id = "cmis:folder"
 
-        query = CMISQuery(
-            f"SELECT * FROM {object_type_id} WHERE IN_FOLDER('%s') AND cmis:name = '%s'"
+        query = Query(
+            object_type_id,
+            where=[InFolder(self.objectId), Comparison("cmis:name", name)],
         )
 
-        data = {
-            "cmisaction": "query",
-            "statement": query(str(self.objectId), name),
-        }
+        data = {"cmisaction": "query", "statement": query.get_statement()}
         logger.debug("CMIS_ADAPTER: get_child_folder: request data: %s", data)
         json_response = self.client.post_request(self.client.base_url, data=data)
         logger.debug("CMIS_ADAPTER: get_child_folder: response data: %s", json_response)
@@ -508,19 +714,38 @@ class Folder(CMISBaseObject):
 
         return self.client.get_first_result(json_response, Folder)
 
-    def delete_tree(self, **kwargs):
+    def delete_tree(self, **kwargs) -> List[str]:
+        """Delete the folder and all its contents
+
+        :return: list of strings, the objectIds of the objects that could not be
+            deleted
+        """
         data = {"objectId": self.objectId, "cmisaction": "deleteTree"}
         logger.debug("CMIS_ADAPTER: delete_tree: request data: %s", data)
         json_response = self.client.post_request(self.client.root_folder_url, data=data)
+        # The folder can contain objects of any type
+        invalidate_queries()
+        forget_folder(self)
         logger.debug("CMIS_ADAPTER: delete_tree: response data: %s", json_response)
 
-    def get_children_documents(self, convert_to_document_type=True):
-        """Get documents in the current folder"""
-        query = CMISQuery("SELECT * FROM drc:document WHERE IN_FOLDER('%s')")
-        data = {
-            "cmisaction": "query",
-            "statement": query(self.objectId),
-        }
+        # If not everything could be deleted, the response is {"ids": [...]}
+        if isinstance(json_response, dict):
+            return json_response.get("ids") or []
+        return []
+
+    def get_children_documents(
+        self, convert_to_document_type=True, properties: List[str] = None
+    ):
+        """Get documents in the current folder
+
+        :param convert_to_document_type: bool, whether to return documents or the
+            data of the documents
+        :param properties: list of strings, the properties to retrieve (default all)
+        """
+        query = Query(
+            "drc:document", where=[InFolder(self.objectId)], properties=properties
+        )
+        data = {"cmisaction": "query", "statement": query.get_statement()}
 
         logger.debug("CMIS_ADAPTER: get_children_documents: request data: %s", data)
         json_response = self.client.post_request(self.client.base_url, data=data)
@@ -529,7 +754,9 @@ class Folder(CMISBaseObject):
         )
 
         if convert_to_document_type:
-            return self.client.get_all_results(json_response, Document)
+            return self.client.get_all_results(
+                json_response, Document, partial=bool(properties)
+            )
         else:
             return json_response["results"]
 
@@ -12,7 +12,9 @@ from drc_cmis.utils.exceptions import (
     CmisUpdateConflictException,
 )
 
-from ..connections import get_session
+from ..connections import get_session, register_round_trip
+from ..identity_map import clear_identity_map
+from ..single_flight import coalesce, make_key, register_write
 
 logger = logging.getLogger(__name__)
 
@@ -23,14 +25,86 @@ class Request:
         # Uses a thread-local session object to enable connection pooling
         return get_session()
 
+    @staticmethod
+    def _raise_for_status(response, url):
+        try:
+            error = response.json()
+        except ValueError:
+            error = {"message": response.text}
+
+        if response.status_code == 401:
+            raise CmisPermissionDeniedException(
+                status=response.status_code,
+                url=url,
+                message=error.get("message"),
+                code=error.get("exception"),
+            )
+        elif response.status_code == 400:
+            raise CmisInvalidArgumentException(
+                status=response.status_code,
+                url=url,
+                message=error.get("message"),
+                code=error.get("exception"),
+            )
+        elif response.status_code == 404:
+            raise CmisObjectNotFoundException(
+                status=response.status_code,
+                url=url,
+                message=error.get("message"),
+                code=error.get("exception"),
+            )
+        elif response.status_code == 403:
+            raise CmisPermissionDeniedException(
+                status=response.status_code,
+                url=url,
+                message=error.get("message"),
+                code=error.get("exception"),
+            )
+        elif response.status_code == 405:
+            raise CmisNotSupportedException(
+                status=response.status_code,
+                url=url,
+                message=error.get("message"),
+                code=error.get("exception"),
+            )
+        elif response.status_code == 409:
+            raise CmisUpdateConflictException(
+                status=response.status_code,
+                url=url,
+                message=error.get("message"),
+                code=error.get("exception"),
+            )
+        elif response.status_code == 500:
+            raise CmisRuntimeException(
+                status=response.status_code,
+                url=url,
+                message=error.get("message"),
+                code=error.get("exception"),
+            )
+        else:
+            raise CmisBaseException(
+                status=response.status_code,
+                url=url,
+                message=error.get("message"),
+                code=error.get("exception"),
+            )
+
     def get_request(self, url, user, password, params=None):
         logger.debug(f"GET: {url} | {params}")
         headers = {"Accept": "application/json"}
-        response = self.session.get(
-            url, params=params, auth=(user, password), headers=headers
+
+        def send_request():
+            register_round_trip()
+            return self.session.get(
+                url, params=params, auth=(user, password), headers=headers
+            )
+
+        response = coalesce(
+            make_key("GET", url, user, password, sorted((params or {}).items())),
+            send_request,
         )
         if not response.ok:
-            raise Exception("Error with the query")
+            self._raise_for_status(response, url)
 
         if response.headers.get("Content-Type").startswith("application/json"):
             return response.json()
@@ -40,71 +114,31 @@ class Request:
         logger.debug(f"POST: {url} | {data}")
         if headers is None:
             headers = {"Accept": "application/json"}
-        response = self.session.post(
-            url,
-            data=data,
-            auth=(user, password),
-            files=files,
-            headers=headers,
-        )
+
+        def send_request():
+            register_round_trip()
+            return self.session.post(
+                url,
+                data=data,
+                auth=(user, password),
+                files=files,
+                headers=headers,
+            )
+
+        if data.get("cmisaction") == "query" and files is None:
+            response = coalesce(
+                make_key("POST", url, user, password, sorted(data.items())),
+                send_request,
+            )
+        else:
+            # Objects fetched before a write operation can be outdated
+            clear_identity_map()
+            try:
+                response = send_request()
+            finally:
+                register_write()
         if not response.ok:
-            error = response.json()
-            if response.status_code == 401:
-                raise CmisPermissionDeniedException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            elif response.status_code == 400:
-                raise CmisInvalidArgumentException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            elif response.status_code == 404:
-                raise CmisObjectNotFoundException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            elif response.status_code == 403:
-                raise CmisPermissionDeniedException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            elif response.status_code == 405:
-                raise CmisNotSupportedException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            elif response.status_code == 409:
-                raise CmisUpdateConflictException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            elif response.status_code == 500:
-                raise CmisRuntimeException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            else:
-                raise CmisBaseException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
+            self._raise_for_status(response, url)
 
         try:
             if response.headers.get("Content-Type").startswith("application/json"):
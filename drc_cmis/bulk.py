@@ -0,0 +1,96 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+from .connections import use_cmis_connection_pool
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = ["BulkItemResult", "chunked", "run_concurrently"]
+
+
+class BulkItemResult(NamedTuple):
+    """The outcome of one item of a bulk operation"""
+
+    # Identifies the item, e.g. its index or uuid
+    item: Any
+    result: Any = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def chunked(values: List[Any], size: int) -> Iterator[List[Any]]:
+    """Split a list in chunks of at most ``size`` values"""
+    for start in range(0, len(values), size):
+        end = start + size
+        yield values[start:end]
+
+
+def run_concurrently(
+    func: Callable[[Any], Any],
+    items: Iterable[Tuple[Any, Any]],
+    concurrency: Optional[int] = None,
+) -> List[BulkItemResult]:
+    """
+    Call ``func`` for every item, in a bounded number of threads.
+
+    Every thread uses its own connection pool for all the items it handles. An
+    exception raised for one item is stored in its result and doesn't stop the other
+    items.
+
+    :param func: callable, called with the argument of every item
+    :param items: iterable of tuples, with the key and the argument of every item
+    :param concurrency: int, the maximum number of items that are handled at the
+        same time. Defaults to the setting ``CMIS_BULK_CONCURRENCY`` (or 4).
+    :return: list of BulkItemResult, in the order of the items
+    """
+    if concurrency is None:
+        concurrency = getattr(settings, "CMIS_BULK_CONCURRENCY", 4)
+
+    items = list(items)
+    results = [None] * len(items)
+    pending = iter(enumerate(items))
+    lock = threading.Lock()
+
+    def handle_items():
+        with use_cmis_connection_pool():
+            while True:
+                with lock:
+                    next_item = next(pending, None)
+                if next_item is None:
+                    return
+
+                index, (key, argument) = next_item
+                try:
+                    results[index] = BulkItemResult(key, result=func(argument))
+                except Exception as exc:
+                    logger.warning(
+                        "CMIS_ADAPTER: bulk operation failed for %s: %s", key, exc
+                    )
+                    results[index] = BulkItemResult(key, error=exc)
+
+    def handle_items_in_thread():
+        try:
+            handle_items()
+        finally:
+            # The database connections are per thread
+            connections.close_all()
+
+    num_threads = min(concurrency, len(items))
+    if num_threads <= 1:
+        handle_items()
+        return results
+
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        futures = [executor.submit(handle_items_in_thread) for _ in range(num_threads)]
+    for future in futures:
+        future.result()
+    return results
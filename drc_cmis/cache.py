@@ -0,0 +1,412 @@
+import logging
+import os
+import pickle
+import sqlite3
+import stat
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    "get_cache",
+    "BaseCache",
+    "LocMemCache",
+    "DjangoCache",
+    "SharedMemoryCache",
+]
+
+
+DEFAULT_TIMEOUT = object()
+
+_MISSING = object()
+
+# The size of the SHA-256 signatures of the values of the SharedMemoryCache
+_SIGNATURE_SIZE = 32
+
+# The recency of the entries of the SharedMemoryCache is a counter shared by all the
+# processes, instead of the wall-clock time which can tie or go backwards
+_NEXT_ACCESS = "(SELECT COALESCE(MAX(accessed), 0) + 1 FROM drc_cmis_cache)"
+
+
+class BaseCache:
+    """
+    Cache of the adapter, with namespaced keys, a default timeout and hit/miss
+    counters.
+
+    The timeouts are in seconds, ``None`` means that the entries never expire.
+    Subclasses implement the storage in ``_get``, ``_set``, ``_add`` and ``_delete``,
+    which receive the namespaced keys.
+    """
+
+    def __init__(
+        self, name: str, timeout: Optional[float] = 300, max_entries: int = 1000
+    ):
+        self.name = name
+        self.default_timeout = timeout
+        self.max_entries = max_entries
+        self.key_prefix = f"drc_cmis:{name}:"
+
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def make_key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def get_timeout(self, timeout=DEFAULT_TIMEOUT) -> Optional[float]:
+        if timeout is DEFAULT_TIMEOUT:
+            return self.default_timeout
+        return timeout
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._get(self.make_key(key))
+
+        with self._stats_lock:
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return default if value is _MISSING else value
+
+    def set(self, key: str, value: Any, timeout=DEFAULT_TIMEOUT) -> None:
+        self._set(self.make_key(key), value, self.get_timeout(timeout))
+
+    def add(self, key: str, value: Any, timeout=DEFAULT_TIMEOUT) -> bool:
+        """Set the value only if the key is not in the cache yet
+
+        :return: bool, whether the value was stored
+        """
+        return self._add(self.make_key(key), value, self.get_timeout(timeout))
+
+    def set_many(self, data: Dict[str, Any], timeout=DEFAULT_TIMEOUT) -> None:
+        for key, value in data.items():
+            self.set(key, value, timeout=timeout)
+
+    def delete(self, key: str) -> None:
+        self._delete(self.make_key(key))
+
+    def get_stats(self) -> dict:
+        """The hit/miss counters of the cache in the current process"""
+        with self._stats_lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def _get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: Any, timeout: Optional[float]) -> None:
+        raise NotImplementedError
+
+    def _add(self, key: str, value: Any, timeout: Optional[float]) -> bool:
+        raise NotImplementedError
+
+    def _delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+def _get_expiry(timeout: Optional[float]) -> Optional[float]:
+    return None if timeout is None else time.time() + timeout
+
+
+class LocMemCache(BaseCache):
+    """In-process cache, which removes the least recently used entries when full"""
+
+    def __init__(self, name: str, timeout: Optional[float] = 300, max_entries=1000):
+        super().__init__(name, timeout=timeout, max_entries=max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return _MISSING
+
+            expiry, value = self._entries[key]
+            if expiry is not None and expiry <= time.time():
+                del self._entries[key]
+                return _MISSING
+
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any, timeout: Optional[float]) -> None:
+        with self._lock:
+            self._entries[key] = (_get_expiry(timeout), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _add(self, key: str, value: Any, timeout: Optional[float]) -> bool:
+        if self._get(key) is not _MISSING:
+            return False
+        self._set(key, value, timeout)
+        return True
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class DjangoCache(BaseCache):
+    """
+    Cache stored in one of the caches of the Django cache framework.
+
+    The size of the cache is bounded by the configuration of the Django cache.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: Optional[float] = 300,
+        max_entries=1000,
+        alias: str = "default",
+    ):
+        super().__init__(name, timeout=timeout, max_entries=max_entries)
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _get(self, key: str) -> Any:
+        return self.cache.get(key, _MISSING)
+
+    def _set(self, key: str, value: Any, timeout: Optional[float]) -> None:
+        self.cache.set(key, value, timeout=timeout)
+
+    def _add(self, key: str, value: Any, timeout: Optional[float]) -> bool:
+        return self.cache.add(key, value, timeout=timeout)
+
+    def set_many(self, data: Dict[str, Any], timeout=DEFAULT_TIMEOUT) -> None:
+        self.cache.set_many(
+            {self.make_key(key): value for key, value in data.items()},
+            timeout=self.get_timeout(timeout),
+        )
+
+    def _delete(self, key: str) -> None:
+        self.cache.delete(key)
+
+
+class SharedMemoryCache(BaseCache):
+    """
+    Cache shared by all the processes of a host.
+
+    The entries are stored in an SQLite database at ``path``, e.g. in a directory in
+    ``/dev/shm`` so that it is kept in memory. This way the workers of a gunicorn
+    server share the warmed-up state. When the cache is full, the least recently
+    used entries are removed.
+
+    The database file is only readable and writable by its owner and a file owned
+    by another user is refused. The values are signed with the ``SECRET_KEY``, so
+    values that were not written by the adapter are never unpickled.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: Optional[float] = 300,
+        max_entries=1000,
+        path: Optional[str] = None,
+    ):
+        super().__init__(name, timeout=timeout, max_entries=max_entries)
+        if not path:
+            raise ImproperlyConfigured(
+                "The SharedMemoryCache requires the PATH option, the location of "
+                "its database file."
+            )
+        self.path = path
+        self._local = threading.local()
+
+    def _check_database_file(self) -> None:
+        """Create the database file if needed and check that it is private"""
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0)
+        fd = os.open(self.path, flags, 0o600)
+        try:
+            file_stat = os.fstat(fd)
+        finally:
+            os.close(fd)
+
+        if file_stat.st_uid != os.getuid():
+            raise ImproperlyConfigured(
+                f"The cache file {self.path} is owned by another user."
+            )
+        if file_stat.st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+            raise ImproperlyConfigured(
+                f"The cache file {self.path} is accessible by other users."
+            )
+
+    def _dumps(self, value: Any) -> bytes:
+        data = pickle.dumps(value)
+        return self._sign(data) + data
+
+    def _loads(self, value: bytes) -> Any:
+        signature, data = value[:_SIGNATURE_SIZE], value[_SIGNATURE_SIZE:]
+        if not constant_time_compare(signature, self._sign(data)):
+            raise ValueError("Invalid signature")
+        return pickle.loads(data)
+
+    def _sign(self, data: bytes) -> bytes:
+        return salted_hmac(
+            "drc_cmis.cache.SharedMemoryCache", data, algorithm="sha256"
+        ).digest()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self._check_database_file()
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS drc_cmis_cache "
+                "(key TEXT PRIMARY KEY, value BLOB, expiry REAL, accessed INTEGER)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS drc_cmis_cache_accessed "
+                "ON drc_cmis_cache (accessed)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def _get(self, key: str) -> Any:
+        connection = self._get_connection()
+        row = connection.execute(
+            "SELECT value, expiry FROM drc_cmis_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return _MISSING
+
+        value, expiry = row
+        now = time.time()
+        if expiry is not None and expiry <= now:
+            connection.execute("DELETE FROM drc_cmis_cache WHERE key = ?", (key,))
+            return _MISSING
+
+        try:
+            value = self._loads(value)
+        except ValueError:
+            logger.warning("CMIS_ADAPTER: Ignoring cache entry with invalid signature")
+            connection.execute("DELETE FROM drc_cmis_cache WHERE key = ?", (key,))
+            return _MISSING
+
+        connection.execute(
+            f"UPDATE drc_cmis_cache SET accessed = {_NEXT_ACCESS} WHERE key = ?", (key,)
+        )
+        return value
+
+    def _set(self, key: str, value: Any, timeout: Optional[float]) -> None:
+        connection = self._get_connection()
+        connection.execute(
+            f"INSERT OR REPLACE INTO drc_cmis_cache VALUES (?, ?, ?, {_NEXT_ACCESS})",
+            (key, self._dumps(value), _get_expiry(timeout)),
+        )
+        self._cull(connection)
+
+    def _add(self, key: str, value: Any, timeout: Optional[float]) -> bool:
+        connection = self._get_connection()
+        now = time.time()
+        connection.execute(
+            "DELETE FROM drc_cmis_cache WHERE key = ? AND expiry <= ?", (key, now)
+        )
+        cursor = connection.execute(
+            f"INSERT OR IGNORE INTO drc_cmis_cache VALUES (?, ?, ?, {_NEXT_ACCESS})",
+            (key, self._dumps(value), _get_expiry(timeout)),
+        )
+        self._cull(connection)
+        return cursor.rowcount == 1
+
+    def _delete(self, key: str) -> None:
+        self._get_connection().execute(
+            "DELETE FROM drc_cmis_cache WHERE key = ?", (key,)
+        )
+
+    def _cull(self, connection: sqlite3.Connection) -> None:
+        # The size bound applies to the entries of this namespace only
+        connection.execute(
+            "DELETE FROM drc_cmis_cache WHERE key IN ("
+            "SELECT key FROM drc_cmis_cache WHERE key LIKE ? "
+            "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (f"{self.key_prefix}%", self.max_entries),
+        )
+
+
+def _get_default_config(name: str) -> Optional[dict]:
+    """The configuration of the caches that are not in ``CMIS_CACHES``"""
+    if name == "repository_info":
+        return {"BACKEND": "drc_cmis.cache.LocMemCache", "TIMEOUT": None}
+
+    if name == "metadata":
+        if not getattr(settings, "CMIS_METADATA_CACHE_ENABLED", False):
+            return None
+        return {
+            "BACKEND": "drc_cmis.cache.DjangoCache",
+            "TIMEOUT": getattr(settings, "CMIS_METADATA_CACHE_TIMEOUT", 300),
+            "OPTIONS": {
+                "ALIAS": getattr(settings, "CMIS_METADATA_CACHE_ALIAS", "default")
+            },
+        }
+
+    if name == "queries":
+        return {
+            "BACKEND": "drc_cmis.cache.DjangoCache",
+            "TIMEOUT": None,
+            "OPTIONS": {
+                "ALIAS": getattr(settings, "CMIS_QUERY_CACHE_ALIAS", "default")
+            },
+        }
+
+    # The other caches (e.g. "config" and "folders") are only used when configured
+    return None
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str) -> Optional[BaseCache]:
+    """
+    Get the cache with the given name, as configured in ``CMIS_CACHES``.
+
+    :param name: string, the name of the cache, e.g. "repository_info", "config",
+        "folders", "queries" or "metadata"
+    :return: the cache or None if the cache is not enabled
+    """
+    with _caches_lock:
+        if name in _caches:
+            return _caches[name]
+
+        cache_config = getattr(settings, "CMIS_CACHES", {}).get(name)
+        if cache_config is None:
+            cache_config = _get_default_config(name)
+
+        if cache_config is None:
+            cache = None
+        else:
+            backend = import_string(
+                cache_config.get("BACKEND", "drc_cmis.cache.LocMemCache")
+            )
+            options = {
+                option.lower(): value
+                for option, value in cache_config.get("OPTIONS", {}).items()
+            }
+            cache = backend(name, timeout=cache_config.get("TIMEOUT", 300), **options)
+
+        _caches[name] = cache
+        return cache
+
+
+@receiver(setting_changed)
+def reset_caches(setting: str, **kwargs) -> None:
+    if setting.startswith("CMIS_") or setting == "CACHES":
+        with _caches_lock:
+            _caches.clear()
@@ -1,20 +1,62 @@
+import json
+import logging
+import time
+from collections import defaultdict
 from io import BytesIO
-from typing import List, Optional, TypeVar, Union
+from itertools import chain
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 from uuid import UUID
 
+from django.conf import settings
 from django.utils import timezone
 from django.utils.crypto import constant_time_compare
 
 from cmislib.exceptions import UpdateConflictException
 
-from .models import CMISConfig, Vendor
+from .bulk import BulkItemResult, chunked, run_concurrently
+from .cache import get_cache
+from .columnar import ColumnarResult
+from .identity_map import add_to_identity_map, clear_identity_map, get_from_identity_map
+from .metadata_cache import (
+    cache_document_properties,
+    get_cached_document_properties,
+    invalidate_document_properties,
+)
+from .models import CMISConfig, DocumentIndexEntry, Vendor
+from .query_cache import (
+    cache_query_results,
+    get_cached_query_results,
+    invalidate_queries,
+)
 from .utils import folder as folder_utils
 from .utils.exceptions import (
+    CmisBaseException,
+    CmisInvalidArgumentException,
+    CmisNotSupportedException,
     DocumentConflictException,
+    DocumentDoesNotExistError,
+    DocumentExistsError,
     DocumentLockConflictException,
     DocumentNotLockedException,
     FolderDoesNotExistError,
 )
+from .utils.mapper import mapper
+from .utils.query import Comparison, In, InTree, Query, parse_conditions
+from .utils.utils import extract_latest_version
+
+logger = logging.getLogger(__name__)
 
 # The Document/Folder/Oio/Gebruiksrechten classes used in practice depend on the client
 # (different classes exist for the webservice and browser binding)
@@ -24,6 +66,15 @@ Folder = TypeVar("Folder")
 ObjectInformatieObject = TypeVar("ObjectInformatieObject")
 
 
+class QueryPage(NamedTuple):
+    """One page of the results of a query"""
+
+    results: list
+    has_more_items: bool
+    # The total number of results of the query, if the DMS reports it
+    num_items: Optional[int] = None
+
+
 class CMISClient:
     _main_repo_id = None
     _root_folder_id = None
@@ -36,15 +87,627 @@ class CMISClient:
     zaaktypefolder_type = None
     _config = None
 
+    # Optional CMIS operations that turned out not to be supported by the DMS, with
+    # the (monotonic) time until which they are not tried again
+    _unsupported_operations = {}
+
     @property
     def config(self):
         """
         Lazily load the config so that no DB queries are done while Django is starting.
         """
+        if not self._config:
+            config_cache = get_cache("config")
+            if config_cache is not None:
+                self._config = config_cache.get("solo")
+
         if not self._config:
             self._config = CMISConfig.get_solo()
+            if config_cache is not None:
+                config_cache.set("solo", self._config)
         return self._config
 
+    def supports_operation(self, operation: str) -> bool:
+        """Check whether an optional CMIS operation is supported by the DMS
+
+        Operations are assumed to be supported until they are marked as unsupported.
+        """
+        key = (self.base_url, operation)
+        unsupported_until = self._unsupported_operations.get(key)
+        if unsupported_until is None:
+            return True
+        if time.monotonic() >= unsupported_until:
+            CMISClient._unsupported_operations.pop(key, None)
+            return True
+        return False
+
+    def mark_operation_unsupported(self, operation: str) -> None:
+        """Remember that an optional CMIS operation is not supported by the DMS
+
+        The operation is tried again after ``CMIS_UNSUPPORTED_OPERATION_TIMEOUT``
+        seconds (one hour by default).
+        """
+        timeout = getattr(settings, "CMIS_UNSUPPORTED_OPERATION_TIMEOUT", 60 * 60)
+        CMISClient._unsupported_operations[(self.base_url, operation)] = (
+            time.monotonic() + timeout
+        )
+
+    def operation_failed(self, operation: str, error: CmisBaseException) -> None:
+        """Handle the failure of an optional CMIS operation before falling back
+
+        Only a ``notSupported`` error marks the operation as unsupported. Other errors
+        (e.g. an invalid argument) only concern the current request.
+        """
+        if isinstance(error, CmisNotSupportedException):
+            self.mark_operation_unsupported(operation)
+
+    @property
+    def document_index_enabled(self) -> bool:
+        return getattr(settings, "CMIS_DOCUMENT_INDEX_ENABLED", False)
+
+    def _get_document_from_index(self, drc_uuid: str) -> Optional[Document]:
+        """Retrieve a document by the version series stored in the document index
+
+        :param drc_uuid: string, the value of drc:document__uuid
+        :return: the latest version of the document (or the PWC if it is checked
+            out), or None if the document can't be resolved with the index.
+        """
+        if not self.supports_operation("getObjectOfLatestVersion"):
+            return None
+
+        entry = DocumentIndexEntry.objects.filter(uuid=drc_uuid).first()
+        if entry is None:
+            return None
+
+        try:
+            document = self.get_object_of_latest_version(entry.version_series_id)
+        except DocumentDoesNotExistError:
+            entry.delete()
+            return None
+        except CmisNotSupportedException:
+            self.mark_operation_unsupported("getObjectOfLatestVersion")
+            return None
+
+        # The entry is outdated, the document will be looked up with a query
+        if document.uuid != str(drc_uuid):
+            entry.delete()
+            return None
+
+        if document.isVersionSeriesCheckedOut:
+            if not document.versionSeriesCheckedOutId:
+                return None
+            return document.get_private_working_copy()
+        return document
+
+    def _register_document(self, document: Document, heal: bool = False) -> None:
+        """Store the version series of the document in the document index
+
+        :param document: Document, the created/copied/retrieved document
+        :param heal: bool, only write the entry if it is missing or outdated, for
+            documents that were retrieved instead of created
+        """
+        if not self.document_index_enabled:
+            return
+
+        drc_uuid = document.properties.get("drc:document__uuid", {}).get("value")
+        version_series_id = document.properties.get("cmis:versionSeriesId", {}).get(
+            "value"
+        )
+        if not drc_uuid or not version_series_id:
+            return
+
+        if (
+            heal
+            and DocumentIndexEntry.objects.filter(
+                uuid=drc_uuid, version_series_id=version_series_id
+            ).exists()
+        ):
+            return
+
+        DocumentIndexEntry.objects.update_or_create(
+            uuid=drc_uuid, defaults={"version_series_id": version_series_id}
+        )
+
+    def _get_known_document(self, drc_uuid: str) -> Optional[Document]:
+        """Retrieve a document without querying the DMS, if possible
+
+        The document is looked up in the identity map, the metadata cache and the
+        document index (in that order).
+
+        :param drc_uuid: string, the value of drc:document__uuid
+        :return: the latest version of the document (or the PWC if it is checked
+            out), or None if it has to be queried.
+        """
+        document = get_from_identity_map("uuid", drc_uuid)
+        if document is not None:
+            return document
+
+        cached_properties = get_cached_document_properties(drc_uuid)
+        if cached_properties is not None and self._is_cached_version_current(
+            drc_uuid, cached_properties
+        ):
+            document = self.document_type({"properties": cached_properties})
+            add_to_identity_map(document, drc_uuid=drc_uuid)
+            return document
+
+        if self.document_index_enabled:
+            document = self._get_document_from_index(drc_uuid)
+            if document is not None:
+                # The document index doesn't need to be written, since the
+                # document wasn't queried
+                add_to_identity_map(document, drc_uuid=drc_uuid)
+                cache_document_properties(document, drc_uuid)
+        return document
+
+    def _is_cached_version_current(
+        self, drc_uuid: str, cached_properties: dict
+    ) -> bool:
+        """Check whether the cached properties of a document are still current
+
+        Only if the setting ``CMIS_METADATA_CACHE_VALIDATE`` is enabled, the
+        ``cmis:objectId`` and ``cmis:changeToken`` of the cached version are compared
+        with the ones of the latest version in the DMS, which is retrieved without
+        its other properties. Outdated entries are removed.
+
+        :param drc_uuid: string, the value of drc:document__uuid
+        :param cached_properties: dict, the cached properties of the document
+        :return: bool, whether the cached properties can be used
+        """
+        if not getattr(settings, "CMIS_METADATA_CACHE_VALIDATE", False):
+            return True
+
+        def get_value(properties: dict, name: str):
+            return properties.get(name, {}).get("value")
+
+        version_series_id = get_value(cached_properties, "cmis:versionSeriesId")
+        is_current = False
+        if version_series_id and self.supports_operation("getObjectOfLatestVersion"):
+            try:
+                latest_version = self.get_object_of_latest_version(
+                    version_series_id,
+                    properties=[
+                        "cmis:changeToken",
+                        "cmis:isVersionSeriesCheckedOut",
+                    ],
+                )
+            except DocumentDoesNotExistError:
+                pass
+            except CmisNotSupportedException:
+                self.mark_operation_unsupported("getObjectOfLatestVersion")
+            else:
+                latest_properties = latest_version.properties
+                is_current = not get_value(
+                    latest_properties, "cmis:isVersionSeriesCheckedOut"
+                ) and all(
+                    get_value(latest_properties, name)
+                    == get_value(cached_properties, name)
+                    for name in ["cmis:objectId", "cmis:changeToken"]
+                )
+
+        if not is_current:
+            logger.debug(
+                "CMIS_ADAPTER: The cached properties of document %s are outdated",
+                drc_uuid,
+            )
+            invalidate_document_properties(drc_uuid)
+        return is_current
+
+    def _remember_document(self, document: Document, drc_uuid: str) -> None:
+        """Store a document retrieved with a query for the next lookups with its uuid
+
+        The document index is healed if its entry for the document is missing or
+        outdated.
+        """
+        self._register_document(document, heal=True)
+        add_to_identity_map(document, drc_uuid=drc_uuid)
+        cache_document_properties(document, drc_uuid)
+
+    def get_documents(
+        self, drc_uuids: Iterable[Union[str, UUID]], chunk_size: Optional[int] = None
+    ) -> Dict[str, Document]:
+        """Retrieve the documents with the given uuids (drc:document__uuid)
+
+        The documents that are not known yet are queried with
+        ``drc:document__uuid IN (...)``, with at most ``chunk_size`` uuids per query.
+        As with ``get_document``, the latest version of every document is returned,
+        or the private working copy if the document is checked out.
+
+        If the DMS doesn't support IN queries, the documents are retrieved one by one.
+
+        :param drc_uuids: the values of drc:document__uuid
+        :param chunk_size: int, the maximum number of uuids per query. Defaults to
+            the setting ``CMIS_GET_DOCUMENTS_CHUNK_SIZE`` (or 50).
+        :return: dict, the documents by uuid. The documents that don't exist are
+            left out.
+        """
+        if chunk_size is None:
+            chunk_size = getattr(settings, "CMIS_GET_DOCUMENTS_CHUNK_SIZE", 50)
+
+        documents = {}
+        unknown_uuids = []
+        for drc_uuid in dict.fromkeys(str(drc_uuid) for drc_uuid in drc_uuids):
+            document = self._get_known_document(drc_uuid)
+            if document is not None:
+                documents[drc_uuid] = document
+            else:
+                unknown_uuids.append(drc_uuid)
+
+        for chunk in chunked(unknown_uuids, chunk_size):
+            if self.supports_operation("query_in"):
+                try:
+                    documents.update(self._query_documents(chunk))
+                    continue
+                except (CmisInvalidArgumentException, CmisNotSupportedException) as exc:
+                    logger.info(
+                        "CMIS_ADAPTER: IN query failed (%s), "
+                        "retrieving the documents one by one instead.",
+                        exc,
+                    )
+                    self.operation_failed("query_in", exc)
+
+            for drc_uuid in chunk:
+                try:
+                    documents[drc_uuid] = self.get_document(drc_uuid=drc_uuid)
+                except DocumentDoesNotExistError:
+                    continue
+
+        return documents
+
+    def _query_documents(self, drc_uuids: List[str]) -> Dict[str, Document]:
+        query = Query(
+            self.document_type.table, where=[In("drc:document__uuid", drc_uuids)]
+        )
+        # There can be both a latest version and a private working copy per uuid
+        results = self._iter_statement(
+            self.document_type, query.get_statement(), page_size=2 * len(drc_uuids)
+        )
+
+        versions = defaultdict(list)
+        for result in results:
+            drc_uuid = result.properties["drc:document__uuid"]["value"]
+            versions[drc_uuid].append({"properties": result.properties})
+
+        documents = {}
+        for drc_uuid, extracted_data in versions.items():
+            document = extract_latest_version(self.document_type, extracted_data)
+            self._remember_document(document, drc_uuid)
+            documents[drc_uuid] = document
+        return documents
+
+    def get_documents_for_zaak(
+        self, zaak_url: str, page_size: int = 100, properties: List[str] = None
+    ) -> Iterator[Document]:
+        """Lazily iterate over the documents in the folder of a zaak
+
+        These are the documents created in or moved to the zaak folder and the
+        copies (with ``drc:kopie_van``) of documents related to other zaken too. They
+        are retrieved with one IN_TREE query, page by page. The next page is only
+        requested once the documents of the previous page are consumed. If the DMS
+        doesn't support IN_TREE queries, the children of the zaak folder are listed
+        instead.
+
+        :param zaak_url: string, the URL of the zaak
+        :param page_size: int, the number of documents requested at once
+        :param properties: list of strings, the properties to retrieve. The other
+            properties are retrieved when they are first accessed.
+        :return: iterator over the latest version of every document (or the private
+            working copy if it is checked out)
+        """
+        zaak_folders = self.query(
+            "zaak",
+            lhs=["drc:zaak__url = '%s'"],
+            rhs=[zaak_url],
+            properties=["cmis:name"],
+        )
+        if not zaak_folders:
+            return
+        zaak_folder = zaak_folders[0]
+
+        if properties:
+            # Needed to select the latest version of every document
+            properties = list(properties) + [
+                "drc:document__uuid",
+                "cmis:versionLabel",
+                "cmis:isVersionSeriesCheckedOut",
+            ]
+
+        documents = None
+        if self.supports_operation("query_in_tree"):
+            query = Query(
+                self.document_type.table,
+                where=[InTree(zaak_folder.objectId)],
+                properties=properties,
+            )
+            documents = self._iter_statement(
+                self.document_type,
+                query.get_statement(),
+                page_size=page_size,
+                partial=bool(properties),
+            )
+            # The first page is requested here, to fall back if the query fails
+            try:
+                documents = chain([next(documents)], documents)
+            except StopIteration:
+                return
+            except (CmisInvalidArgumentException, CmisNotSupportedException) as exc:
+                logger.info(
+                    "CMIS_ADAPTER: IN_TREE query failed (%s), "
+                    "listing the documents in the zaak folder instead.",
+                    exc,
+                )
+                self.operation_failed("query_in_tree", exc)
+                documents = None
+
+        if documents is None:
+            documents = zaak_folder.get_children_documents(properties=properties)
+
+        for document in self._iter_latest_versions(documents):
+            if not properties:
+                self._remember_document(document, document.uuid)
+            yield document
+
+    def _iter_latest_versions(
+        self, documents: Iterable[Document]
+    ) -> Iterator[Document]:
+        """Select the latest version (or the private working copy) of every document
+
+        The queries return both the latest version and the private working copy of
+        checked out documents. The latest version of a checked out document is only
+        yielded at the end, if its private working copy wasn't found.
+        """
+        yielded = set()
+        checked_out = {}
+        for document in documents:
+            if document.uuid in yielded:
+                continue
+            if document.versionLabel != "pwc" and document.isVersionSeriesCheckedOut:
+                checked_out.setdefault(document.uuid, document)
+                continue
+
+            checked_out.pop(document.uuid, None)
+            yielded.add(document.uuid)
+            yield document
+
+        yield from checked_out.values()
+
+    def _get_cached_query_results(
+        self, return_type: type, statement: str, partial: bool = False
+    ) -> Optional[list]:
+        """Get the objects returned by a query from the query cache, if possible"""
+        cached_results = get_cached_query_results(return_type.type_name, statement)
+        if cached_results is None:
+            return None
+        return [
+            return_type({"properties": properties}, partial=partial)
+            for properties in cached_results
+        ]
+
+    def _cache_query_results(
+        self, return_type: type, statement: str, results: list
+    ) -> None:
+        cache_query_results(return_type.type_name, statement, results)
+
+    def _build_query_statement(
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        order_by: List[str] = None,
+        properties: List[str] = None,
+    ) -> str:
+        """Build the statement of a query
+
+        :param return_type_name: string, either Folder, Document, Oio or Gebruiksrechten
+        :param lhs: list of strings, with the LHS of the SQL query
+        :param rhs: list of strings, with the RHS of the SQL query
+        :param order_by: list of strings, the columns to sort on, e.g.
+            ``["cmis:creationDate DESC"]``
+        :param properties: list of strings, the properties to select (default all)
+        :return: string, the statement
+        """
+        return self._build_query(
+            return_type_name, lhs, rhs, order_by=order_by, properties=properties
+        ).get_statement()
+
+    def _build_query(
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        order_by: List[str] = None,
+        properties: List[str] = None,
+    ) -> Query:
+        """Build a query from the conditions in the ``lhs``/``rhs`` style"""
+        return_type = self.get_return_type(return_type_name)
+        return Query(
+            return_type.table,
+            where=parse_conditions(lhs, rhs),
+            properties=properties,
+            order_by=order_by,
+        )
+
+    def _query_page(
+        self,
+        return_type: type,
+        statement: str,
+        max_items: Optional[int] = None,
+        skip_count: Optional[int] = None,
+        partial: bool = False,
+    ) -> QueryPage:
+        """Perform a query and return one page of its results
+
+        :param partial: bool, whether the statement only selects some properties
+        :return: QueryPage, the results, whether the query has more results and the
+            total number of results (if known)
+        """
+        page = self._query_data_page(
+            statement, max_items=max_items, skip_count=skip_count
+        )
+        results = [return_type(data, partial=partial) for data in page.results]
+        return page._replace(results=results)
+
+    def _query_data_page(
+        self,
+        statement: str,
+        max_items: Optional[int] = None,
+        skip_count: Optional[int] = None,
+    ) -> QueryPage:
+        """Perform a query and return one page of its results, as the data of the
+        objects (``{"properties": {...}}``) instead of objects
+        """
+        raise NotImplementedError
+
+    def exists(
+        self, return_type_name: str, lhs: List[str] = None, rhs: List[str] = None
+    ) -> bool:
+        """Check whether an SQL query in the DMS has any results
+
+        Only the ``cmis:objectId`` of at most one result is requested, instead of
+        the properties of all the results.
+
+        :param return_type_name: string, either Folder, Document, Oio or Gebruiksrechten
+        :param lhs: list of strings, with the LHS of the SQL query
+        :param rhs: list of strings, with the RHS of the SQL query
+        :return: bool, whether there is at least one result
+        """
+        return_type = self.get_return_type(return_type_name)
+        statement = self._build_query_statement(
+            return_type_name, lhs, rhs, properties=["cmis:objectId"]
+        )
+        # The results are truncated, so they are cached separately from the results
+        # of the same (complete) query
+        cache_statement = f"EXISTS ({statement})"
+
+        results = self._get_cached_query_results(
+            return_type, cache_statement, partial=True
+        )
+        if results is None:
+            results = self._query_page(
+                return_type, statement, max_items=1, partial=True
+            ).results
+            self._cache_query_results(return_type, cache_statement, results)
+
+        return len(results) > 0
+
+    def count(
+        self, return_type_name: str, lhs: List[str] = None, rhs: List[str] = None
+    ) -> int:
+        """Count the results of an SQL query in the DMS
+
+        The number of results reported by the DMS (``numItems``) is used if
+        possible. Otherwise, only the ``cmis:objectId`` of the results is retrieved
+        to count them.
+
+        :param return_type_name: string, either Folder, Document, Oio or Gebruiksrechten
+        :param lhs: list of strings, with the LHS of the SQL query
+        :param rhs: list of strings, with the RHS of the SQL query
+        :return: int, the number of results
+        """
+        return_type = self.get_return_type(return_type_name)
+        statement = self._build_query_statement(
+            return_type_name, lhs, rhs, properties=["cmis:objectId"]
+        )
+
+        page = self._query_page(return_type, statement, max_items=1, partial=True)
+        num_items = page.num_items
+        if num_items is not None and num_items >= 0:
+            # Some DMSs report the number of results in the page instead of the total
+            if not page.has_more_items or num_items > len(page.results):
+                return num_items
+
+        # The DMS doesn't report the number of results, so they are counted
+        return sum(
+            1
+            for _result in self.iter_query(
+                return_type_name, lhs, rhs, properties=["cmis:objectId"]
+            )
+        )
+
+    def iter_query(
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        order_by: List[str] = None,
+        page_size: int = 100,
+        skip_count: int = 0,
+        properties: List[str] = None,
+        columnar: bool = False,
+    ) -> Iterator:
+        """Lazily iterate over the results of an SQL query in the DMS
+
+        The results are retrieved page by page, with the ``maxItems`` and
+        ``skipCount`` parameters of the query. The next page is only requested
+        once all the results of the previous page are consumed.
+
+        :param return_type_name: string, either Folder, Document, Oio or Gebruiksrechten
+        :param lhs: list of strings, with the LHS of the SQL query
+        :param rhs: list of strings, with the RHS of the SQL query
+        :param order_by: list of strings, the columns to sort on, e.g.
+            ``["cmis:creationDate DESC"]``. Use a unique order for stable pages.
+        :param page_size: int, the number of results requested at once
+        :param skip_count: int, the number of results to skip
+        :param properties: list of strings, the properties to select. The other
+            properties are retrieved when they are first accessed.
+        :param columnar: bool, whether to iterate over a ``ColumnarResult`` per page
+            instead of over the objects
+        :return: iterator over objects of type Folder, Document, Oio or Gebruiksrechten
+        """
+        return_type = self.get_return_type(return_type_name)
+        statement = self._build_query_statement(
+            return_type_name, lhs, rhs, order_by=order_by, properties=properties
+        )
+        if columnar:
+            return self._iter_columnar(statement, page_size, skip_count)
+        return self._iter_statement(
+            return_type,
+            statement,
+            page_size=page_size,
+            skip_count=skip_count,
+            partial=bool(properties),
+        )
+
+    def _iter_statement(
+        self,
+        return_type: type,
+        statement: str,
+        page_size: int = 100,
+        skip_count: int = 0,
+        partial: bool = False,
+    ) -> Iterator:
+        while True:
+            page = self._query_page(
+                return_type,
+                statement,
+                max_items=page_size,
+                skip_count=skip_count,
+                partial=partial,
+            )
+            yield from page.results
+
+            skip_count += len(page.results)
+            if not page.has_more_items or not page.results:
+                break
+
+    def _query_columnar(self, statement: str) -> ColumnarResult:
+        page = self._query_data_page(statement)
+        return ColumnarResult.from_data(page.results, time_zone=self.config.time_zone)
+
+    def _iter_columnar(
+        self, statement: str, page_size: int = 100, skip_count: int = 0
+    ) -> Iterator[ColumnarResult]:
+        while True:
+            page = self._query_data_page(
+                statement, max_items=page_size, skip_count=skip_count
+            )
+            yield ColumnarResult.from_data(
+                page.results, time_zone=self.config.time_zone
+            )
+
+            skip_count += len(page.results)
+            if not page.has_more_items or not page.results:
+                break
+
     def get_other_base_folder_name(self):
         return self.config.get_other_base_folder_name()
 
@@ -112,13 +775,67 @@ class CMISClient:
         else:
             child_type = properties.get("cmis:objectTypeId")
 
-        child_folder = parent.get_child_folder(name=name, child_type=child_type)
+        if isinstance(child_type, dict):
+            object_type_id = child_type.get("value")
+        else:
+            object_type_id = child_type
+
+        child_folder = self._get_cached_folder(
+            folder_utils.get_folder_cache_key(parent.objectId, name),
+            lambda: parent.get_child_folder(name=name, child_type=child_type),
+            object_type_id=object_type_id,
+        )
         if child_folder:
             return child_folder
 
         # Create new folder, as it doesn't exist yet
         return self.create_folder(name, parent.objectId, properties)
 
+    def _get_cached_folder(
+        self,
+        cache_key: str,
+        fetch: Callable[[], Optional[Folder]],
+        object_type_id: Optional[str] = None,
+    ) -> Optional[Folder]:
+        """Retrieve a folder from the "folders" cache, or fetch and cache it
+
+        :param cache_key: string, the key of the folder in the cache
+        :param fetch: callable that retrieves the folder from the DMS
+        :param object_type_id: string, the requested object type of the folder
+        """
+        folder_cache = get_cache("folders")
+        if folder_cache is None:
+            return fetch()
+
+        entry = folder_cache.get(cache_key)
+        if entry is not None and entry["objectTypeId"] == object_type_id:
+            return self.folder_type(
+                {
+                    "properties": {
+                        prop_name: {"value": value}
+                        for prop_name, value in entry["properties"].items()
+                    }
+                }
+            )
+
+        folder = fetch()
+        if folder:
+            entry = {
+                "objectTypeId": object_type_id,
+                "properties": {
+                    prop_name: prop_details.get("value")
+                    for prop_name, prop_details in folder.properties.items()
+                },
+            }
+            folder_cache.set(cache_key, entry)
+        return folder
+
+    def _get_root_folder(self) -> Folder:
+        root_folder_id = self.root_folder_id
+        return self._get_cached_folder(
+            f"root:{root_folder_id}", lambda: self.get_folder(root_folder_id)
+        )
+
     def get_folder_by_name(self, name: str, parent: Folder) -> Folder:
         child_folder = parent.get_child_folder(
             name, child_type=parent.properties.get("cmis:objectTypeId")
@@ -130,9 +847,14 @@ class CMISClient:
             params={"folder_name": name, "parent_folder": parent.name},
         )
 
-    def delete_cmis_folders_in_base(self):
-        """Delete all the folders in the base folders"""
+    def delete_cmis_folders_in_base(self) -> List[str]:
+        """Delete all the folders in the base folders
+
+        :return: list of strings, the objectIds of the objects that could not be
+            deleted
+        """
         root_folder = self.get_folder(self.root_folder_id)
+        failed_to_delete = []
         for folder_name in set(
             [
                 self.config.get_zaak_base_folder_name(),
@@ -141,10 +863,18 @@ class CMISClient:
         ):
             try:
                 folder = self.get_folder_by_name(folder_name, root_folder)
-                folder.delete_tree()
+                failed_to_delete += folder.delete_tree()
             except FolderDoesNotExistError:
                 pass
 
+        if failed_to_delete:
+            logger.warning(
+                "CMIS_ADAPTER: %d objects in the base folders could not be deleted: %s",
+                len(failed_to_delete),
+                ", ".join(failed_to_delete),
+            )
+        return failed_to_delete
+
     def update_document(
         self, drc_uuid: str, lock: str, data: dict, content: Optional[BytesIO] = None
     ) -> Document:
@@ -173,35 +903,29 @@ class CMISClient:
         if not correct_lock:
             raise DocumentLockConflictException("Wrong document lock given.")
 
-        # build up the properties
-        current_properties = cmis_doc.properties
+        # build up the properties, only the changed ones are sent to the DMS
         new_properties = self.document_type.build_properties(data, new=False)
-
-        diff_properties = {
-            key: value
-            for key, value in new_properties.items()
-            if current_properties.get(key) != value
-        }
+        diff_properties = cmis_doc.get_changed_properties(new_properties)
 
         content_filename = data.get("bestandsnaam") or cmis_doc.bestandsnaam
 
+        # Content can be empty in case of large file uploads, because the file is
+        # uploaded using `BestandsDelen`
+        # https://github.com/VNG-Realisatie/gemma-zaken/blob/master/docs/_content/standaard/documenten/index.md#opslaan-van-bestanden
+        should_clear_file = "bestandsomvang" in data and data["bestandsomvang"] is None
+        if content is None and should_clear_file:
+            content = BytesIO(b"")
+
         try:
-            # Content can be empty in case of large file uploads, because the file is
-            # uploaded using `BestandsDelen`
-            # https://github.com/VNG-Realisatie/gemma-zaken/blob/master/docs/_content/standaard/documenten/index.md#opslaan-van-bestanden
-            should_clear_file = (
-                "bestandsomvang" in data and data["bestandsomvang"] is None
+            return cmis_doc.update(
+                diff_properties, content=content, filename=content_filename
             )
-            if content is not None or should_clear_file:
-                cmis_doc.update_content(content or BytesIO(b""), content_filename)
-
-            if diff_properties:
-                cmis_doc.update_properties(diff_properties)
         except UpdateConflictException as exc:
             # Node locked!
             raise DocumentConflictException from exc
-
-        return cmis_doc
+        finally:
+            invalidate_document_properties(drc_uuid)
+            invalidate_queries("document")
 
     def update_gebruiksrechten(self, drc_uuid: str, data: dict) -> Gebruiksrechten:
         """Update a gebruiksrechten
@@ -215,17 +939,182 @@ class CMISClient:
             drc_uuid=drc_uuid, object_type="gebruiksrechten"
         )
 
-        current_properties = gebruiksrechten.properties
         new_properties = self.gebruiksrechten_type.build_properties(data)
+        diff_properties = gebruiksrechten.get_changed_properties(new_properties)
 
-        diff_properties = {
-            key: value
-            for key, value in new_properties.items()
-            if current_properties.get(key) != value
-        }
+        if not diff_properties:
+            return gebruiksrechten
 
         return gebruiksrechten.update_properties(diff_properties)
 
+    def create_documents(
+        self,
+        items: List[dict],
+        concurrency: Optional[int] = None,
+        check_if_already_exists: bool = True,
+    ) -> List[BulkItemResult]:
+        """Create several documents
+
+        Every item is a dict with the arguments of ``create_document``:
+        ``identification``, ``bronorganisatie``, ``data`` and optionally ``content``,
+        ``zaak_data``, ``zaaktype_data`` and ``other_data``.
+
+        The existence of the documents is checked with IN queries, the destination
+        folders are resolved once per distinct folder and the documents are uploaded
+        concurrently. A failing item doesn't abort the others.
+
+        :param items: list of dicts, the documents to create
+        :param concurrency: int, the maximum number of documents that are uploaded
+            at the same time. Defaults to the setting ``CMIS_BULK_CONCURRENCY`` (or 4).
+        :param check_if_already_exists: bool, whether to check if documents with the
+            same identificatie/bronorganisatie already exist in the DMS.
+        :return: list of BulkItemResult, in the order of the items, with the index of
+            the item and the created document or the error
+        """
+        existing = set()
+        if check_if_already_exists:
+            existing = self._get_existing_identifications(
+                [
+                    (str(item["identification"]), item["bronorganisatie"])
+                    for item in items
+                    if item["identification"] and item["bronorganisatie"]
+                ]
+            )
+
+        results = {}
+        uploads = []
+        folders = {}
+        for index, item in enumerate(items):
+            identification = item["identification"]
+            bronorganisatie = item["bronorganisatie"]
+            try:
+                if check_if_already_exists and identification and bronorganisatie:
+                    key = (str(identification), bronorganisatie)
+                    if key in existing:
+                        raise DocumentExistsError(
+                            "Een document met dezelfde identificatie en bronorganisatie al bestaat."
+                        )
+                    # Duplicates in the same batch
+                    existing.add(key)
+
+                folder_kwargs = {
+                    name: item.get(name)
+                    for name in ["zaak_data", "zaaktype_data", "other_data"]
+                }
+                folder_key = json.dumps(folder_kwargs, sort_keys=True, default=str)
+                if folder_key not in folders:
+                    folders[folder_key] = self._get_or_create_document_folder(
+                        **folder_kwargs
+                    )
+
+                # Built upfront, since building the properties uses the database
+                properties = self._build_new_document_properties(
+                    identification, bronorganisatie, item["data"]
+                )
+            except Exception as exc:
+                results[index] = BulkItemResult(index, error=exc)
+                continue
+
+            uploads.append(
+                (
+                    index,
+                    (
+                        properties,
+                        item.get("content"),
+                        item["data"].get("bestandsnaam"),
+                        folders[folder_key],
+                    ),
+                )
+            )
+
+        for result in run_concurrently(
+            lambda arguments: self._create_document_in_folder(*arguments),
+            uploads,
+            concurrency=concurrency,
+        ):
+            if result.ok:
+                self._register_document(result.result)
+            results[result.item] = result
+
+        if uploads:
+            invalidate_queries("document")
+        return [results[index] for index in range(len(items))]
+
+    def _build_new_document_properties(
+        self, identification: str, bronorganisatie: str, data: dict
+    ) -> dict:
+        """Build the properties of a new document, in the format to send to the DMS"""
+        raise NotImplementedError
+
+    def _create_document_in_folder(
+        self,
+        properties: dict,
+        content: Optional[BytesIO],
+        filename: Optional[str],
+        destination_folder: Folder,
+    ) -> Document:
+        """Create a document with the given properties and content in a folder"""
+        raise NotImplementedError
+
+    def _get_existing_identifications(
+        self, identifications: List[Tuple[str, str]]
+    ) -> Set[Tuple[str, str]]:
+        """Find which (identificatie, bronorganisatie) pairs are used by documents
+
+        :param identifications: list of tuples, with the identificatie and the
+            bronorganisatie of every document
+        :return: set of tuples, the pairs that are used by documents in the DMS
+        """
+        cmis_identificatie = mapper("identificatie", type="document")
+        cmis_bronorganisatie = mapper("bronorganisatie", type="document")
+        chunk_size = getattr(settings, "CMIS_GET_DOCUMENTS_CHUNK_SIZE", 50)
+
+        identifications_by_organisation = defaultdict(dict)
+        for identification, bronorganisatie in identifications:
+            identifications_by_organisation[bronorganisatie][identification] = None
+
+        existing = set()
+        for bronorganisatie, values in identifications_by_organisation.items():
+            for chunk in chunked(list(values), chunk_size):
+                if self.supports_operation("query_in"):
+                    query = Query(
+                        self.document_type.table,
+                        where=[
+                            Comparison(cmis_bronorganisatie, bronorganisatie),
+                            In(cmis_identificatie, chunk),
+                        ],
+                        properties=[cmis_identificatie],
+                    )
+                    try:
+                        for document in self._iter_statement(
+                            self.document_type, query.get_statement(), partial=True
+                        ):
+                            identification = document.properties[cmis_identificatie]
+                            existing.add((identification["value"], bronorganisatie))
+                        continue
+                    except (
+                        CmisInvalidArgumentException,
+                        CmisNotSupportedException,
+                    ) as exc:
+                        logger.info(
+                            "CMIS_ADAPTER: IN query failed (%s), "
+                            "checking the documents one by one instead.",
+                            exc,
+                        )
+                        self.operation_failed("query_in", exc)
+
+                for identification in chunk:
+                    if self.exists(
+                        "document",
+                        lhs=[
+                            f"{cmis_identificatie} = '%s'",
+                            f"{cmis_bronorganisatie} = '%s'",
+                        ],
+                        rhs=[identification, bronorganisatie],
+                    ):
+                        existing.add((identification, bronorganisatie))
+        return existing
+
     def create_oio(
         self,
         oio_data: dict,
@@ -250,7 +1139,8 @@ class CMISClient:
             A. If the document is already related to a zaak, a copy of the document is put in the
                 correct zaaktype/zaak folder.
             B. If the document is NOT related to a zaak: the document is moved from the temporary folder
-            to the correct zaaktype/zaak folder.
+            to the correct zaaktype/zaak folder. If the document was created directly in the zaak folder,
+            it is left where it is.
 
         If the document is linked already to a gebruiksrechten, then the gebruiksrechten object is also moved/copied.
 
@@ -284,7 +1174,7 @@ class CMISClient:
         )
 
         # Check if there are other Oios related to the document
-        retrieved_oios = self.query(
+        is_related = self.exists(
             return_type_name="oio",
             lhs=["drc:oio__informatieobject = '%s'"],
             rhs=[oio_data.get("informatieobject")],
@@ -298,17 +1188,21 @@ class CMISClient:
         )
 
         # Case 1: Already related to a zaak. Copy the document to the destination folder.
-        if len(retrieved_oios) > 0:
+        if is_related:
             self.copy_document(document, destination_folder)
             if len(related_gebruiksrechten) > 0:
                 for gebruiksrechten in related_gebruiksrechten:
                     self.copy_gebruiksrechten(gebruiksrechten, related_data_folder)
-        # Case 2: Not related to a zaak. Move the document to the destination folder
+        # Case 2: Not related to a zaak. Move the document to the destination folder,
+        # unless it was already created there (see ``create_document``).
         else:
-            document.move_object(destination_folder)
-            if len(related_gebruiksrechten) > 0:
-                for gebruiksrechten in related_gebruiksrechten:
-                    gebruiksrechten.move_object(related_data_folder)
+            current_folder = document.get_parent_folders()[0]
+            if current_folder.objectId != destination_folder.objectId:
+                document.move_object(destination_folder, source_folder=current_folder)
+                invalidate_document_properties(document.uuid)
+                if len(related_gebruiksrechten) > 0:
+                    for gebruiksrechten in related_gebruiksrechten:
+                        gebruiksrechten.move_object(related_data_folder)
 
         # Create the Oio in the "Related data" folder
         return self.create_content_object(
@@ -340,6 +1234,41 @@ class CMISClient:
 
         return self.get_or_create_zaak_folder(zaaktype_data, zaak_data)
 
+    def _get_or_create_document_folder(
+        self,
+        zaak_data: Optional[dict] = None,
+        zaaktype_data: Optional[dict] = None,
+        other_data: Optional[dict] = None,
+    ) -> Folder:
+        """Get or create the folder in which a new document is created
+
+        Documents created in the context of a zaak (or verzoek) are placed directly in
+        the folder they would be moved to when relating them, so that ``create_oio``
+        doesn't need to move them afterwards. All other documents are placed in the
+        'other' folder.
+
+        :param zaak_data: dict, the zaak details.
+        :param zaaktype_data: dict, the zaaktype details.
+        :param other_data: dict, the verzoek details.
+        :return: Folder, the folder in which to create the document
+        """
+        if zaak_data or zaaktype_data:
+            if not zaak_data or not zaaktype_data:
+                raise ValueError(
+                    "You must provide both 'zaak_data' and 'zaaktype_data' to create "
+                    "documents in a zaak folder"
+                )
+            return self._get_or_create_destination_folder(
+                object_type="zaak", zaak_data=zaak_data, zaaktype_data=zaaktype_data
+            )
+
+        if other_data:
+            return self._get_or_create_destination_folder(
+                object_type="verzoek", other_data=other_data
+            )
+
+        return self.get_or_create_other_folder()
+
     def create_gebruiksrechten(self, data: dict) -> Gebruiksrechten:
         """Create gebruiksrechten
 
@@ -362,6 +1291,50 @@ class CMISClient:
             destination_folder=related_data_folder,
         )
 
+    def bulk_update_properties(
+        self,
+        objects: List[Union[Document, Gebruiksrechten]],
+        properties: dict,
+        concurrency: Optional[int] = None,
+    ) -> List[BulkItemResult]:
+        """Update the same properties of several objects
+
+        The objects are updated concurrently, each with ``update_properties``. A
+        failing object doesn't abort the others. The given objects are not refreshed,
+        they should be retrieved again to get the updated properties.
+
+        :param objects: list of documents/gebruiksrechten
+        :param properties: dict, the new values by CMIS property name. They are
+            converted with ``build_update_properties`` of every object.
+        :param concurrency: int, the maximum number of objects that are updated at
+            the same time. Defaults to the setting ``CMIS_BULK_CONCURRENCY`` (or 4).
+        :return: list of BulkItemResult, with the objectId of every object and its
+            objectId after the update (which changes if a new version is created)
+        """
+        objects = list(objects)
+        results = self._update_properties_concurrently(objects, properties, concurrency)
+        self._forget_updated_objects(objects)
+        return results
+
+    def _update_properties_concurrently(
+        self, objects: list, properties: dict, concurrency: Optional[int]
+    ) -> List[BulkItemResult]:
+        return run_concurrently(
+            lambda cmis_object: cmis_object.update_properties(
+                cmis_object.build_update_properties(properties)
+            ).objectId,
+            [(cmis_object.objectId, cmis_object) for cmis_object in objects],
+            concurrency=concurrency,
+        )
+
+    def _forget_updated_objects(self, objects: list) -> None:
+        """Forget the objects that were updated, possibly in other threads"""
+        clear_identity_map()
+        for cmis_object in objects:
+            if cmis_object.type_name == "document":
+                drc_uuid = cmis_object.properties.get("drc:document__uuid", {})
+                invalidate_document_properties(drc_uuid.get("value"))
+
     def delete_content_object(self, drc_uuid: Union[str, UUID], object_type: str):
         """Delete the gebruiksrechten/objectinformatieobject with specified uuid
 
@@ -374,6 +1347,87 @@ class CMISClient:
         content_object = self.get_content_object(drc_uuid, object_type=object_type)
         content_object.delete_object()
 
+    def delete_content_objects(
+        self,
+        drc_uuids: Iterable[Union[str, UUID]],
+        object_type: str,
+        concurrency: Optional[int] = None,
+    ) -> List[BulkItemResult]:
+        """Delete the gebruiksrechten/objectinformatieobjecten with the given uuids
+
+        The objects are retrieved with IN queries and deleted concurrently. A failing
+        object doesn't abort the others.
+
+        :param drc_uuids: the values of drc:oio__uuid/drc:gebruiksrechten__uuid
+        :param object_type: string, either "gebruiksrechten" or "oio"
+        :param concurrency: int, the maximum number of objects that are deleted at
+            the same time. Defaults to the setting ``CMIS_BULK_CONCURRENCY`` (or 4).
+        :return: list of BulkItemResult, with the uuid and the error (if any) of
+            every object
+        """
+        assert object_type in [
+            "gebruiksrechten",
+            "oio",
+        ], "'object_type' can be only 'gebruiksrechten' or 'oio'"
+
+        drc_uuids = list(dict.fromkeys(str(drc_uuid) for drc_uuid in drc_uuids))
+        content_objects = self._get_content_objects(drc_uuids, object_type)
+
+        results = {
+            drc_uuid: BulkItemResult(
+                drc_uuid,
+                error=DocumentDoesNotExistError(
+                    f"{object_type.capitalize()} met uuid {drc_uuid} bestaat niet in het CMIS connection"
+                ),
+            )
+            for drc_uuid in drc_uuids
+            if drc_uuid not in content_objects
+        }
+        for result in run_concurrently(
+            lambda content_object: content_object.delete_object(),
+            content_objects.items(),
+            concurrency=concurrency,
+        ):
+            results[result.item] = result
+        return [results[drc_uuid] for drc_uuid in drc_uuids]
+
+    def _get_content_objects(
+        self, drc_uuids: List[str], object_type: str
+    ) -> Dict[str, Union[Gebruiksrechten, ObjectInformatieObject]]:
+        """Retrieve the gebruiksrechten/oios with the given uuids, with IN queries"""
+        chunk_size = getattr(settings, "CMIS_GET_DOCUMENTS_CHUNK_SIZE", 50)
+        return_type = self.get_return_type(object_type)
+        uuid_property = f"drc:{object_type}__uuid"
+
+        content_objects = {}
+        for chunk in chunked(drc_uuids, chunk_size):
+            if self.supports_operation("query_in"):
+                query = Query(return_type.table, where=[In(uuid_property, chunk)])
+                try:
+                    for content_object in self._iter_statement(
+                        return_type, query.get_statement()
+                    ):
+                        drc_uuid = content_object.properties[uuid_property]["value"]
+                        content_objects[drc_uuid] = content_object
+                    continue
+                except (CmisInvalidArgumentException, CmisNotSupportedException) as exc:
+                    logger.info(
+                        "CMIS_ADAPTER: IN query failed (%s), "
+                        "retrieving the objects one by one instead.",
+                        exc,
+                    )
+                    self.operation_failed("query_in", exc)
+
+            for drc_uuid in chunk:
+                try:
+                    content_objects[drc_uuid] = self.get_content_object(
+                        drc_uuid, object_type=object_type
+                    )
+                except DocumentDoesNotExistError:
+                    continue
+
+        return content_objects
+
     def delete_document(self, drc_uuid: str) -> None:
         """Delete all versions of a document with given uuid
 
@@ -382,11 +1436,93 @@ class CMISClient:
         document = self.get_document(drc_uuid=drc_uuid)
         document.delete_object()
 
+        if self.document_index_enabled:
+            DocumentIndexEntry.objects.filter(uuid=drc_uuid).delete()
+        invalidate_document_properties(drc_uuid)
+
+    def delete_documents(
+        self,
+        drc_uuids: Iterable[Union[str, UUID]],
+        concurrency: Optional[int] = None,
+    ) -> List[BulkItemResult]:
+        """Delete all versions of the documents with the given uuids
+
+        The documents are retrieved with IN queries (see ``get_documents``). The
+        checkouts of the locked documents are cancelled first, after which the
+        documents are deleted. Both are done concurrently and a failing document
+        doesn't abort the others.
+
+        :param drc_uuids: the values of drc:document__uuid
+        :param concurrency: int, the maximum number of documents that are handled at
+            the same time. Defaults to the setting ``CMIS_BULK_CONCURRENCY`` (or 4).
+        :return: list of BulkItemResult, with the uuid and the error (if any) of
+            every document
+        """
+        drc_uuids = list(dict.fromkeys(str(drc_uuid) for drc_uuid in drc_uuids))
+        documents = self.get_documents(drc_uuids)
+
+        results = {
+            drc_uuid: BulkItemResult(
+                drc_uuid,
+                error=DocumentDoesNotExistError(
+                    f"Document met drc:document__uuid {drc_uuid} bestaat niet in het CMIS connection"
+                ),
+            )
+            for drc_uuid in drc_uuids
+            if drc_uuid not in documents
+        }
+
+        # A private working copy can't be deleted, so the checkouts are cancelled first
+        checked_out = [
+            (drc_uuid, document)
+            for drc_uuid, document in documents.items()
+            if document.isVersionSeriesCheckedOut
+        ]
+        pwc_uuids = []
+        for result in run_concurrently(
+            lambda document: document.cancel_checkout(),
+            checked_out,
+            concurrency=concurrency,
+        ):
+            if not result.ok:
+                results[result.item] = result
+            elif documents[result.item].versionLabel == "pwc":
+                pwc_uuids.append(result.item)
+
+        if checked_out:
+            # The writes in the other threads don't clear the identity map of this one
+            clear_identity_map()
+            for drc_uuid, _document in checked_out:
+                invalidate_document_properties(drc_uuid)
+        if pwc_uuids:
+            # The PWCs don't exist anymore, so retrieve the latest versions instead
+            documents.update(self.get_documents(pwc_uuids))
+
+        # The latest versions are known, so they don't need to be looked up again
+        # like in ``Document.delete_object``
+        for result in run_concurrently(
+            lambda document: document.delete_all_versions(),
+            [
+                (drc_uuid, document)
+                for drc_uuid, document in documents.items()
+                if drc_uuid not in results
+            ],
+            concurrency=concurrency,
+        ):
+            results[result.item] = result
+
+        deleted_uuids = [drc_uuid for drc_uuid in drc_uuids if results[drc_uuid].ok]
+        if self.document_index_enabled and deleted_uuids:
+            DocumentIndexEntry.objects.filter(uuid__in=deleted_uuids).delete()
+        for drc_uuid in deleted_uuids:
+            invalidate_document_properties(drc_uuid)
+        return [results[drc_uuid] for drc_uuid in drc_uuids]
+
     def get_or_create_zaak_folder(self, zaaktype: dict, zaak: dict) -> Folder:
         """Get or create all the folders in the configurable 'zaak' folder path"""
         path_elements = folder_utils.get_folder_structure(self.config.zaak_folder_path)
 
-        parent_folder = self.get_folder(self.root_folder_id)
+        parent_folder = self._get_root_folder()
         now = timezone.now()
 
         zaaktype.setdefault(
@@ -428,7 +1564,7 @@ class CMISClient:
             self.config.verzoek_folder_path
         )
 
-        parent_folder = self.get_folder(self.root_folder_id)
+        parent_folder = self._get_root_folder()
         now = timezone.now()
 
         ctx = {
@@ -452,7 +1588,7 @@ class CMISClient:
         """Get or create all the folders in the configurable 'other' folder path"""
         path_elements = folder_utils.get_folder_structure(self.config.other_folder_path)
 
-        parent_folder = self.get_folder(self.root_folder_id)
+        parent_folder = self._get_root_folder()
         now = timezone.now()
 
         ctx = {
@@ -0,0 +1,284 @@
+import csv
+import datetime
+import json
+from array import array
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+import pytz
+
+__all__ = ["ColumnarResult"]
+
+
+class _Column:
+    """
+    The values of one property, stored compactly.
+
+    Numbers, booleans and datetimes are stored in typed arrays (datetimes as POSIX
+    timestamps), with a mask for the missing values. Strings are dictionary
+    encoded: every distinct string is stored once and the rows hold its index.
+    Other values (e.g. multi-valued properties) are stored as a list.
+    """
+
+    def __init__(self, num_rows: int = 0):
+        self.kind = None
+        self.values = None
+        self.nulls = bytearray()
+        # Dictionary encoding of the strings
+        self.strings = []
+        self.string_codes = {}
+        for _row in range(num_rows):
+            self.append(None)
+
+    def __len__(self):
+        return len(self.nulls)
+
+    @staticmethod
+    def _get_kind(value: Any) -> str:
+        if isinstance(value, bool):
+            return "bool"
+        if isinstance(value, int):
+            return "int"
+        if isinstance(value, (float, Decimal)):
+            return "float"
+        if isinstance(value, datetime.datetime):
+            return "datetime"
+        if isinstance(value, str):
+            return "str"
+        return "object"
+
+    def _start(self, kind: str) -> None:
+        num_rows = len(self.nulls)
+        self.kind = kind
+        if kind == "bool":
+            self.values = array("b", bytes(num_rows))
+        elif kind == "int":
+            self.values = array("q", bytes(8 * num_rows))
+        elif kind in ["float", "datetime"]:
+            self.values = array("d", bytes(8 * num_rows))
+        elif kind == "str":
+            self.values = array("I", bytes(4 * num_rows))
+        else:
+            self.values = [None] * num_rows
+
+    def _convert_to_objects(self) -> None:
+        self.values = list(self)
+        self.kind = "object"
+        self.strings = []
+        self.string_codes = {}
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            self.nulls.append(1)
+            if self.kind is not None:
+                self.values.append(None if self.kind == "object" else 0)
+            return
+
+        kind = self._get_kind(value)
+        if self.kind is None:
+            self._start(kind)
+        elif kind != self.kind and self.kind != "object":
+            if {kind, self.kind} == {"int", "float"}:
+                self.values = array("d", self.values)
+                self.kind = "float"
+            else:
+                self._convert_to_objects()
+
+        if self.kind == "str":
+            code = self.string_codes.get(value)
+            if code is None:
+                code = self.string_codes[value] = len(self.strings)
+                self.strings.append(value)
+            self.values.append(code)
+        elif self.kind == "datetime":
+            self.values.append(value.timestamp())
+        elif self.kind == "int":
+            try:
+                self.values.append(value)
+            except OverflowError:
+                # Too large for a 64-bit integer
+                self._convert_to_objects()
+                self.values.append(value)
+        else:
+            self.values.append(value)
+        # Only counted once the value is stored, the conversion above reads the
+        # previous rows
+        self.nulls.append(0)
+
+    def get(self, index: int, time_zone: datetime.tzinfo = pytz.utc) -> Any:
+        if self.nulls[index]:
+            return None
+        value = self.values[index]
+        if self.kind == "str":
+            return self.strings[value]
+        if self.kind == "bool":
+            return bool(value)
+        if self.kind == "datetime":
+            return datetime.datetime.fromtimestamp(value, tz=time_zone)
+        return value
+
+    def __iter__(self) -> Iterator:
+        return (self.get(index) for index in range(len(self)))
+
+    def take(self, indices: Iterable[int]) -> "_Column":
+        column = _Column()
+        column.kind = self.kind
+        column.strings = self.strings
+        column.string_codes = self.string_codes
+        column.values = (
+            [] if self.kind in [None, "object"] else array(self.values.typecode)
+        )
+        for index in indices:
+            column.nulls.append(self.nulls[index])
+            if self.kind is not None:
+                column.values.append(self.values[index])
+        return column
+
+
+class ColumnarResult:
+    """
+    Table-like result of a query, with one compact column per property.
+
+    Compared to a list of objects, there are no objects and property dicts per row,
+    so large results take a fraction of the memory.
+
+    Usage:
+    >>> result = client.query("document", properties=[...], columnar=True)
+    >>> result.column("drc:document__titel")
+    ["summary", ...]
+    >>> result.where("drc:document__status", lambda status: status == "definitief")
+    >>> result.to_csv(file)
+    """
+
+    def __init__(self, time_zone: str = "UTC"):
+        self.time_zone = pytz.timezone(time_zone)
+        self._columns: Dict[str, _Column] = {}
+        self._num_rows = 0
+
+    @classmethod
+    def from_data(
+        cls, data: Iterable[dict], time_zone: str = "UTC"
+    ) -> "ColumnarResult":
+        """Build the result from the data returned by the DMS
+
+        :param data: iterable of dicts, in the format ``{"properties": {...}}``
+        :param time_zone: string, the time zone of the datetimes that are returned
+        :return: ColumnarResult
+        """
+        result = cls(time_zone=time_zone)
+        result.extend(data)
+        return result
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def __len__(self):
+        return self._num_rows
+
+    def extend(self, data: Iterable[dict]) -> None:
+        """Add the rows returned by the DMS, in the format ``{"properties": {...}}``"""
+        for item in data:
+            properties = item.get("properties", {})
+            for name in properties:
+                if name not in self._columns:
+                    self._columns[name] = _Column(num_rows=self._num_rows)
+
+            for name, column in self._columns.items():
+                prop_details = properties.get(name)
+                value = prop_details["value"] if prop_details else None
+                # The browser binding returns datetimes as timestamps in milliseconds
+                if (
+                    prop_details
+                    and prop_details.get("type") == "datetime"
+                    and value is not None
+                ):
+                    value = datetime.datetime.fromtimestamp(int(value) / 1000, pytz.utc)
+                column.append(value)
+
+            self._num_rows += 1
+
+    def column(self, name: str) -> list:
+        """The values of a property, in the order of the rows"""
+        column = self._columns[name]
+        return [column.get(index, self.time_zone) for index in range(self._num_rows)]
+
+    def row(self, index: int) -> dict:
+        """The values of the properties of one row"""
+        if index < 0:
+            index += self._num_rows
+        if not 0 <= index < self._num_rows:
+            raise IndexError("Row index out of range")
+        return {
+            name: column.get(index, self.time_zone)
+            for name, column in self._columns.items()
+        }
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self.row(index) for index in range(self._num_rows))
+
+    def take(self, indices: Iterable[int]) -> "ColumnarResult":
+        """Select the rows with the given indices"""
+        indices = list(indices)
+        result = type(self)()
+        result.time_zone = self.time_zone
+        result._columns = {
+            name: column.take(indices) for name, column in self._columns.items()
+        }
+        result._num_rows = len(indices)
+        return result
+
+    def where(self, name: str, predicate: Callable[[Any], bool]) -> "ColumnarResult":
+        """Select the rows for which the value of a property matches the predicate
+
+        For string properties, the predicate is only called once per distinct value.
+        """
+        column = self._columns[name]
+        if column.kind == "str":
+            matching_codes = {
+                code for code, string in enumerate(column.strings) if predicate(string)
+            }
+            include_nulls = predicate(None)
+            indices = (
+                index
+                for index in range(self._num_rows)
+                if (
+                    include_nulls
+                    if column.nulls[index]
+                    else column.values[index] in matching_codes
+                )
+            )
+        else:
+            indices = (
+                index
+                for index in range(self._num_rows)
+                if predicate(column.get(index, self.time_zone))
+            )
+        return self.take(indices)
+
+    def filter(self, predicate: Callable[[dict], bool]) -> "ColumnarResult":
+        """Select the rows for which the predicate is true"""
+        return self.take(index for index, row in enumerate(self) if predicate(row))
+
+    def to_csv(self, file: TextIO, columns: Optional[List[str]] = None) -> None:
+        """Write the rows as CSV, with a header with the names of the properties"""
+        columns = columns or self.columns
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for row in self:
+            writer.writerow([_format_value(row[name]) for name in columns])
+
+    def to_ndjson(self, file: TextIO, columns: Optional[List[str]] = None) -> None:
+        """Write the rows as newline delimited JSON"""
+        columns = columns or self.columns
+        for row in self:
+            file.write(json.dumps({name: _format_value(row[name]) for name in columns}))
+            file.write("\n")
+
+
+def _format_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
@@ -1,5 +1,5 @@
 import logging
-from contextlib import ContextDecorator
+from contextlib import ContextDecorator, contextmanager
 from threading import local
 
 from django.core import signals
@@ -9,7 +9,12 @@ import requests
 logger = logging.getLogger(__name__)
 
 
-__all__ = ["get_session", "use_cmis_connection_pool"]
+__all__ = [
+    "get_session",
+    "use_cmis_connection_pool",
+    "register_round_trip",
+    "track_round_trips",
+]
 
 
 class SessionHandler:
@@ -109,5 +114,42 @@ def use_cmis_connection_pool(func=None):
         return CMISConnectionPool()
 
 
+class RoundTripCounter:
+    def __init__(self):
+        self.count = 0
+
+
+_round_trips = local()
+
+
+def register_round_trip():
+    """Register a request made to the DMS with the active round-trip counters"""
+    for counter in getattr(_round_trips, "counters", []):
+        counter.count += 1
+
+
+@contextmanager
+def track_round_trips():
+    """
+    Count the number of requests made to the DMS in a given block.
+
+    Usage:
+
+        >>> with track_round_trips() as round_trips:
+        ...     client.update_document(...)
+        >>> round_trips.count
+        3
+    """
+    if not hasattr(_round_trips, "counters"):
+        _round_trips.counters = []
+
+    counter = RoundTripCounter()
+    _round_trips.counters.append(counter)
+    try:
+        yield counter
+    finally:
+        _round_trips.counters.remove(counter)
+
+
 # always clean up at the end of a request-response cycle by closing any open session
 signals.request_finished.connect(close_old_session)
@@ -0,0 +1,297 @@
+import hashlib
+import io
+import logging
+import mmap
+import os
+import tempfile
+import threading
+from typing import BinaryIO, Callable, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = ["get_content_cache", "ContentCache"]
+
+
+CHUNK_SIZE = 1024 * 1024
+
+# When the cache is full, files are removed until it is filled to this fraction of
+# its maximum size, so that the next writes don't trigger an eviction again
+EVICTION_TARGET = 0.9
+
+
+class CachedContentStream(io.RawIOBase):
+    """Read-only stream over a memory-mapped file of the content cache"""
+
+    def __init__(self, mapped_file: mmap.mmap):
+        super().__init__()
+        self._mmap = mapped_file
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._mmap.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return self._mmap.read()
+        return self._mmap.read(size)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._mmap.seek(offset, whence)
+        return self._mmap.tell()
+
+    def tell(self) -> int:
+        return self._mmap.tell()
+
+    def getbuffer(self) -> memoryview:
+        """Zero-copy view of the full content"""
+        return memoryview(self._mmap)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._mmap.close()
+        super().close()
+
+
+class ContentCache:
+    """
+    Size-bounded on-disk cache of the content of document versions.
+
+    The content of a document version never changes, so it is cached with the
+    objectId and the version label of the document as key. The private working copy
+    is never cached.
+
+    Files are written atomically (to a temporary file that is then renamed) together
+    with their SHA-256 checksum. The checksum is verified once per process, when a
+    file is written or first opened. Later hits only compare the inode and the size
+    of the file, so the content is not read. A running total of the size of the
+    cache is kept, and once it grows beyond the maximum size, the least recently
+    used files are removed.
+    """
+
+    def __init__(self, directory: str, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+        # The (inode, size) of the files whose checksum was verified, by key
+        self._verified = {}
+        # The total size of the cached files, unknown until the directory is scanned
+        self._size = None
+        self._size_lock = threading.Lock()
+
+    @staticmethod
+    def get_key(document) -> Optional[str]:
+        """Build the cache key of the content of a document version
+
+        :return: string, the key or None if the content should not be cached
+        """
+        properties = {
+            prop_name: document.properties.get(prop_name, {}).get("value")
+            for prop_name in (
+                "cmis:objectId",
+                "cmis:versionLabel",
+                "cmis:contentStreamLength",
+            )
+        }
+        if None in properties.values() or properties["cmis:versionLabel"] == "pwc":
+            return None
+
+        raw_key = "|".join(str(value) for value in properties.values())
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> Optional[CachedContentStream]:
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as content_file:
+                file_stat = os.fstat(content_file.fileno())
+                if file_stat.st_size == 0:
+                    mapped_file = None
+                else:
+                    mapped_file = mmap.mmap(
+                        content_file.fileno(), 0, access=mmap.ACCESS_READ
+                    )
+        except (FileNotFoundError, ValueError):
+            return None
+
+        file_id = (file_stat.st_ino, file_stat.st_size)
+        if self._verified.get(key) != file_id:
+            if not self._is_checksum_valid(path, mapped_file):
+                logger.warning(
+                    "CMIS_ADAPTER: Corrupt file in the content cache: %s", path
+                )
+                if mapped_file is not None:
+                    mapped_file.close()
+                self._remove(path)
+                return None
+            self._verified[key] = file_id
+
+        # Mark the file as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        if mapped_file is None:
+            return io.BytesIO()
+        return CachedContentStream(mapped_file)
+
+    def _is_checksum_valid(self, path: str, mapped_file: Optional[mmap.mmap]) -> bool:
+        try:
+            with open(f"{path}.sha256", "r") as checksum_file:
+                checksum = checksum_file.read().strip()
+        except FileNotFoundError:
+            return False
+
+        content_checksum = hashlib.sha256(
+            b"" if mapped_file is None else mapped_file
+        ).hexdigest()
+        return content_checksum == checksum
+
+    def set(self, key: str, content: BinaryIO) -> None:
+        path = self._get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        checksum = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(path), delete=False
+        ) as temp_file:
+            for chunk in iter(lambda: content.read(CHUNK_SIZE), b""):
+                checksum.update(chunk)
+                temp_file.write(chunk)
+                size += len(chunk)
+
+        with tempfile.NamedTemporaryFile(
+            "w", dir=os.path.dirname(path), delete=False
+        ) as temp_checksum_file:
+            temp_checksum_file.write(checksum.hexdigest())
+
+        try:
+            replaced_size = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced_size = 0
+
+        os.replace(temp_file.name, path)
+        os.replace(temp_checksum_file.name, f"{path}.sha256")
+
+        # The checksum was computed from the content that was written
+        self._verified[key] = (os.stat(path).st_ino, size)
+        self._add_size(size - replaced_size)
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], BinaryIO]) -> BinaryIO:
+        """Retrieve the content from the cache, or fetch and cache it
+
+        Only one thread of the process fetches the content of a given key, the
+        other threads wait for it and read the cached file.
+        """
+        cached_content = self.get(key)
+        if cached_content is not None:
+            return cached_content
+
+        with self._locks_lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            try:
+                cached_content = self.get(key)
+                if cached_content is not None:
+                    return cached_content
+
+                content = fetch()
+                try:
+                    self.set(key, content)
+                except OSError:
+                    logger.exception(
+                        "CMIS_ADAPTER: Could not write to the content cache"
+                    )
+            finally:
+                with self._locks_lock:
+                    self._locks.pop(key, None)
+
+        content.seek(0)
+        return content
+
+    def _remove(self, path: str) -> None:
+        self._verified.pop(os.path.basename(path), None)
+        for file_path in (path, f"{path}.sha256"):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+
+    def _add_size(self, size: int) -> None:
+        """Update the total size of the cache, and evict files if it is too large
+
+        The directory is only scanned the first time and when the cache is full, the
+        total is corrected then with the files written by other processes.
+        """
+        with self._size_lock:
+            if self._size is not None:
+                self._size += size
+                if self._size <= self.max_size:
+                    return
+            self._size = self._evict()
+
+    def _evict(self) -> int:
+        """Remove the least recently used files if the cache is too large
+
+        :return: int, the total size of the remaining files
+        """
+        files = []
+        total_size = 0
+        for subdirectory in os.scandir(self.directory):
+            if not subdirectory.is_dir():
+                continue
+            for entry in os.scandir(subdirectory.path):
+                if entry.name.endswith(".sha256") or entry.name.startswith("tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return total_size
+
+        # Remove the least recently used files first
+        for _mtime, size, path in sorted(files):
+            self._remove(path)
+            total_size -= size
+            if total_size <= self.max_size * EVICTION_TARGET:
+                break
+        return total_size
+
+
+_content_caches = {}
+
+
+def get_content_cache() -> Optional[ContentCache]:
+    """Get the content cache configured with ``CMIS_CONTENT_CACHE_DIR``, if any"""
+    directory = getattr(settings, "CMIS_CONTENT_CACHE_DIR", None)
+    if not directory:
+        return None
+
+    if directory not in _content_caches:
+        _content_caches[directory] = ContentCache(
+            directory,
+            max_size=getattr(settings, "CMIS_CONTENT_CACHE_MAX_SIZE", 1024**3),
+        )
+    return _content_caches[directory]
@@ -0,0 +1,118 @@
+import logging
+from contextlib import ContextDecorator
+from threading import local
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    "use_identity_map",
+    "get_from_identity_map",
+    "add_to_identity_map",
+    "clear_identity_map",
+]
+
+
+_state = local()
+
+
+def _get_objects() -> Optional[dict]:
+    if getattr(_state, "num_blocks", 0) <= 0:
+        return None
+    return _state.objects
+
+
+def get_from_identity_map(key_type: str, key: str) -> Optional[Any]:
+    """
+    Retrieve an object that was already fetched in the active identity map block.
+
+    :param key_type: string, either "objectId" or "uuid"
+    :param key: string, the objectId or drc:document__uuid of the object
+    :return: the object, or None if it is not known (or no block is active)
+    """
+    objects = _get_objects()
+    if objects is None or not key:
+        return None
+    return objects.get((key_type, str(key)))
+
+
+def add_to_identity_map(obj: Any, drc_uuid: Optional[str] = None) -> None:
+    """
+    Remember a fetched object by its objectId and, if given, by its uuid.
+
+    Only the latest version (or PWC) of a document should be remembered by uuid, as
+    the older versions share the same drc:document__uuid.
+
+    :param obj: the object fetched from the DMS
+    :param drc_uuid: string, the drc:document__uuid the object was retrieved with
+    """
+    objects = _get_objects()
+    if objects is None or obj is None:
+        return
+
+    object_id = obj.properties.get("cmis:objectId", {}).get("value")
+    if object_id:
+        objects[("objectId", object_id)] = obj
+    if drc_uuid:
+        objects[("uuid", str(drc_uuid))] = obj
+
+
+def clear_identity_map() -> None:
+    """Forget all the objects, for example because the DMS has been written to"""
+    objects = _get_objects()
+    if objects:
+        logger.debug("Clearing the identity map (%d entries)", len(objects))
+        objects.clear()
+
+
+class IdentityMap(ContextDecorator):
+    """
+    Serve repeated reads of the same CMIS documents from memory in a given block.
+
+    An instance can be used either as a decorator or as a context manager.
+
+    Inside the block, documents retrieved by uuid or objectId are remembered. Any
+    write operation of the adapter clears the map, so that stale objects are never
+    returned. After the outer block is executed, the map is discarded.
+    """
+
+    def __enter__(self):
+        if getattr(_state, "num_blocks", 0) <= 0:
+            _state.num_blocks = 0
+            _state.objects = {}
+        _state.num_blocks += 1
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _state.num_blocks -= 1
+        logger.debug(
+            "Exiting IdentityMap block, there are %d blocks left", _state.num_blocks
+        )
+
+        if _state.num_blocks <= 0:
+            del _state.objects
+
+
+def use_identity_map(func=None):
+    """
+    Decorator or context manager to use a request-scoped identity map.
+
+    Typically used together with
+    :func:`drc_cmis.connections.use_cmis_connection_pool`.
+
+    Usage:
+
+        >>> @use_cmis_connection_pool
+        ... @use_identity_map
+        ... def some_view(request):
+        ...     document = client.get_document(drc_uuid)
+        ...     ...
+        ...     # No request is made to the DMS
+        ...     document = client.get_document(drc_uuid)
+    """
+    # @use_identity_map bare decorator syntax
+    if callable(func):
+        return IdentityMap()(func)
+    # @use_identity_map() or context manager: with use_identity_map(): ...
+    else:
+        return IdentityMap()
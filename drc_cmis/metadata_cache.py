@@ -0,0 +1,82 @@
+import logging
+from typing import Any, Optional
+
+from .cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    "get_cached_document_properties",
+    "cache_document_properties",
+    "invalidate_document_properties",
+]
+
+
+def get_cached_document_properties(drc_uuid: str) -> Optional[dict]:
+    """
+    Retrieve the cached properties of the latest version of a document.
+
+    :param drc_uuid: string, the value of drc:document__uuid
+    :return: dict, the properties in the format of the objects retrieved from the
+        DMS, or None if the document is not cached (or caching is disabled)
+    """
+    cache = get_cache("metadata")
+    if cache is None or not drc_uuid:
+        return None
+
+    entry = cache.get(drc_uuid)
+    if entry is None:
+        return None
+
+    logger.debug(
+        "CMIS_ADAPTER: Using the cached properties of document %s (version %s)",
+        drc_uuid,
+        entry["versionLabel"],
+    )
+    return {
+        prop_name: {"value": value} for prop_name, value in entry["properties"].items()
+    }
+
+
+def cache_document_properties(document: Any, drc_uuid: str) -> None:
+    """
+    Store the properties of the latest version of a document.
+
+    Documents that are checked out are not cached, since their private working copy
+    is about to change. The entry is tagged with the ``cmis:versionLabel`` and
+    ``cmis:changeToken`` of the cached version. These are only compared with the DMS
+    if ``CMIS_METADATA_CACHE_VALIDATE`` is enabled, otherwise the entry is used
+    until it is invalidated by a write of the adapter or it expires.
+
+    :param document: Document, the document retrieved from the DMS
+    :param drc_uuid: string, the value of drc:document__uuid
+    """
+    cache = get_cache("metadata")
+    if cache is None or document is None or not drc_uuid:
+        return
+
+    properties = {
+        prop_name: prop_details.get("value")
+        for prop_name, prop_details in document.properties.items()
+    }
+    if properties.get("cmis:isVersionSeriesCheckedOut") or (
+        properties.get("cmis:versionLabel") == "pwc"
+    ):
+        return
+
+    entry = {
+        "versionLabel": properties.get("cmis:versionLabel"),
+        "changeToken": properties.get("cmis:changeToken"),
+        "properties": properties,
+    }
+    cache.set(drc_uuid, entry)
+
+
+def invalidate_document_properties(drc_uuid: str) -> None:
+    """Remove the cached properties of a document, after it was written to"""
+    cache = get_cache("metadata")
+    if cache is None or not drc_uuid:
+        return
+
+    cache.delete(drc_uuid)
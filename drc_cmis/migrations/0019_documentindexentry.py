@@ -0,0 +1,48 @@
+# Generated by Django 4.1.13 on 2026-10-19 10:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("drc_cmis", "0018_alter_cmisconfig_time_zone"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentIndexEntry",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "uuid",
+                    models.CharField(
+                        help_text="Value of the drc:document__uuid property of the document.",
+                        max_length=255,
+                        unique=True,
+                        verbose_name="UUID",
+                    ),
+                ),
+                (
+                    "version_series_id",
+                    models.CharField(
+                        help_text="Value of the cmis:versionSeriesId property of the document.",
+                        max_length=1000,
+                        verbose_name="version series ID",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "document index entry",
+                "verbose_name_plural": "document index entries",
+            },
+        ),
+    ]
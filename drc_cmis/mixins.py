@@ -1,7 +1,13 @@
 from typing import Optional, TypeVar
 
+from .metadata_cache import invalidate_document_properties
+
 ZaakFolder = TypeVar("ZaakFolder")
 
+# The properties needed to find the document referred to by an OIO. The other
+# properties of the document are only retrieved when they are used.
+RELATED_DOCUMENT_PROPERTIES = ["drc:document__uuid", "drc:kopie_van"]
+
 
 class RearrangeFilesOnDeleteMixin:
     _zaakfolder = None
@@ -10,7 +16,10 @@ class RearrangeFilesOnDeleteMixin:
     def zaakfolder(self) -> Optional["ZaakFolder"]:
         if not self._zaakfolder and self.zaak:
             self._zaakfolder = self.client.query(
-                "zaak", lhs=["drc:zaak__url = '%s'"], rhs=[self.zaak]
+                "zaak",
+                lhs=["drc:zaak__url = '%s'"],
+                rhs=[self.zaak],
+                properties=["cmis:name"],
             )[0]
         return self._zaakfolder
 
@@ -27,21 +36,33 @@ class RearrangeFilesOnDeleteMixin:
 
         see issue #32 for more details.
         """
+        # The 'Related data' folder of the zaak folder, containing the OIO
+        related_data_folder = self.get_parent_folders()[0]
+
         document_to_unrelate = self._get_related_document()
-        gebruiksrechten_file = self._get_gebruiksrechten()
+        if document_to_unrelate is None:
+            # Already logged, there is nothing to reorganise
+            return
+        gebruiksrechten_file = self._get_gebruiksrechten(related_data_folder)
 
-        if document_to_unrelate and document_to_unrelate.kopie_van:
+        if document_to_unrelate.kopie_van:
             document_to_unrelate.delete_object()
             if gebruiksrechten_file:
                 gebruiksrechten_file.delete_object()
         else:
             default_folder = self.client.get_or_create_other_folder()
-            document_to_unrelate.move_object(default_folder)
+            document_to_unrelate.move_object(
+                default_folder, source_folder=self.zaakfolder
+            )
             if gebruiksrechten_file:
                 default_related_data_folder = self.client.get_or_create_folder(
                     "Related data", default_folder
                 )
-                gebruiksrechten_file.move_object(default_related_data_folder)
+                gebruiksrechten_file.move_object(
+                    default_related_data_folder, source_folder=related_data_folder
+                )
+
+        invalidate_document_properties(document_to_unrelate.uuid)
 
     def delete_object(self) -> None:
         if self.object_type == "zaak":
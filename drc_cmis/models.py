@@ -7,6 +7,7 @@ from django.utils.translation import gettext_lazy as _
 import pytz
 from solo.models import SingletonModel
 
+from .cache import get_cache
 from .utils.exceptions import NoOtherBaseFolderException, NoZaakBaseFolderException
 from .utils.folder import get_folder_structure
 from .validators import (
@@ -79,6 +80,13 @@ class CMISConfig(SingletonModel):
     class Meta:
         verbose_name = "CMIS Configuration"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        config_cache = get_cache("config")
+        if config_cache is not None:
+            config_cache.delete("solo")
+
     def get_zaak_base_folder_name(self) -> str:
         folders = get_folder_structure(self.zaak_folder_path)
         if len(folders) > 0:
@@ -134,3 +142,31 @@ class UrlMapping(models.Model):
 
     def __string__(self):
         return f"{self.long_pattern}: {self.short_pattern}"
+
+
+class DocumentIndexEntry(models.Model):
+    """
+    Link between the uuid of a document and the ID of its version series in the DMS.
+
+    With this index, documents can be retrieved by ID instead of with a query on
+    their uuid. See the ``CMIS_DOCUMENT_INDEX_ENABLED`` setting.
+    """
+
+    uuid = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name=_("UUID"),
+        help_text=_("Value of the drc:document__uuid property of the document."),
+    )
+    version_series_id = models.CharField(
+        max_length=1000,
+        verbose_name=_("version series ID"),
+        help_text=_("Value of the cmis:versionSeriesId property of the document."),
+    )
+
+    class Meta:
+        verbose_name = _("document index entry")
+        verbose_name_plural = _("document index entries")
+
+    def __str__(self):
+        return f"{self.uuid}: {self.version_series_id}"
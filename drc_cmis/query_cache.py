@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import uuid
+from typing import Any, List, Optional
+
+from django.conf import settings
+
+from .cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    "get_cached_query_results",
+    "cache_query_results",
+    "invalidate_queries",
+]
+
+
+def _get_timeout(type_name: str) -> Optional[int]:
+    timeouts = getattr(settings, "CMIS_QUERY_CACHE_TIMEOUTS", None) or {}
+    return timeouts.get(type_name)
+
+
+def _get_generation(cache, type_name: str) -> str:
+    """Get the current generation of the cached queries of a type
+
+    The generation is part of the keys of the cached results, so changing it makes
+    all the cached results of the type unreachable.
+    """
+    generation_key = f"{type_name}:generation"
+    generation = cache.get(generation_key)
+    if generation is None:
+        cache.add(generation_key, uuid.uuid4().hex, timeout=None)
+        generation = cache.get(generation_key)
+    return generation
+
+
+def _make_key(cache, type_name: str, statement: str) -> str:
+    normalized_statement = " ".join(statement.split())
+    statement_hash = hashlib.sha256(normalized_statement.encode("utf-8")).hexdigest()
+    generation = _get_generation(cache, type_name)
+    return f"{type_name}:{generation}:{statement_hash}"
+
+
+def get_cached_query_results(type_name: str, statement: str) -> Optional[List[dict]]:
+    """
+    Retrieve the cached results of a query.
+
+    :param type_name: string, the type of the queried objects (e.g. "oio")
+    :param statement: string, the CMIS query statement
+    :return: list of dicts, the properties of the results in the format of the
+        objects retrieved from the DMS, or None if the results are not cached
+    """
+    if _get_timeout(type_name) is None:
+        return None
+
+    cache = get_cache("queries")
+    cached_results = cache.get(_make_key(cache, type_name, statement))
+    if cached_results is None:
+        return None
+
+    logger.debug("CMIS_ADAPTER: Using cached results for query: %s", statement)
+    return [
+        {prop_name: {"value": value} for prop_name, value in properties.items()}
+        for properties in cached_results
+    ]
+
+
+def cache_query_results(type_name: str, statement: str, results: List[Any]) -> None:
+    """
+    Store the results of a query.
+
+    Only the property values of the objects are stored.
+
+    :param type_name: string, the type of the queried objects (e.g. "oio")
+    :param statement: string, the CMIS query statement
+    :param results: list, the objects returned by the query
+    """
+    timeout = _get_timeout(type_name)
+    if timeout is None:
+        return
+
+    cached_results = [
+        {
+            prop_name: prop_details.get("value")
+            for prop_name, prop_details in result.properties.items()
+        }
+        for result in results
+    ]
+    cache = get_cache("queries")
+    cache.set(_make_key(cache, type_name, statement), cached_results, timeout=timeout)
+
+
+def invalidate_queries(*type_names: str) -> None:
+    """Make the cached results of the queries of the given types unreachable
+
+    Without types, the cached results of all the types are invalidated.
+    """
+    timeouts = getattr(settings, "CMIS_QUERY_CACHE_TIMEOUTS", None) or {}
+    type_names = [
+        type_name for type_name in (type_names or timeouts) if type_name in timeouts
+    ]
+    if not type_names:
+        return
+
+    get_cache("queries").set_many(
+        {f"{type_name}:generation": uuid.uuid4().hex for type_name in type_names},
+        timeout=None,
+    )
@@ -0,0 +1,95 @@
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, TypeVar
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = ["coalesce", "make_key", "register_write"]
+
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+_calls = {}
+_lock = threading.Lock()
+
+# Incremented after every write, so that reads started after a write never wait for
+# the result of a read that was started before it
+_write_generation = 0
+
+
+def register_write() -> None:
+    """Mark that a write operation to the DMS was completed"""
+    global _write_generation
+    with _lock:
+        _write_generation += 1
+
+
+def make_key(*parts: Any) -> str:
+    """Build the key of a request from the parts that identify it
+
+    The parts (which include the credentials) are hashed, so that the key can be
+    kept in memory and shown in tracebacks without revealing them.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def coalesce(key: str, func: Callable[[], T]) -> T:
+    """
+    Collapse identical concurrent read requests of the process into one.
+
+    The first thread that makes a request with the given key calls ``func``, the
+    threads that make the same request while it is in flight wait for it and receive
+    the same result (or exception). The result should be immutable or be treated as
+    such, e.g. a ``requests.Response`` of which the body is parsed by every caller.
+
+    Can be disabled with the setting ``CMIS_SINGLE_FLIGHT_ENABLED``.
+
+    :param key: string, identifies the request, including the credentials. Built
+        with ``make_key``.
+    :param func: callable that makes the request
+    :return: the result of ``func``
+    """
+    if not getattr(settings, "CMIS_SINGLE_FLIGHT_ENABLED", True):
+        return func()
+
+    with _lock:
+        key = (_write_generation, key)
+        call = _calls.get(key)
+        is_leader = call is None
+        if is_leader:
+            call = _calls[key] = _Call()
+
+    if not is_leader:
+        logger.debug("CMIS_ADAPTER: Waiting for identical request in flight")
+        call.done.wait()
+        if call.exception is not None:
+            raise call.exception
+        return call.result
+
+    try:
+        call.result = func()
+    except BaseException as exc:
+        call.exception = exc
+        raise
+    finally:
+        with _lock:
+            del _calls[key]
+        call.done.set()
+
+    return call.result
@@ -4,6 +4,8 @@ from typing import List
 
 from django.core.exceptions import ValidationError
 
+from ..cache import get_cache
+
 PathElement = namedtuple("PathElement", ["folder_name", "object_type"])
 PathElementTemplate = namedtuple("PathElementTemplate", ["folder_name", "required"])
 
@@ -67,3 +69,22 @@ def get_folder_structure(path: str) -> List[PathElement]:
         )
 
     return result
+
+
+def get_folder_cache_key(parent_id: str, name: str) -> str:
+    """The key of a folder in the "folders" cache"""
+    return f"{parent_id}:{name}"
+
+
+def forget_folder(folder) -> None:
+    """Remove a folder from the "folders" cache, after it was deleted
+
+    The cached subfolders are keyed by the objectId of this folder, which is not
+    used anymore, so they don't need to be removed.
+    """
+    folder_cache = get_cache("folders")
+    if folder_cache is None:
+        return
+
+    parent_id = folder.properties.get("cmis:parentId", {}).get("value")
+    folder_cache.delete(get_folder_cache_key(parent_id, folder.name))
@@ -1,3 +1,46 @@
+import datetime
+import re
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Optional
+from uuid import UUID
+
+import pytz
+
+
+def escape(value: str) -> str:
+    """
+    Escapes the characters in value for the CMIS queries.
+
+    Poor documentation references:
+      * https://community.alfresco.com/docs/DOC-5898-cmis-query-language#Literals
+      * http://docs.alfresco.com/community/concepts/rm-searchsyntax-literals.html
+    """
+    return value.replace("'", "\\'").replace('"', '\\"')
+
+
+def format_literal(value: Any) -> str:
+    """Format a value as a literal of the CMIS query language
+
+    Strings (and UUIDs) are quoted and escaped, booleans and numbers are used as is
+    and dates and datetimes are formatted as TIMESTAMP literals.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(pytz.utc).replace(tzinfo=None)
+            return f"TIMESTAMP '{value.isoformat(timespec='milliseconds')}Z'"
+        return f"TIMESTAMP '{value.isoformat(timespec='milliseconds')}'"
+    if isinstance(value, datetime.date):
+        return f"TIMESTAMP '{value.isoformat()}T00:00:00.000Z'"
+    if isinstance(value, (str, UUID)):
+        return "'%s'" % escape(str(value))
+    raise TypeError(f"Values of type {type(value).__name__} can't be used in a query")
+
+
 class CMISQuery:
     """
     Small, not feature-complete utility class for building CMIS queries with
@@ -17,17 +60,378 @@ class CMISQuery:
         return self.query % args
 
     def escape(self, value):
-        """
-        Escapes the characters in value for the CMIS queries.
-
-        Poor documentation references:
-          * https://community.alfresco.com/docs/DOC-5898-cmis-query-language#Literals
-          * http://docs.alfresco.com/community/concepts/rm-searchsyntax-literals.html
-        """
-        # if isinstance(value, uuid.UUID):
-        #     value = str(value).replace('-', '').replace('-', '').replace('-', '').replace('-', '')
-
         if isinstance(value, str):
-            value = value.replace("'", "\\'")
-            value = value.replace('"', '\\"')
+            value = escape(value)
         return value
+
+
+# Properties that are always retrieved, so that partial objects can be identified
+# and their other properties can be retrieved later
+REQUIRED_PROPERTIES = ["cmis:objectId", "cmis:objectTypeId"]
+
+
+def build_select_list(properties: Optional[List[str]] = None) -> str:
+    """Build the list of columns selected by a query
+
+    :param properties: list of strings, the CMIS properties to select. If not given,
+        all the properties are selected.
+    :return: string, the column list, e.g. "cmis:objectId, drc:document__uuid"
+    """
+    if not properties:
+        return "*"
+    return ", ".join(dict.fromkeys(REQUIRED_PROPERTIES + list(properties)))
+
+
+def build_property_filter(properties: Optional[List[str]] = None) -> Optional[str]:
+    """Build the ``filter`` parameter of getObject/getChildren requests
+
+    :param properties: list of strings, the CMIS properties to retrieve
+    :return: string, the filter or None if all the properties are retrieved
+    """
+    if not properties:
+        return None
+    return ",".join(dict.fromkeys(REQUIRED_PROPERTIES + list(properties)))
+
+
+class Predicate:
+    """
+    A condition of the WHERE clause of a query.
+
+    The shape of a predicate is the part of it that determines the template of the
+    statement (the columns and operators), its literals are the formatted values
+    that are substituted in the template. Statements with the same shape are only
+    compiled once.
+    """
+
+    def get_shape(self) -> tuple:
+        raise NotImplementedError
+
+    def get_literals(self) -> List[str]:
+        raise NotImplementedError
+
+    def map_values(self, func: Callable[[str, Any], Any]) -> "Predicate":
+        """Return the predicate with the values replaced by ``func(column, value)``"""
+        return self
+
+    @classmethod
+    def render(cls, shape: tuple) -> str:
+        """Render the template of a predicate with the given shape"""
+        raise NotImplementedError
+
+    def get_statement(self) -> str:
+        return compile_predicate(self.get_shape()) % tuple(self.get_literals())
+
+
+@lru_cache(maxsize=512)
+def compile_predicate(shape: tuple) -> str:
+    return shape[0].render(shape)
+
+
+class Comparison(Predicate):
+    """Compare a column with a value, e.g. ``drc:document__titel = 'summary'``"""
+
+    operators = ["=", "<>", "<", "<=", ">", ">=", "LIKE"]
+
+    def __init__(self, column: str, value: Any, operator: str = "="):
+        assert operator in self.operators, f"Unknown operator {operator}"
+        self.column = column
+        self.value = value
+        self.operator = operator
+
+    def get_shape(self) -> tuple:
+        return (Comparison, self.column, self.operator)
+
+    def get_literals(self) -> List[str]:
+        return [format_literal(self.value)]
+
+    def map_values(self, func: Callable[[str, Any], Any]) -> "Comparison":
+        return Comparison(self.column, func(self.column, self.value), self.operator)
+
+    @classmethod
+    def render(cls, shape: tuple) -> str:
+        _cls, column, operator = shape
+        return f"{column} {operator} %s"
+
+
+class In(Predicate):
+    """Check whether a column has one of the given values"""
+
+    def __init__(self, column: str, values: Iterable[Any], negate: bool = False):
+        self.column = column
+        self.values = list(values)
+        self.negate = negate
+        if not self.values:
+            raise ValueError("An IN predicate needs at least one value")
+
+    def get_shape(self) -> tuple:
+        # The number of values is part of the shape, so that the statements of lists
+        # of the same length share their template
+        return (In, self.column, len(self.values), self.negate)
+
+    def get_literals(self) -> List[str]:
+        return [format_literal(value) for value in self.values]
+
+    def map_values(self, func: Callable[[str, Any], Any]) -> "In":
+        values = [func(self.column, value) for value in self.values]
+        return In(self.column, values, negate=self.negate)
+
+    @classmethod
+    def render(cls, shape: tuple) -> str:
+        _cls, column, num_values, negate = shape
+        operator = "NOT IN" if negate else "IN"
+        return f"{column} {operator} ({', '.join(['%s'] * num_values)})"
+
+
+class IsNull(Predicate):
+    def __init__(self, column: str, negate: bool = False):
+        self.column = column
+        self.negate = negate
+
+    def get_shape(self) -> tuple:
+        return (IsNull, self.column, self.negate)
+
+    def get_literals(self) -> List[str]:
+        return []
+
+    @classmethod
+    def render(cls, shape: tuple) -> str:
+        _cls, column, negate = shape
+        return f"{column} IS NOT NULL" if negate else f"{column} IS NULL"
+
+
+class InFolder(Predicate):
+    """Check whether the objects are in the folder with the given objectId"""
+
+    function = "IN_FOLDER"
+
+    def __init__(self, folder_id: str):
+        self.folder_id = str(folder_id)
+
+    def get_shape(self) -> tuple:
+        return (type(self),)
+
+    def get_literals(self) -> List[str]:
+        return [format_literal(self.folder_id)]
+
+    @classmethod
+    def render(cls, shape: tuple) -> str:
+        return f"{cls.function}(%s)"
+
+
+class InTree(InFolder):
+    """Check whether the objects are in the folder with the given objectId or in
+    one of its descendant folders"""
+
+    function = "IN_TREE"
+
+
+class Raw(Predicate):
+    """
+    A condition written as a template with ``%s`` placeholders, for example
+    ``"drc:zaak__url = '%s'"``. The values are only escaped, so the template has to
+    contain the quotes.
+    """
+
+    def __init__(self, template: str, values: Iterable[Any] = ()):
+        self.template = template
+        self.values = list(values)
+
+    def get_shape(self) -> tuple:
+        return (Raw, self.template)
+
+    def get_literals(self) -> List[str]:
+        return [
+            escape(value) if isinstance(value, str) else value for value in self.values
+        ]
+
+    @classmethod
+    def render(cls, shape: tuple) -> str:
+        return shape[1]
+
+
+class And(Predicate):
+    joiner = " AND "
+
+    def __init__(self, *predicates: Predicate):
+        self.predicates = predicates
+
+    def get_shape(self) -> tuple:
+        return (type(self), tuple(p.get_shape() for p in self.predicates))
+
+    def get_literals(self) -> List[str]:
+        return [
+            literal
+            for predicate in self.predicates
+            for literal in predicate.get_literals()
+        ]
+
+    def map_values(self, func: Callable[[str, Any], Any]) -> "And":
+        return type(self)(
+            *[predicate.map_values(func) for predicate in self.predicates]
+        )
+
+    @classmethod
+    def render(cls, shape: tuple) -> str:
+        return cls.joiner.join(compile_predicate(child) for child in shape[1])
+
+
+class Or(And):
+    joiner = " OR "
+
+    @classmethod
+    def render(cls, shape: tuple) -> str:
+        # Always in parentheses, so that it can be combined with other predicates
+        return "(%s)" % super().render(shape)
+
+
+class Query:
+    """
+    A SELECT statement of the CMIS query language.
+
+    Usage:
+    >>> query = Query("drc:document", [Comparison("drc:document__uuid", "some-uuid")])
+    >>> query.get_statement()
+    "SELECT * FROM drc:document WHERE drc:document__uuid = 'some-uuid'"
+
+    The template of the statement is compiled once for every shape of the query and
+    cached, so building a statement only requires formatting the values.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        where: List[Predicate] = None,
+        properties: List[str] = None,
+        order_by: List[str] = None,
+    ):
+        self.table = table
+        self.where = And(*where) if where else None
+        self.properties = properties
+        self.order_by = order_by
+
+    def get_shape(self) -> tuple:
+        return (
+            self.table,
+            build_select_list(self.properties),
+            self.where.get_shape() if self.where else None,
+            tuple(self.order_by or ()),
+        )
+
+    def get_literals(self) -> List[str]:
+        return self.where.get_literals() if self.where else []
+
+    def map_values(self, func: Callable[[str, Any], Any]) -> "Query":
+        """Return the query with the values replaced by ``func(column, value)``"""
+        where = [self.where.map_values(func)] if self.where else None
+        return Query(self.table, where, self.properties, self.order_by)
+
+    def get_statement(self) -> str:
+        return compile_query(self.get_shape()) % tuple(self.get_literals())
+
+    def __str__(self):
+        return self.get_statement()
+
+
+@lru_cache(maxsize=512)
+def compile_query(shape: tuple) -> str:
+    """Compile the template of the statement of a query with the given shape"""
+    table, columns, where, order_by = shape
+    statement = f"SELECT {columns} FROM {table}"
+    if where is not None:
+        statement += f" WHERE {compile_predicate(where)}"
+    if order_by:
+        statement += f" ORDER BY {', '.join(order_by)}"
+    return statement
+
+
+SIMPLE_CONDITION = re.compile(
+    r"^\s*(?P<column>[\w:.]+)\s*(?P<operator>=|<>|<=|>=|<|>|LIKE)\s*'%s'\s*$",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=512)
+def _parse_condition(template: str) -> Optional[tuple]:
+    match = SIMPLE_CONDITION.match(template)
+    if match is None:
+        return None
+    return match.group("column"), match.group("operator").upper()
+
+
+def parse_conditions(lhs: List[str] = None, rhs: List[str] = None) -> List[Predicate]:
+    """Convert the conditions of the ``lhs``/``rhs`` style to predicates
+
+    Simple comparisons like ``"drc:zaak__url = '%s'"`` become :class:`Comparison`
+    predicates, the other conditions are kept as :class:`Raw` templates.
+
+    :param lhs: list of strings, the conditions with ``%s`` placeholders
+    :param rhs: list of strings, the values of all the placeholders
+    :return: list of predicates
+    """
+    values = list(rhs or [])
+    predicates = []
+    for template in lhs or []:
+        num_values = template.count("%s")
+        template_values, values = values[:num_values], values[num_values:]
+
+        parsed = _parse_condition(template)
+        if parsed is not None and len(template_values) == 1:
+            column, operator = parsed
+            # The template quotes the value, so it is compared as a string
+            predicates.append(Comparison(column, str(template_values[0]), operator))
+        else:
+            predicates.append(Raw(template, template_values))
+    return predicates
+
+
+def build_filter_predicates(filters: dict, object_type: str = None) -> List[Predicate]:
+    """Convert the filters of a ``get_document`` call to predicates
+
+    :param filters: dict, the names of the properties and the values to filter on.
+        The values "NULL" and "NOT NULL" check if the property is empty, lists match
+        any of their values.
+    :param object_type: string, the type of object of the properties. If not given,
+        the property is looked up in all the mappings.
+    :return: list of predicates
+    """
+    from drc_cmis.utils.mapper import mapper
+
+    predicates = []
+    for key, value in (filters or {}).items():
+        if object_type is not None:
+            column = mapper(key, type=object_type) or key
+        else:
+            column = next(
+                (
+                    mapper(key, type=mapping_type)
+                    for mapping_type in [
+                        "document",
+                        "connection",
+                        "gebruiksrechten",
+                        "oio",
+                    ]
+                    if mapper(key, type=mapping_type)
+                ),
+                key,
+            )
+
+        if isinstance(value, list):
+            sub_predicates = [_build_filter_predicate(column, item) for item in value]
+            sub_predicates = [predicate for predicate in sub_predicates if predicate]
+            if sub_predicates:
+                predicates.append(Or(*sub_predicates))
+        else:
+            predicate = _build_filter_predicate(column, value)
+            if predicate is not None:
+                predicates.append(predicate)
+    return predicates
+
+
+def _build_filter_predicate(column: str, value: Any) -> Optional[Predicate]:
+    if value in ["NULL", "NOT NULL"]:
+        return IsNull(column, negate=value == "NOT NULL")
+    if isinstance(value, Decimal):
+        return Comparison(column, value)
+    if value:
+        return Comparison(column, str(value))
+    return None
@@ -1,7 +1,12 @@
+import datetime
 from decimal import Decimal
-from typing import List, TypeVar
+from typing import Any, List, TypeVar
 
+from django.utils import timezone
 from django.utils.crypto import get_random_string as _get_random_string
+from django.utils.dateparse import parse_date, parse_datetime
+
+import pytz
 
 from drc_cmis.utils.exceptions import DocumentDoesNotExistError
 
@@ -13,6 +18,61 @@ def get_random_string(number: int = 6) -> str:
     return _get_random_string(length=number, allowed_chars=allowed_chars)
 
 
+def _normalize_property_value(value: Any, reference: Any = None) -> Any:
+    """Normalize a property value so that it can be compared with ``reference``
+
+    Values may be sent to the DMS as strings (e.g. ``"true"``, ``"2020-07-27"``) while
+    the DMS returns decoded values. The value is coerced to the type of the reference
+    value (if any), and empty strings are treated as ``None``.
+    """
+    if value == "":
+        return None
+
+    if isinstance(value, str):
+        if isinstance(reference, bool):
+            return value.lower() == "true"
+        elif isinstance(reference, (int, float, Decimal)):
+            try:
+                return Decimal(value)
+            except ArithmeticError:
+                return value
+        elif isinstance(reference, (datetime.date, datetime.datetime)):
+            value = parse_datetime(value) or parse_date(value) or value
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return Decimal(str(value))
+
+    if isinstance(value, datetime.datetime):
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, pytz.utc)
+        if isinstance(reference, datetime.date) and not isinstance(
+            reference, datetime.datetime
+        ):
+            return value.astimezone(pytz.utc).date()
+        return value
+
+    return value
+
+
+def property_values_equal(current: Any, new: Any) -> bool:
+    """Check whether the new value of a property is equal to its current value
+
+    :param current: the value of the property as returned by the DMS
+    :param new: the value of the property that would be sent to the DMS
+    :return: bool
+    """
+    current = _normalize_property_value(current)
+    new = _normalize_property_value(new, reference=current)
+
+    # Dates are stored in the DMS as datetimes
+    if isinstance(current, datetime.datetime) and (
+        isinstance(new, datetime.date) and not isinstance(new, datetime.datetime)
+    ):
+        current = current.astimezone(pytz.utc).date()
+
+    return current == new
+
+
 def build_query_filters(
     filters: dict,
     object_type: str = None,
@@ -20,37 +80,10 @@ def build_query_filters(
     strip_end: bool = False,
 ):
     """Build filters for SQL query"""
-    from drc_cmis.utils.mapper import mapper
-
-    if filters:
-        for key, value in filters.items():
-            if object_type is None:
-                if mapper(key):
-                    key = mapper(key)
-                elif mapper(key, type="connection"):
-                    key = mapper(key, type="connection")
-                elif mapper(key, type="gebruiksrechten"):
-                    key = mapper(key, type="gebruiksrechten")
-                elif mapper(key, type="oio"):
-                    key = mapper(key, type="oio")
-            else:
-                key = mapper(key, type=object_type)
-
-            if value and value in ["NULL", "NOT NULL"]:
-                filter_string += f"{key} IS {value} AND "
-            elif isinstance(value, Decimal):
-                filter_string += f"{key} = {value} AND "
-            elif isinstance(value, list):
-                if len(value) == 0:
-                    continue
-                filter_string += "( "
-                for item in value:
-                    sub_filter_string = build_query_filters({key: item}, strip_end=True)
-                    filter_string += f"{sub_filter_string} OR "
-                filter_string = filter_string[:-3]
-                filter_string += " ) AND "
-            elif value:
-                filter_string += f"{key} = '{value}' AND "
+    from drc_cmis.utils.query import build_filter_predicates
+
+    for predicate in build_filter_predicates(filters, object_type=object_type):
+        filter_string += f"{predicate.get_statement()} AND "
 
     if strip_end and filter_string[-4:] == "AND ":
         filter_string = filter_string[:-4]
@@ -1,5 +1,4 @@
 import logging
-import re
 import uuid
 from io import BytesIO
 from typing import BinaryIO, List, Optional, Tuple, Union
@@ -10,8 +9,11 @@ from django.utils.crypto import constant_time_compare
 
 from cmislib.domain import CmisId
 
-from drc_cmis.client import CMISClient
+from drc_cmis.client import CMISClient, QueryPage
+from drc_cmis.metadata_cache import invalidate_document_properties
+from drc_cmis.query_cache import invalidate_queries
 from drc_cmis.utils.exceptions import (
+    CmisNotSupportedException,
     CmisRepositoryDoesNotExist,
     CmisRuntimeException,
     CmisUpdateConflictException,
@@ -24,12 +26,13 @@ from drc_cmis.utils.exceptions import (
     LockDidNotMatchException,
 )
 from drc_cmis.utils.mapper import mapper, reverse_mapper
-from drc_cmis.utils.query import CMISQuery
-from drc_cmis.utils.utils import (
-    build_query_filters,
-    extract_latest_version,
-    get_random_string,
+from drc_cmis.utils.query import (
+    Comparison,
+    Query,
+    build_filter_predicates,
+    build_property_filter,
 )
+from drc_cmis.utils.utils import extract_latest_version, get_random_string
 from drc_cmis.webservice.data_models import (
     EnkelvoudigInformatieObject,
     Gebruiksrechten as GebruiksRechtDoc,
@@ -50,6 +53,8 @@ from drc_cmis.webservice.drc_document import (
 )
 from drc_cmis.webservice.request import SOAPRequest
 from drc_cmis.webservice.utils import (
+    extract_has_more_items,
+    extract_num_items,
     extract_object_properties_from_xml,
     extract_repository_ids_from_xml,
     extract_xml_from_soap,
@@ -59,6 +64,7 @@ from drc_cmis.webservice.utils import (
 )
 
 from .fetcher import repo_info_fetcher
+from .minimal import is_return_minimal, return_minimal
 
 logger = logging.getLogger(__name__)
 
@@ -179,52 +185,128 @@ class SOAPCMISClient(CMISClient):
     def vendor(self) -> str:
         return self.repository_info["vendorName"]
 
+    def get_object(
+        self,
+        object_id: str,
+        return_type: type,
+        properties: Optional[dict] = None,
+        base_properties: Optional[dict] = None,
+    ) -> CMISBaseObject:
+        """Retrieve the object with given objectId after it was written
+
+        In return-minimal mode (see :func:`drc_cmis.webservice.minimal.return_minimal`),
+        no request is made. Instead, a partial object is built from the properties that
+        were sent to the DMS.
+
+        :param object_id: string, the objectId returned by the DMS
+        :param return_type: type, the type of the object to return
+        :param properties: dict, the properties that were sent to the DMS
+        :param base_properties: dict, the properties of the object known from before the write
+        :return: the object of the given type
+        """
+        if properties is not None and is_return_minimal():
+            return return_type.from_properties(
+                object_id, properties, base_properties=base_properties
+            )
+
+        soap_envelope = make_soap_envelope(
+            auth=(self.user, self.password),
+            repository_id=self.main_repo_id,
+            object_id=object_id,
+            cmis_action="getObject",
+        )
+        logger.debug(soap_envelope.toprettyxml())
+
+        soap_response = self.request(
+            "ObjectService", soap_envelope=soap_envelope.toxml()
+        )
+        xml_response = extract_xml_from_soap(soap_response)
+        logger.debug(pretty_xml(xml_response))
+
+        extracted_data = extract_object_properties_from_xml(xml_response, "getObject")[
+            0
+        ]
+        return return_type(extracted_data)
+
     def query(
-        self, return_type_name: str, lhs: List[str] = None, rhs: List[str] = None
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        properties: List[str] = None,
+        columnar: bool = False,
     ) -> List[CMISBaseObject]:
         """Perform an SQL query in the DMS
 
         :param return_type_name: string, either Folder, Document, Oio or Gebruiksrechten
         :param lhs: list of strings, with the LHS of the SQL query
         :param rhs: list of strings, with the RHS of the SQL query
+        :param properties: list of strings, the properties to select. The other
+            properties are retrieved when they are first accessed.
+        :param columnar: bool, whether to return a ``ColumnarResult`` with the
+            properties instead of objects (not cached)
         :return: type, either Folder, Document, Oio or Gebruiksrechten
         """
 
         return_type = self.get_return_type(return_type_name)
+        statement = self._build_query_statement(
+            return_type_name, lhs, rhs, properties=properties
+        )
+        if columnar:
+            return self._query_columnar(statement)
 
-        processed_rhs = rhs
-        # Any query that filters based on URL fields needs to be converted to use the short URL version
-        if settings.CMIS_URL_MAPPING_ENABLED and lhs is not None and rhs is not None:
-            processed_rhs = []
+        partial = bool(properties)
+        cached_results = self._get_cached_query_results(
+            return_type, statement, partial=partial
+        )
+        if cached_results is not None:
+            return cached_results
 
-            # Join all the queries and find which fields are used to filter
-            joined_lhs = " ".join(lhs)
-            column_names = re.findall(r"([a-z]+?:.+?__[a-z]+)", joined_lhs)
+        results = self._query_page(return_type, statement, partial=partial).results
+        self._cache_query_results(return_type, statement, results)
+        return results
 
-            for index, item_rhs in enumerate(rhs):
-                column_name = column_names[index]
-                property_name = reverse_mapper(
-                    column_name, type=return_type_name.lower()
-                )
+    def _build_query(
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        order_by: List[str] = None,
+        properties: List[str] = None,
+    ) -> Query:
+        query = super()._build_query(
+            return_type_name, lhs, rhs, order_by=order_by, properties=properties
+        )
+        # Any query that filters based on URL fields needs to be converted to use the short URL version
+        if settings.CMIS_URL_MAPPING_ENABLED:
+            return_type = self.get_return_type(return_type_name)
+
+            def shrink_url_value(column: str, value):
+                property_name = reverse_mapper(column, type=return_type_name.lower())
                 if (
                     property_name is not None
                     and get_type(return_type.type_class, property_name) == QueriableUrl
-                    and item_rhs != ""
+                    and value != ""
                 ):
-                    processed_rhs.append(shrink_url(item_rhs))
-                else:
-                    processed_rhs.append(item_rhs)
+                    return shrink_url(value)
+                return value
 
-        table = return_type.table
-        where = (" WHERE " + " AND ".join(lhs)) if lhs else ""
-        query = CMISQuery("SELECT * FROM %s%s" % (table, where))
-        statement = query(*processed_rhs) if processed_rhs else query()
+            query = query.map_values(shrink_url_value)
+        return query
 
+    def _query_data_page(
+        self,
+        statement: str,
+        max_items: Optional[int] = None,
+        skip_count: Optional[int] = None,
+    ) -> QueryPage:
         soap_envelope = make_soap_envelope(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
             statement=statement,
             cmis_action="query",
+            max_items=max_items,
+            skip_count=skip_count,
         )
 
         logger.debug(soap_envelope.toprettyxml())
@@ -236,7 +318,7 @@ class SOAPCMISClient(CMISClient):
         # Corsa raises an error if the query retrieves 0 results
         except CmisRuntimeException as exc:
             if "objectNotFound" in exc.message:
-                return []
+                return QueryPage(results=[], has_more_items=False, num_items=0)
             else:
                 raise exc
 
@@ -244,9 +326,11 @@ class SOAPCMISClient(CMISClient):
 
         logger.debug(pretty_xml(xml_response))
 
-        extracted_data = extract_object_properties_from_xml(xml_response, "query")
-
-        return [return_type(cmis_object) for cmis_object in extracted_data]
+        return QueryPage(
+            results=extract_object_properties_from_xml(xml_response, "query"),
+            has_more_items=extract_has_more_items(xml_response),
+            num_items=extract_num_items(xml_response),
+        )
 
     def create_folder(self, name: str, parent_id: str, data: dict = None) -> Folder:
         """Create a new folder inside a parent
@@ -290,17 +374,26 @@ class SOAPCMISClient(CMISClient):
 
         # Creating a folder only returns the objectId
         folder_id = extracted_data["properties"]["objectId"]["value"]
+        invalidate_queries("folder", "zaaktype", "zaak")
+
+        return self.get_object(folder_id, Folder, properties=properties)
 
-        return self.get_folder(folder_id)
+    def get_folder(self, object_id: str, properties: List[str] = None) -> Folder:
+        """Retrieve folder with given objectId
 
-    def get_folder(self, object_id: str) -> Folder:
-        """Retrieve folder with given objectId"""
+        :param object_id: string, the objectId of the folder
+        :param properties: list of strings, the properties to retrieve (default all)
+        :return: Folder, partial if only some properties are retrieved
+        """
 
         soap_envelope = make_soap_envelope(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
             object_id=object_id,
             cmis_action="getObject",
+            property_filter=build_property_filter(properties),
+            include_allowable_actions="false",
+            include_relationships="none",
         )
 
         logger.debug(soap_envelope.toprettyxml())
@@ -322,16 +415,109 @@ class SOAPCMISClient(CMISClient):
         extracted_data = extract_object_properties_from_xml(xml_response, "getObject")[
             0
         ]
-        return Folder(extracted_data)
+        return Folder(extracted_data, partial=bool(properties))
 
     def copy_document(self, document: Document, destination_folder: Folder) -> Document:
         """Copy document to a folder
 
+        The document is copied by the DMS (with createDocumentFromSource), so the
+        content doesn't need to be downloaded and uploaded again. If the DMS doesn't
+        support this, the content is copied through the adapter.
+
         :param document: Document, the document to copy
         :param destination_folder: Folder, the folder in which to place the copied document
         :return: the copied document
         """
+        copied_document = None
+        if self.supports_operation("createDocumentFromSource"):
+            try:
+                copied_document = self._copy_document_from_source(
+                    document, destination_folder
+                )
+            except CmisNotSupportedException:
+                pass
+            except CmisRuntimeException as exc:
+                if "notSupported" not in exc.message:
+                    raise
+
+            if copied_document is None:
+                logger.info(
+                    "CMIS_ADAPTER: createDocumentFromSource is not supported, "
+                    "copying the content of documents instead."
+                )
+                self.mark_operation_unsupported("createDocumentFromSource")
+
+        if copied_document is None:
+            copied_document = self._copy_document_with_content(
+                document, destination_folder
+            )
+        self._register_document(copied_document)
+        invalidate_queries("document")
+        return copied_document
+
+    def _copy_document_from_source(
+        self, document: Document, destination_folder: Folder
+    ) -> Document:
+        # The DMS copies all the properties, except the ones given here
+        cmis_properties = {
+            mapper("titel", type="document"): {
+                "value": f"{document.titel} - copy",
+                "type": "propertyString",
+            },
+            "drc:kopie_van": {
+                "value": document.uuid,
+                "type": "propertyString",
+            },  # Keep tack of where this is copied from.
+            "drc:document__uuid": {
+                "value": str(uuid.uuid4()),
+                "type": "propertyString",
+            },
+            # Update the cmis:name to make it more unique
+            "cmis:name": {
+                "value": f"{document.titel}-{get_random_string()}",
+                "type": "propertyString",
+            },
+        }
 
+        soap_envelope = make_soap_envelope(
+            auth=(self.user, self.password),
+            repository_id=self.main_repo_id,
+            source_id=document.objectId,
+            folder_id=destination_folder.objectId,
+            properties=cmis_properties,
+            cmis_action="createDocumentFromSource",
+        )
+        logger.debug(soap_envelope.toprettyxml())
+
+        soap_response = self.request(
+            "ObjectService", soap_envelope=soap_envelope.toxml()
+        )
+
+        # Creating the document only returns its ID
+        xml_response = extract_xml_from_soap(soap_response)
+        logger.debug(pretty_xml(xml_response))
+
+        extracted_data = extract_object_properties_from_xml(
+            xml_response, "createDocumentFromSource"
+        )[0]
+        copy_document_id = extracted_data["properties"]["objectId"]["value"]
+
+        # The system properties of the copy differ from the ones of the source
+        drc_properties = {
+            property_name: property_details
+            for property_name, property_details in document.properties.items()
+            if not property_name.startswith("cmis:")
+        }
+        return self.get_object(
+            copy_document_id,
+            Document,
+            properties=cmis_properties,
+            base_properties=drc_properties,
+        )
+
+    def _copy_document_with_content(
+        self, document: Document, destination_folder: Folder
+    ) -> Document:
         # copy the properties from the source document
         drc_properties = {}
         drc_url_properties = {}
@@ -410,7 +596,7 @@ class SOAPCMISClient(CMISClient):
         )[0]
         copy_document_id = extracted_data["properties"]["objectId"]["value"]
 
-        return document.get_document(copy_document_id)
+        return self.get_object(copy_document_id, Document, properties=cmis_properties)
 
     def copy_gebruiksrechten(
         self, source_object: Gebruiksrechten, destination_folder: Folder
@@ -487,30 +673,13 @@ class SOAPCMISClient(CMISClient):
             xml_response, "createDocument"
         )[0]
         copy_gebruiksrechten_id = extracted_data["properties"]["objectId"]["value"]
+        invalidate_queries("gebruiksrechten")
 
         # Request all the properties of the newly created object
-        soap_envelope = make_soap_envelope(
-            auth=(self.user, self.password),
-            repository_id=self.main_repo_id,
-            object_id=copy_gebruiksrechten_id,
-            cmis_action="getObject",
+        return self.get_object(
+            copy_gebruiksrechten_id, Gebruiksrechten, properties=cmis_properties
         )
 
-        logger.debug(soap_envelope.toprettyxml())
-
-        soap_response = self.request(
-            "ObjectService", soap_envelope=soap_envelope.toxml()
-        )
-
-        xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
-
-        extracted_data = extract_object_properties_from_xml(xml_response, "getObject")[
-            0
-        ]
-
-        return Gebruiksrechten(extracted_data)
-
     def create_content_object(
         self, data: dict, object_type: str, destination_folder: Folder = None
     ) -> CMISContentObject:
@@ -577,36 +746,22 @@ class SOAPCMISClient(CMISClient):
         )[0]
         new_object_id = extracted_data["properties"]["objectId"]["value"]
 
-        # Request all the properties of the newly created object
-        soap_envelope = make_soap_envelope(
-            auth=(self.user, self.password),
-            repository_id=self.main_repo_id,
-            object_id=new_object_id,
-            cmis_action="getObject",
-        )
-
-        logger.debug(soap_envelope.toprettyxml())
-
-        soap_response = self.request(
-            "ObjectService", soap_envelope=soap_envelope.toxml()
-        )
-
-        xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
+        invalidate_queries(object_type)
 
-        extracted_data = extract_object_properties_from_xml(xml_response, "getObject")[
-            0
-        ]
-
-        return return_type(extracted_data)
+        # Request all the properties of the newly created object
+        return self.get_object(new_object_id, return_type, properties=properties)
 
     def get_content_object(
-        self, drc_uuid: Union[str, UUID], object_type: str
+        self,
+        drc_uuid: Union[str, UUID],
+        object_type: str,
+        properties: List[str] = None,
     ) -> CMISContentObject:
         """Get the gebruiksrechten/oio with specified uuid
 
         :param drc_uuid: string or UUID, the value of drc:oio__uuid or drc:gebruiksrechten__uuid
         :param object_type: string, either "gebruiksrechten" or "oio"
+        :param properties: list of strings, the properties to retrieve (default all)
         :return: Either a Gebruiksrechten or ObjectInformatieObject
         """
 
@@ -615,12 +770,16 @@ class SOAPCMISClient(CMISClient):
             "oio",
         ], "'object_type' can be only 'gebruiksrechten' or 'oio'"
 
-        query = CMISQuery("SELECT * FROM drc:%s WHERE drc:%s__uuid = '%s'")
+        query = Query(
+            f"drc:{object_type}",
+            where=[Comparison(f"drc:{object_type}__uuid", str(drc_uuid))],
+            properties=properties,
+        )
 
         soap_envelope = make_soap_envelope(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
-            statement=query(object_type, object_type, str(drc_uuid)),
+            statement=query.get_statement(),
             cmis_action="query",
         )
 
@@ -651,9 +810,9 @@ class SOAPCMISClient(CMISClient):
             raise does_not_exist
 
         if object_type == "oio":
-            return ObjectInformatieObject(extracted_data[0])
+            return ObjectInformatieObject(extracted_data[0], partial=bool(properties))
         elif object_type == "gebruiksrechten":
-            return Gebruiksrechten(extracted_data[0])
+            return Gebruiksrechten(extracted_data[0], partial=bool(properties))
 
     def create_document(
         self,
@@ -662,6 +821,9 @@ class SOAPCMISClient(CMISClient):
         data: dict,
         content: BytesIO = None,
         check_if_already_exists: bool = True,
+        zaak_data: Optional[dict] = None,
+        zaaktype_data: Optional[dict] = None,
+        other_data: Optional[dict] = None,
     ) -> Document:
         """Create a custom Document (with the EnkelvoudigInformatieObject properties)
 
@@ -671,12 +833,34 @@ class SOAPCMISClient(CMISClient):
         :param content: BytesIO, the content of the document
         :param check_if_already_exists: Bool, whether to check if the document with given identificatie/bronorganisatie
         already exists in the DMS.
+        :param zaak_data: dict, the details of the zaak the document will be related to. If given (together
+        with ``zaaktype_data``), the document is created directly in the zaak folder.
+        :param zaaktype_data: dict, the details of the zaaktype of that zaak.
+        :param other_data: dict, the details of the verzoek the document will be related to.
         :return: Document, the document created
         """
 
         if check_if_already_exists and identification and bronorganisatie:
             self.check_document_exists(identification, bronorganisatie)
 
+        properties = self._build_new_document_properties(
+            identification, bronorganisatie, data
+        )
+
+        destination_folder = self._get_or_create_document_folder(
+            zaak_data=zaak_data, zaaktype_data=zaaktype_data, other_data=other_data
+        )
+
+        document = self._create_document_in_folder(
+            properties, content, data.get("bestandsnaam"), destination_folder
+        )
+        self._register_document(document)
+        invalidate_queries("document")
+        return document
+
+    def _build_new_document_properties(
+        self, identification: str, bronorganisatie: str, data: dict
+    ) -> dict:
         data.setdefault("versie", "1")
         data.setdefault(
             "object_type_id",
@@ -685,23 +869,27 @@ class SOAPCMISClient(CMISClient):
         data["bronorganisatie"] = bronorganisatie
         data["identificatie"] = identification
 
+        return Document.build_properties(data, new=True)
+
+    def _create_document_in_folder(
+        self,
+        properties: dict,
+        content: Optional[BytesIO],
+        filename: Optional[str],
+        destination_folder: Folder,
+    ) -> Document:
         content_id = str(uuid.uuid4())
         if content is None:
             content = BytesIO()
 
-        # Create Document in default folder
-        other_folder = self.get_or_create_other_folder()
-
-        properties = Document.build_properties(data, new=True)
-
         soap_envelope = make_soap_envelope(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
-            folder_id=other_folder.objectId,
+            folder_id=destination_folder.objectId,
             properties=properties,
             cmis_action="createDocument",
             content_id=content_id,
-            content_filename=data.get("bestandsnaam"),
+            content_filename=filename,
         )
 
         logger.debug(soap_envelope.toprettyxml())
@@ -722,25 +910,7 @@ class SOAPCMISClient(CMISClient):
         new_document_id = extracted_data["properties"]["objectId"]["value"]
 
         # Request all the properties of the newly created document
-        soap_envelope = make_soap_envelope(
-            auth=(self.user, self.password),
-            repository_id=self.main_repo_id,
-            object_id=new_document_id,
-            cmis_action="getObject",
-        )
-        logger.debug(soap_envelope.toprettyxml())
-
-        soap_response = self.request(
-            "ObjectService", soap_envelope=soap_envelope.toxml()
-        )
-        xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
-
-        extracted_data = extract_object_properties_from_xml(xml_response, "getObject")[
-            0
-        ]
-
-        return Document(extracted_data)
+        return self.get_object(new_document_id, Document, properties=properties)
 
     def lock_document(self, drc_uuid: str, lock: str):
         """Lock a EnkelvoudigInformatieObject with given drc:document__uuid
@@ -754,21 +924,27 @@ class SOAPCMISClient(CMISClient):
             "Document was already checked out", code="double_lock"
         )
 
-        try:
-            pwc = cmis_doc.checkout()
-            if pwc.lock:
-                raise already_locked
+        # If the document is checked out, the query returns the PWC
+        if cmis_doc.lock:
+            raise already_locked
 
-            # store the lock value on the PWC so we can compare it later
-            lock_property = {
-                mapper("lock"): {
-                    "value": lock,
-                    "type": get_cmis_type(EnkelvoudigInformatieObject, "lock"),
+        try:
+            # The PWC is not read back: the lock is stored directly on the PWC
+            # returned by checkOut, so we can compare it later
+            with return_minimal():
+                pwc = cmis_doc.checkout()
+                lock_property = {
+                    mapper("lock"): {
+                        "value": lock,
+                        "type": get_cmis_type(EnkelvoudigInformatieObject, "lock"),
+                    }
                 }
-            }
-            pwc.update_properties(lock_property)
+                pwc.update_properties(lock_property)
         except CmisUpdateConflictException as exc:
             raise already_locked from exc
+        finally:
+            invalidate_document_properties(drc_uuid)
+            invalidate_queries("document")
 
     def unlock_document(
         self, drc_uuid: str, lock: str, force: bool = False
@@ -806,11 +982,58 @@ class SOAPCMISClient(CMISClient):
                     "type": get_cmis_type(EnkelvoudigInformatieObject, "lock"),
                 }
             }
-            cmis_doc.update_properties(lock_property)
-            return cmis_doc.checkin("Updated via Documenten API")
+            document = cmis_doc.checkin(
+                "Updated via Documenten API", properties=lock_property
+            )
+            invalidate_document_properties(drc_uuid)
+            invalidate_queries("document")
+            return document
 
         raise LockDidNotMatchException("Lock did not match", code="unlock-failed")
 
+    def get_object_of_latest_version(
+        self, version_series_id: str, properties: List[str] = None
+    ) -> Document:
+        """Retrieve the latest version of a document by the ID of its version series
+
+        The private working copy is not considered a version, so if the document is
+        checked out, the latest checked in version is returned.
+
+        :param version_series_id: string, the cmis:versionSeriesId of the document
+        :param properties: list of strings, the properties to retrieve (default all)
+        :return: Document, the latest version
+        """
+        soap_envelope = make_soap_envelope(
+            auth=(self.user, self.password),
+            repository_id=self.main_repo_id,
+            object_id=version_series_id,
+            cmis_action="getObjectOfLatestVersion",
+            property_filter=build_property_filter(properties),
+        )
+        logger.debug(soap_envelope.toprettyxml())
+
+        try:
+            soap_response = self.request(
+                "VersioningService", soap_envelope=soap_envelope.toxml()
+            )
+        except CmisRuntimeException as exc:
+            if "objectNotFound" in exc.message:
+                raise DocumentDoesNotExistError(
+                    f"Document met cmis:versionSeriesId {version_series_id} bestaat niet in het CMIS connection"
+                ) from exc
+            elif "notSupported" in exc.message:
+                raise CmisNotSupportedException(
+                    status=exc.status, url=exc.url, message=exc.message, code=exc.code
+                ) from exc
+            raise
+
+        xml_response = extract_xml_from_soap(soap_response)
+        logger.debug(pretty_xml(xml_response))
+        extracted_data = extract_object_properties_from_xml(
+            xml_response, "getObjectOfLatestVersion"
+        )[0]
+        return Document(extracted_data)
+
     # FIXME filters are useless because uuid is unique
     def get_document(self, drc_uuid: str, filters: Optional[dict] = None) -> Document:
         """Retrieve a document in the main repository with given uuid (drc:document__uuid)
@@ -827,20 +1050,25 @@ class SOAPCMISClient(CMISClient):
         if drc_uuid is None:
             raise does_not_exist
 
+        if not filters:
+            document = self._get_known_document(drc_uuid)
+            if document is not None:
+                return document
+
         # This always selects the latest version, and if there is a pwc,
         # Alfresco returns both the pwc and the latest major version, while Corsa only returns the pwc.
-        query = CMISQuery(
-            "SELECT * FROM drc:document WHERE drc:document__uuid = '%s' %s"
-        )
-
-        filter_string = build_query_filters(
-            filters, filter_string="AND ", strip_end=True
+        query = Query(
+            "drc:document",
+            where=[
+                Comparison("drc:document__uuid", str(drc_uuid)),
+                *build_filter_predicates(filters),
+            ],
         )
 
         soap_envelope = make_soap_envelope(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
-            statement=query(drc_uuid, filter_string),
+            statement=query.get_statement(),
             cmis_action="query",
         )
         logger.debug(soap_envelope.toprettyxml())
@@ -859,7 +1087,9 @@ class SOAPCMISClient(CMISClient):
         logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(xml_response, "query")
-        return extract_latest_version(self.document_type, extracted_data)
+        document = extract_latest_version(self.document_type, extracted_data)
+        self._remember_document(document, drc_uuid)
+        return document
 
     def check_document_exists(
         self, identification: Union[str, UUID], bronorganisatie: str
@@ -872,35 +1102,12 @@ class SOAPCMISClient(CMISClient):
         cmis_identificatie = mapper("identificatie", type="document")
         cmis_bronorganisatie = mapper("bronorganisatie", type="document")
 
-        query = CMISQuery(
-            f"SELECT * FROM drc:document WHERE {cmis_identificatie} = '%s' AND {cmis_bronorganisatie} = '%s'"
+        document_exists = self.exists(
+            "document",
+            lhs=[f"{cmis_identificatie} = '%s'", f"{cmis_bronorganisatie} = '%s'"],
+            rhs=[str(identification), bronorganisatie],
         )
-
-        soap_envelope = make_soap_envelope(
-            auth=(self.user, self.password),
-            repository_id=self.main_repo_id,
-            statement=query(str(identification), bronorganisatie),
-            cmis_action="query",
-        )
-        logger.debug(soap_envelope.toprettyxml())
-
-        try:
-            soap_response = self.request(
-                "DiscoveryService", soap_envelope=soap_envelope.toxml()
-            )
-        except CmisRuntimeException as exc:
-            # Corsa raises an error if the query gives no results, while Alfresco a 200
-            if "objectNotFound" in exc.message:
-                return
-            else:
-                raise exc
-
-        xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
-
-        extracted_data = extract_object_properties_from_xml(xml_response, "query")
-
-        if len(extracted_data) > 0:
+        if document_exists:
             raise DocumentExistsError(
                 "Een document met dezelfde identificatie en bronorganisatie al bestaat."
             )
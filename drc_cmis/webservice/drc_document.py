@@ -2,16 +2,27 @@ import datetime
 import logging
 import uuid
 from io import BytesIO
-from typing import List, Optional, Union
+from typing import BinaryIO, List, Optional, Tuple, Union
+from xml.dom import minidom
 
 from django.conf import settings
 
 import pytz
+from cmislib.util import parsePropValue
 from furl import furl
 
-from drc_cmis.mixins import RearrangeFilesOnDeleteMixin
+from drc_cmis.content_cache import get_content_cache
+from drc_cmis.identity_map import add_to_identity_map, get_from_identity_map
+from drc_cmis.mixins import RELATED_DOCUMENT_PROPERTIES, RearrangeFilesOnDeleteMixin
 from drc_cmis.models import CMISConfig
-from drc_cmis.utils.exceptions import CmisRuntimeException, DocumentDoesNotExistError
+from drc_cmis.query_cache import invalidate_queries
+from drc_cmis.utils.exceptions import (
+    CmisInvalidArgumentException,
+    CmisNotSupportedException,
+    CmisRuntimeException,
+    DocumentDoesNotExistError,
+)
+from drc_cmis.utils.folder import forget_folder
 from drc_cmis.utils.mapper import (
     DOCUMENT_MAP,
     GEBRUIKSRECHTEN_MAP,
@@ -19,9 +30,14 @@ from drc_cmis.utils.mapper import (
     ZAAK_MAP,
     ZAAKTYPE_MAP,
     mapper,
+    reverse_mapper,
+)
+from drc_cmis.utils.query import Comparison, InFolder, Or, Query, build_property_filter
+from drc_cmis.utils.utils import (
+    extract_latest_version,
+    get_random_string,
+    property_values_equal,
 )
-from drc_cmis.utils.query import CMISQuery
-from drc_cmis.utils.utils import extract_latest_version, get_random_string
 from drc_cmis.webservice.data_models import (
     EnkelvoudigInformatieObject,
     Folder as _Folder,
@@ -36,6 +52,8 @@ from drc_cmis.webservice.data_models import (
 from drc_cmis.webservice.utils import (
     expand_url,
     extract_content,
+    extract_failed_to_delete,
+    extract_has_more_items,
     extract_object_properties_from_xml,
     extract_xml_from_soap,
     make_soap_envelope,
@@ -46,12 +64,43 @@ from drc_cmis.webservice.utils import (
 logger = logging.getLogger(__name__)
 
 
+def decode_property_value(prop_details: dict):
+    """Decode a property in the format returned by ``build_properties``"""
+    value = prop_details["value"]
+    if value == "" and prop_details["type"] != "propertyString":
+        return None
+    elif value is not None:
+        return parsePropValue(value, prop_details["type"])
+    return value
+
+
+# System properties that change with every write, so they can't be taken over from
+# the object as it was before the write.
+VOLATILE_PROPERTIES = [
+    "cmis:changeToken",
+    "cmis:lastModificationDate",
+    "cmis:lastModifiedBy",
+]
+
+# Properties describing the content stream, which change when new content is set.
+CONTENT_STREAM_PROPERTIES = [
+    "cmis:contentStreamFileName",
+    "cmis:contentStreamId",
+    "cmis:contentStreamLength",
+    "cmis:contentStreamMimeType",
+]
+
+
 class CMISBaseObject:
     name_map = None
     type_name = None
     type_class = None
 
-    def __init__(self, data):
+    # Partial objects only hold the properties known locally. The other properties
+    # are retrieved from the DMS the first time one of them is read.
+    _partial = False
+
+    def __init__(self, data, partial: bool = False):
         super().__init__()
 
         from drc_cmis.webservice.client import SOAPCMISClient
@@ -59,8 +108,86 @@ class CMISBaseObject:
         self.data = data
         self.properties = dict(data.get("properties", {}))
         self.client = SOAPCMISClient()
+        self._partial = partial
+
+    @classmethod
+    def from_properties(
+        cls, object_id: str, properties: dict, base_properties: Optional[dict] = None
+    ) -> "CMISBaseObject":
+        """Build a partial object from the properties sent to the DMS
+
+        :param object_id: string, the objectId returned by the DMS
+        :param properties: dict, the properties that were sent, in the format returned
+            by ``build_properties``
+        :param base_properties: dict, the properties known from before the write
+        :return: a partial object of this type
+        """
+        extracted_properties = {
+            prop_name: prop_details
+            for prop_name, prop_details in (base_properties or {}).items()
+            if prop_name not in VOLATILE_PROPERTIES
+        }
+        for prop_name, prop_details in properties.items():
+            extracted_properties[prop_name] = {
+                "value": decode_property_value(prop_details)
+            }
+        extracted_properties["cmis:objectId"] = {"value": object_id}
+
+        return cls({"properties": extracted_properties}, partial=True)
+
+    def refresh(self) -> None:
+        """Retrieve all the properties of the object from the DMS"""
+        soap_envelope = make_soap_envelope(
+            auth=(self.client.user, self.client.password),
+            repository_id=self.client.main_repo_id,
+            object_id=self.properties["cmis:objectId"]["value"],
+            cmis_action="getObject",
+        )
+        logger.debug(soap_envelope.toprettyxml())
+
+        soap_response = self.client.request(
+            "ObjectService", soap_envelope=soap_envelope.toxml()
+        )
+        xml_response = extract_xml_from_soap(soap_response)
+        logger.debug(pretty_xml(xml_response))
+        extracted_data = extract_object_properties_from_xml(xml_response, "getObject")[
+            0
+        ]
+
+        self.data = extracted_data
+        self.properties = dict(extracted_data.get("properties", {}))
+        self._partial = False
+
+    def get_changed_properties(self, properties: dict) -> dict:
+        """Select the properties that differ from the current properties
+
+        :param properties: dict, the new properties, in the format returned by
+            ``build_properties``
+        :return: dict, the new properties whose value differs from the current value
+        """
+        return {
+            prop_name: prop_details
+            for prop_name, prop_details in properties.items()
+            if prop_name not in self.properties
+            or not property_values_equal(
+                self.properties[prop_name]["value"],
+                decode_property_value(prop_details),
+            )
+        }
 
     def __getattr__(self, name: str):
+        if self._partial and not name.startswith("_"):
+            try:
+                return self._get_property(name)
+            except AttributeError:
+                logger.debug(
+                    "CMIS_ADAPTER: Property '%s' not known locally, refreshing object",
+                    name,
+                )
+                self.refresh()
+        return self._get_property(name)
+
+    def _get_property(self, name: str):
         def resolve_attribute(name: str) -> str:
             if name in self.properties:
                 return self.properties[name]["value"]
@@ -133,6 +260,37 @@ class CMISBaseObject:
 
         return props
 
+    @classmethod
+    def build_update_properties(cls, properties: dict) -> dict:
+        """Convert properties by CMIS property name to the format of ``build_properties``
+
+        :param properties: dict, the raw values by CMIS property name
+        :return: dict, the properties to pass to ``update_properties``
+        """
+        data, props = cls._split_update_properties(properties)
+        props.update(cls.build_properties(data))
+        return props
+
+    @classmethod
+    def _split_update_properties(cls, properties: dict) -> Tuple[dict, dict]:
+        """Split properties by CMIS property name in data and converted properties
+
+        The properties that are mapped to a field are returned as data for
+        ``build_properties``. The other properties (e.g. ``cmis:name``) are strings.
+        """
+        data = {}
+        props = {}
+        for prop_name, value in properties.items():
+            key = reverse_mapper(prop_name, type=cls.type_name)
+            if key is not None:
+                data[key] = value
+            else:
+                props[prop_name] = {
+                    "value": None if value is None else str(value),
+                    "type": "propertyString",
+                }
+        return data, props
+
 
 class CMISContentObject(CMISBaseObject):
     def delete_object(self):
@@ -149,6 +307,7 @@ class CMISContentObject(CMISBaseObject):
         soap_response = self.client.request(
             "ObjectService", soap_envelope=soap_envelope.toxml()
         )
+        invalidate_queries(self.type_name)
 
         xml_response = extract_xml_from_soap(soap_response)
         logger.debug(pretty_xml(xml_response))
@@ -175,10 +334,17 @@ class CMISContentObject(CMISBaseObject):
         )
         return [Folder(data) for data in extracted_data]
 
-    def move_object(self, target_folder: "Folder") -> "CMISContentObject":
-        """Move a document to the specified folder"""
+    def move_object(
+        self, target_folder: "Folder", source_folder: Optional["Folder"] = None
+    ) -> "CMISContentObject":
+        """Move a document to the specified folder
 
-        source_folder = self.get_parent_folders()[0]
+        :param target_folder: Folder, the folder to move the object to
+        :param source_folder: Folder, the current parent folder of the object. If not
+            provided, it is retrieved from the DMS.
+        """
+        if source_folder is None:
+            source_folder = self.get_parent_folders()[0]
 
         soap_envelope = make_soap_envelope(
             auth=(self.client.user, self.client.password),
@@ -193,6 +359,7 @@ class CMISContentObject(CMISBaseObject):
         soap_response = self.client.request(
             "ObjectService", soap_envelope=soap_envelope.toxml()
         )
+        invalidate_queries(self.type_name)
         xml_response = extract_xml_from_soap(soap_response)
         logger.debug(pretty_xml(xml_response))
         extracted_data = extract_object_properties_from_xml(xml_response, "moveObject")[
@@ -201,11 +368,15 @@ class CMISContentObject(CMISBaseObject):
 
         return type(self)(extracted_data)
 
-    def _update_properties(self, properties: dict) -> dict:
+    def _update_properties(
+        self, properties: dict, object_id: Optional[str] = None
+    ) -> dict:
         """
         Update properties and return the properties of the updated object.
 
         :param properties: dict, new properties to update
+        :param object_id: string, the objectId of the object to update, if it
+            changed since this object was retrieved (defaults to its objectId)
         :return: dict, properties of the updated object
         """
         soap_envelope = make_soap_envelope(
@@ -213,7 +384,7 @@ class CMISContentObject(CMISBaseObject):
             repository_id=self.client.main_repo_id,
             properties=properties,
             cmis_action="updateProperties",
-            object_id=self.objectId,
+            object_id=object_id or self.objectId,
         )
         logger.debug(soap_envelope.toprettyxml())
 
@@ -221,6 +392,7 @@ class CMISContentObject(CMISBaseObject):
             "ObjectService",
             soap_envelope=soap_envelope.toxml(),
         )
+        invalidate_queries(self.type_name)
         xml_response = extract_xml_from_soap(soap_response)
         logger.debug(pretty_xml(xml_response))
         extracted_data = extract_object_properties_from_xml(
@@ -345,6 +517,12 @@ class Document(CMISContentObject):
 
         return props
 
+    @classmethod
+    def build_update_properties(cls, properties: dict) -> dict:
+        data, props = cls._split_update_properties(properties)
+        props.update(cls.build_properties(data, new=False))
+        return props
+
     def get_document(self, object_id: str) -> "Document":
         """Get latest version of a document with specified objectId
 
@@ -353,7 +531,13 @@ class Document(CMISContentObject):
         :param object_id: string, objectId of the document
         :return: Document
         """
-        return self.get_content_object(object_id=object_id, object_type=type(self))
+        document = get_from_identity_map("objectId", object_id)
+        if document is None:
+            document = self.get_content_object(
+                object_id=object_id, object_type=type(self)
+            )
+            add_to_identity_map(document)
+        return document
 
     def checkout(self) -> "Document":
         """Checkout a private working copy of the document"""
@@ -381,14 +565,27 @@ class Document(CMISContentObject):
             pwc_document = self.get_latest_version()
             pwc_id = pwc_document.objectId
 
-        return self.get_document(pwc_id)
+        return self.client.get_object(pwc_id, type(self), properties={})
+
+    def checkin(
+        self,
+        checkin_comment: str,
+        major: bool = True,
+        properties: Optional[dict] = None,
+    ) -> "Document":
+        """Check in the private working copy
 
-    def checkin(self, checkin_comment: str, major: bool = True) -> "Document":
+        :param checkin_comment: string, the comment of the new version
+        :param major: bool, whether the new version is a major version
+        :param properties: dict, properties to update while checking in
+        :return: Document, the new version of the document
+        """
         soap_envelope = make_soap_envelope(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
             cmis_action="checkIn",
             object_id=str(self.objectId),
+            properties=properties,
             major=str(major).lower(),
             checkin_comment=checkin_comment,
         )
@@ -426,20 +623,75 @@ class Document(CMISContentObject):
 
     def get_private_working_copy(self) -> Union["Document", None]:
         """Get the version of the document with version label 'pwc'"""
-        documents = self.get_all_versions()
+        pwc_id = self.properties.get("cmis:versionSeriesCheckedOutId", {}).get("value")
+        if pwc_id:
+            return self.get_document(pwc_id)
 
-        for document in documents:
-            if document.versionLabel == "pwc":
-                return document
+        latest_version = self.get_latest_version()
+        if latest_version.versionLabel == "pwc":
+            return latest_version
 
     def update_content(self, content: BytesIO, filename: Optional[str] = None):
         self.set_content_stream(content, filename)
 
+    def update(
+        self,
+        properties: dict,
+        content: Optional[BytesIO] = None,
+        filename: Optional[str] = None,
+    ) -> "Document":
+        """Update the content and the properties of the document
+
+        The updated document is built from the data on hand instead of being
+        retrieved again from the DMS. If the content is updated, the properties
+        describing the content stream are only retrieved when they are read.
+
+        :param properties: dict, the properties to update (only the changed ones)
+        :param content: BytesIO, the new content of the document
+        :param filename: string, the name of the new content file
+        :return: Document, the updated document
+        """
+        if content is None and not properties:
+            return self
+
+        object_id = self.objectId
+        base_properties = self.properties
+
+        if content is not None:
+            object_id = self.set_content_stream(content, filename) or object_id
+            base_properties = {
+                prop_name: prop_details
+                for prop_name, prop_details in base_properties.items()
+                if prop_name not in CONTENT_STREAM_PROPERTIES
+            }
+
+        if properties:
+            updated_properties = self._update_properties(
+                properties, object_id=object_id
+            )
+            object_id = updated_properties["properties"]["objectId"]["value"]
+
+        return self.from_properties(
+            object_id, properties, base_properties=base_properties
+        )
+
     def update_properties(self, properties: dict) -> "Document":
         updated_properties = self._update_properties(properties)
-        return self.get_document(updated_properties["properties"]["objectId"]["value"])
+        return self.client.get_object(
+            updated_properties["properties"]["objectId"]["value"],
+            type(self),
+            properties=properties,
+            base_properties=self.properties,
+        )
+
+    def get_content_stream(self) -> BinaryIO:
+        content_cache = get_content_cache()
+        key = content_cache.get_key(self) if content_cache else None
+        if key is None:
+            return self._fetch_content_stream()
+        return content_cache.get_or_fetch(key, self._fetch_content_stream)
 
-    def get_content_stream(self) -> BytesIO:
+    def _fetch_content_stream(self) -> BytesIO:
         soap_envelope = make_soap_envelope(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
@@ -480,6 +732,13 @@ class Document(CMISContentObject):
         xml_response = extract_xml_from_soap(soap_response)
         logger.debug(pretty_xml(xml_response))
 
+        # The objectId of the document may change when new content is set
+        object_ids = minidom.parseString(xml_response).getElementsByTagNameNS(
+            "*", "objectId"
+        )
+        if object_ids and object_ids[0].firstChild is not None:
+            return object_ids[0].firstChild.data
+
     def delete_object(self):
         """
         Permanently delete the object from the CMIS store, with all its versions.
@@ -488,40 +747,96 @@ class Document(CMISContentObject):
         the document is currently locked (i.e. there is a private working copy), we need
         to cancel that checkout first.
         """
-        latest_version = self.get_latest_version()
+        latest_version = (
+            self._get_object_of_latest_version() or self._query_latest_version()
+        )
 
         if latest_version.isVersionSeriesCheckedOut:
-            soap_envelope = make_soap_envelope(
-                auth=(self.client.user, self.client.password),
-                repository_id=self.client.main_repo_id,
-                object_id=latest_version.objectId,
-                cmis_action="cancelCheckOut",
-            )
-            logger.debug(soap_envelope.toprettyxml())
+            latest_version.cancel_checkout()
 
-            soap_response = self.client.request(
-                "VersioningService",
-                soap_envelope=soap_envelope.toxml(),
-            )
-            xml_response = extract_xml_from_soap(soap_response)
-            logger.debug(pretty_xml(xml_response))
+            # The PWC doesn't exist anymore
+            if latest_version.versionLabel == "pwc":
+                latest_version = self.get_latest_version()
 
-            refreshed_document = self.get_latest_version()
-            return refreshed_document.delete_object()
+        return latest_version.delete_all_versions()
 
+    def delete_all_versions(self):
+        """Delete all versions of the document, without looking up the latest version
+
+        The document must not be checked out, since a private working copy can't be
+        deleted. Use ``delete_object`` if the state of the version series is unknown.
+        """
         return super().delete_object()
 
+    def cancel_checkout(self) -> None:
+        """Cancel the checkout of the version series, deleting the PWC
+
+        This is either called on the PWC or on the latest version of a checked out
+        document.
+        """
+        soap_envelope = make_soap_envelope(
+            auth=(self.client.user, self.client.password),
+            repository_id=self.client.main_repo_id,
+            object_id=self.versionSeriesCheckedOutId or self.objectId,
+            cmis_action="cancelCheckOut",
+        )
+        logger.debug(soap_envelope.toprettyxml())
+
+        soap_response = self.client.request(
+            "VersioningService",
+            soap_envelope=soap_envelope.toxml(),
+        )
+        xml_response = extract_xml_from_soap(soap_response)
+        logger.debug(pretty_xml(xml_response))
+
     def get_latest_version(self):
-        """Get the latest version or the PWC"""
+        """Get the latest version or the PWC
+
+        The versions are resolved by ID. Only if that is not possible, the index is
+        queried with the uuid of the document.
+        """
+        latest_version = self._get_object_of_latest_version()
+        if latest_version is None:
+            return self._query_latest_version()
+
+        if latest_version.isVersionSeriesCheckedOut:
+            if not latest_version.versionSeriesCheckedOutId:
+                return self._query_latest_version()
+            return latest_version.get_private_working_copy()
+        return latest_version
+
+    def _get_object_of_latest_version(self) -> Optional["Document"]:
+        """Get the latest checked in version with the cmis:versionSeriesId
+
+        :return: the latest version, or None if the version series is not known or the
+            DMS doesn't support getObjectOfLatestVersion.
+        """
+        version_series_id = self.properties.get("cmis:versionSeriesId", {}).get("value")
+        if not version_series_id or not self.client.supports_operation(
+            "getObjectOfLatestVersion"
+        ):
+            return None
+
+        try:
+            return self.client.get_object_of_latest_version(version_series_id)
+        except CmisNotSupportedException:
+            logger.info(
+                "CMIS_ADAPTER: getObjectOfLatestVersion is not supported, "
+                "querying the latest versions instead."
+            )
+            self.client.mark_operation_unsupported("getObjectOfLatestVersion")
 
+    def _query_latest_version(self) -> "Document":
         # This always selects the latest version, and if there is a pwc,
         # Alfresco returns both the pwc and the latest major version, while Corsa only returns the pwc.
-        query = CMISQuery("SELECT * FROM drc:document WHERE drc:document__uuid = '%s'")
+        query = Query(
+            "drc:document", where=[Comparison("drc:document__uuid", self.uuid)]
+        )
 
         soap_envelope = make_soap_envelope(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
-            statement=query(self.uuid),
+            statement=query.get_statement(),
             cmis_action="query",
         )
         logger.debug(soap_envelope.toprettyxml())
@@ -558,9 +873,11 @@ class Gebruiksrechten(CMISContentObject):
         """
         updated_properties = self._update_properties(properties)
 
-        return self.get_content_object(
-            object_id=updated_properties["properties"]["objectId"]["value"],
-            object_type=type(self),
+        return self.client.get_object(
+            updated_properties["properties"]["objectId"]["value"],
+            type(self),
+            properties=properties,
+            base_properties=self.properties,
         )
 
 
@@ -575,14 +892,43 @@ class ObjectInformatieObject(RearrangeFilesOnDeleteMixin, CMISContentObject):
 
         This is the document in the Zaak folder that is referred to by the OIO. It can be a copy of the original
         document. This means that we can't just filter the documents on drc:document__uuid, but we also need
-        to consider drc:kopie_van
+        to consider drc:kopie_van.
+
+        If the DMS doesn't support this IN_FOLDER query (e.g. Corsa), all the
+        documents in the zaak folder are listed instead.
         """
-        related_documents = self.zaakfolder.get_children_documents(
-            convert_to_document_type=False
-        )
         informatieobject_url = furl(self.informatieobject)
         informatieobject_uuid = informatieobject_url.path.segments[-1]
 
+        related_documents = None
+        if self.client.supports_operation("query_kopie_van"):
+            query = Query(
+                "drc:document",
+                where=[
+                    InFolder(self.zaakfolder.objectId),
+                    Or(
+                        Comparison("drc:document__uuid", informatieobject_uuid),
+                        Comparison("drc:kopie_van", informatieobject_uuid),
+                    ),
+                ],
+                properties=RELATED_DOCUMENT_PROPERTIES,
+            )
+            try:
+                related_documents = self._query(query)
+            except (CmisInvalidArgumentException, CmisNotSupportedException) as exc:
+                logger.info(
+                    "CMIS_ADAPTER: IN_FOLDER query on drc:kopie_van failed (%s), "
+                    "listing the documents in the zaak folder instead.",
+                    exc,
+                )
+                self.client.operation_failed("query_kopie_van", exc)
+
+        if related_documents is None:
+            related_documents = self.zaakfolder.get_children_documents(
+                convert_to_document_type=False,
+                properties=RELATED_DOCUMENT_PROPERTIES,
+            )
+
         for document in related_documents:
             if (
                 document["properties"]["drc:document__uuid"]["value"]
@@ -590,7 +936,7 @@ class ObjectInformatieObject(RearrangeFilesOnDeleteMixin, CMISContentObject):
                 or document["properties"]["drc:kopie_van"]["value"]
                 == informatieobject_uuid
             ):
-                return Document(document)
+                return Document(document, partial=True)
         else:
             logger.error(
                 "Could not find the document %s in zaakfolder %s before deleting the OIO.",
@@ -598,26 +944,90 @@ class ObjectInformatieObject(RearrangeFilesOnDeleteMixin, CMISContentObject):
                 self.zaakfolder.name,
             )
 
-    def _get_gebruiksrechten(self) -> Optional["Gebruiksrechten"]:
-        gebruiksrechten_files = self.client.query(
-            "gebruiksrechten",
-            lhs=["drc:gebruiksrechten__informatieobject = '%s'"],
-            rhs=[self.informatieobject],
-        )
-        if gebruiksrechten_files:
-            related_data_folder = self.get_parent_folders()[0]
+    def _get_gebruiksrechten(
+        self, related_data_folder: "Folder"
+    ) -> Optional["Gebruiksrechten"]:
+        """Get the gebruiksrechten of the document referred to by the OIO
 
-            # The gebruiksrechten file would be in the same folder as the OIO
-            for file in gebruiksrechten_files:
-                parent_folder = file.get_parent_folders()[0]
-                if parent_folder.objectId == related_data_folder.objectId:
-                    return file
-            else:
-                logger.error(
-                    "No gebruiksrechten file found in the 'Related data' folder of zaakfolder %s for document %s.",
-                    self.zaakfolder.name,
-                    self.informatieobject,
+        The gebruiksrechten file would be in the same folder as the OIO. If the DMS
+        doesn't support IN_FOLDER queries (e.g. Corsa), the children of the folder
+        are listed instead.
+        """
+        gebruiksrechten_files = None
+        if self.client.supports_operation("query_in_folder"):
+            informatieobject = self.informatieobject
+            if (
+                get_type(GebruiksrechtenDoc, "informatieobject") == QueriableUrl
+                and settings.CMIS_URL_MAPPING_ENABLED
+            ):
+                informatieobject = shrink_url(informatieobject)
+            query = Query(
+                "drc:gebruiksrechten",
+                where=[
+                    InFolder(related_data_folder.objectId),
+                    Comparison(
+                        "drc:gebruiksrechten__informatieobject", informatieobject
+                    ),
+                ],
+            )
+            try:
+                gebruiksrechten_files = [
+                    Gebruiksrechten(data) for data in self._query(query)
+                ]
+            except (CmisInvalidArgumentException, CmisNotSupportedException) as exc:
+                logger.info(
+                    "CMIS_ADAPTER: IN_FOLDER query failed (%s), "
+                    "listing the 'Related data' folder instead.",
+                    exc,
                 )
+                self.client.operation_failed("query_in_folder", exc)
+
+        if gebruiksrechten_files is None:
+            gebruiksrechten_files = related_data_folder.get_children_content_objects(
+                Gebruiksrechten, properties=["drc:gebruiksrechten__informatieobject"]
+            )
+
+        for file in gebruiksrechten_files:
+            if file.informatieobject == self.informatieobject:
+                return file
+        else:
+            logger.error(
+                "No gebruiksrechten file found in the 'Related data' folder of zaakfolder %s for document %s.",
+                self.zaakfolder.name,
+                self.informatieobject,
+            )
+
+    def _query(self, query: Query) -> List[dict]:
+        """Run a query and return the extracted data of the results"""
+        soap_envelope = make_soap_envelope(
+            auth=(self.client.user, self.client.password),
+            repository_id=self.client.main_repo_id,
+            statement=query.get_statement(),
+            cmis_action="query",
+        )
+        logger.debug(soap_envelope.toprettyxml())
+
+        try:
+            soap_response = self.client.request(
+                "DiscoveryService", soap_envelope=soap_envelope.toxml()
+            )
+        except CmisRuntimeException as exc:
+            # Corsa raises an error for queries that return no results
+            if "objectNotFound" in exc.message:
+                return []
+            elif "notSupported" in exc.message:
+                raise CmisNotSupportedException(
+                    status=exc.status, url=exc.url, message=exc.message, code=exc.code
+                ) from exc
+            elif "invalidArgument" in exc.message:
+                raise CmisInvalidArgumentException(
+                    status=exc.status, url=exc.url, message=exc.message, code=exc.code
+                ) from exc
+            raise
+
+        xml_response = extract_xml_from_soap(soap_response)
+        logger.debug(pretty_xml(xml_response))
+        return extract_object_properties_from_xml(xml_response, "query")
 
 
 class Folder(CMISBaseObject):
@@ -641,12 +1051,14 @@ class Folder(CMISBaseObject):
         else:
             object_type_id = "cmis:folder"
 
-        query = CMISQuery(f"SELECT * FROM {object_type_id} WHERE cmis:parentId = '%s'")
+        query = Query(
+            object_type_id, where=[Comparison("cmis:parentId", str(self.objectId))]
+        )
 
         soap_envelope = make_soap_envelope(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
-            statement=query(str(self.objectId)),
+            statement=query.get_statement(),
             cmis_action="query",
         )
         logger.debug(soap_envelope.toprettyxml())
@@ -685,14 +1097,18 @@ class Folder(CMISBaseObject):
         else:
             object_type_id = "cmis:folder"
 
-        query = CMISQuery(
-            f"SELECT * FROM {object_type_id} WHERE cmis:parentId = '%s' AND cmis:name = '%s'"
+        query = Query(
+            object_type_id,
+            where=[
+                Comparison("cmis:parentId", str(self.objectId)),
+                Comparison("cmis:name", name),
+            ],
         )
 
         soap_envelope = make_soap_envelope(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
-            statement=query(str(self.objectId), name),
+            statement=query.get_statement(),
             cmis_action="query",
         )
         logger.debug(soap_envelope.toprettyxml())
@@ -715,8 +1131,12 @@ class Folder(CMISBaseObject):
             return None
         return type(self)(extracted_data[0])
 
-    def delete_tree(self):
-        """Delete the folder and all its contents"""
+    def delete_tree(self) -> List[str]:
+        """Delete the folder and all its contents
+
+        :return: list of strings, the objectIds of the objects that could not be
+            deleted
+        """
 
         # With Corsa, locked documents cause an error, so 'continue_on_failure' is needed
         soap_envelope = make_soap_envelope(
@@ -731,43 +1151,84 @@ class Folder(CMISBaseObject):
         soap_response = self.client.request(
             "ObjectService", soap_envelope=soap_envelope.toxml()
         )
+        # The folder can contain objects of any type
+        invalidate_queries()
+        forget_folder(self)
         xml_response = extract_xml_from_soap(soap_response)
         logger.debug(pretty_xml(xml_response))
 
+        return extract_failed_to_delete(xml_response)
+
     def get_children_documents(
-        self, convert_to_document_type: bool = True
+        self, convert_to_document_type: bool = True, properties: List[str] = None
     ) -> List[Union[Document, dict]]:
-        soap_envelope = make_soap_envelope(
-            auth=(self.client.user, self.client.password),
-            repository_id=self.client.main_repo_id,
-            cmis_action="getChildren",
-            folder_id=self.objectId,
+        return self.get_children_content_objects(
+            Document,
+            convert_to_object_type=convert_to_document_type,
+            properties=properties,
         )
-        logger.debug(soap_envelope.toprettyxml())
 
-        soap_response = self.client.request(
-            "NavigationService", soap_envelope=soap_envelope.toxml()
+    def get_children_content_objects(
+        self,
+        object_type: type,
+        convert_to_object_type: bool = True,
+        properties: List[str] = None,
+        page_size: int = 100,
+    ) -> List[Union[CMISContentObject, dict]]:
+        """Get the content objects of the given type in the current folder
+
+        The children are listed page by page, until the DMS reports that there are
+        no more items.
+
+        :param object_type: type, the type of the content objects (e.g. Document)
+        :param convert_to_object_type: bool, whether to return objects of the given
+            type or the extracted properties
+        :param properties: list of strings, the properties to retrieve (default all)
+        :param page_size: int, the number of children requested at once
+        :return: list of objects
+        """
+        objecttype_id = (
+            f"{self.client.get_object_type_id_prefix(object_type.type_name)}"
+            f"{object_type.table}"
         )
+        objects = []
+        skip_count = 0
+        while True:
+            soap_envelope = make_soap_envelope(
+                auth=(self.client.user, self.client.password),
+                repository_id=self.client.main_repo_id,
+                cmis_action="getChildren",
+                folder_id=self.objectId,
+                property_filter=build_property_filter(properties),
+                include_allowable_actions="false",
+                include_relationships="none",
+                max_items=page_size,
+                skip_count=skip_count,
+            )
+            logger.debug(soap_envelope.toprettyxml())
 
-        xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
+            soap_response = self.client.request(
+                "NavigationService", soap_envelope=soap_envelope.toxml()
+            )
 
-        extracted_data = extract_object_properties_from_xml(xml_response, "getChildren")
-        documents = []
-        document_objecttype_id = (
-            f"{self.client.get_object_type_id_prefix(Document.type_name)}drc:document"
-        )
-        for object_data in extracted_data:
-            if (
-                object_data["properties"]["cmis:objectTypeId"]["value"]
-                == document_objecttype_id
-            ):
-                if convert_to_document_type:
-                    documents.append(Document(object_data))
+            xml_response = extract_xml_from_soap(soap_response)
+            logger.debug(pretty_xml(xml_response))
+
+            extracted_data = extract_object_properties_from_xml(
+                xml_response, "getChildren"
+            )
+            for object_data in extracted_data:
+                object_type_value = object_data["properties"]["cmis:objectTypeId"]
+                if object_type_value["value"] != objecttype_id:
+                    continue
+                if convert_to_object_type:
+                    objects.append(object_type(object_data, partial=bool(properties)))
                 else:
-                    documents.append(object_data)
+                    objects.append(object_data)
 
-        return documents
+            skip_count += len(extracted_data)
+            if not extracted_data or not extract_has_more_items(xml_response):
+                return objects
 
 
 class ZaakTypeFolder(Folder):
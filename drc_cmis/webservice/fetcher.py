@@ -1,3 +1,4 @@
+from drc_cmis.cache import get_cache
 from drc_cmis.connections import use_cmis_connection_pool
 
 from .request import SOAPRequest
@@ -8,16 +9,19 @@ class SOAPRepositoryInfoFetcher:
     """
     Retrieve the information about a repository in the DMS
 
-    Caching is done based on the repository ID.
+    Caching is done based on the repository ID, in the "repository_info" cache.
     """
 
-    def __init__(self):
-        self.cache = {}
+    @property
+    def cache(self):
+        return get_cache("repository_info")
 
     @use_cmis_connection_pool
     def fetch(self, repo_id: str, base_url: str, user: str, password: str) -> dict:
-        if repo_id in self.cache:
-            return self.cache[repo_id]
+        cache = self.cache
+        repo_info = cache.get(repo_id) if cache is not None else None
+        if repo_info is not None:
+            return repo_info
 
         request = SOAPRequest(base_url)
 
@@ -33,15 +37,17 @@ class SOAPRepositoryInfoFetcher:
 
         xml_response = extract_xml_from_soap(soap_response)
 
-        self.cache[repo_id] = extract_repo_info_from_xml(xml_response)
+        repo_info = extract_repo_info_from_xml(xml_response)
+        if cache is not None:
+            cache.set(repo_id, repo_info)
 
-        return self.cache[repo_id]
+        return repo_info
 
 
 # sentinel instance, with a cache
 repo_info_fetcher = SOAPRepositoryInfoFetcher()
 """
 Sentinel repository info fetcher instance, used by :class:`drc_cmis.webservice.client.SOAPCMISClient`.
-Note that you can mutate ``repo_info_fetcher.cache`` to replace it with another cache
-backend.
+The cache backend can be configured with the "repository_info" entry of the
+``CMIS_CACHES`` setting.
 """
@@ -0,0 +1,54 @@
+import logging
+from contextlib import ContextDecorator
+from threading import local
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = ["is_return_minimal", "return_minimal"]
+
+
+_state = local()
+
+
+def is_return_minimal() -> bool:
+    return getattr(_state, "num_blocks", 0) > 0
+
+
+class ReturnMinimal(ContextDecorator):
+    """
+    Skip the extra ``getObject`` round-trip after write operations in a given block.
+
+    An instance can be used either as a decorator or as a context manager.
+
+    Inside the block, the write operations of the web service binding return a
+    lightweight object built from the properties that were sent to the DMS and the
+    objectId it returned. The full state is only retrieved from the DMS when a
+    property is read that is not known locally.
+    """
+
+    def __enter__(self):
+        _state.num_blocks = getattr(_state, "num_blocks", 0) + 1
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _state.num_blocks -= 1
+        logger.debug(
+            "Exiting ReturnMinimal block, there are %d blocks left", _state.num_blocks
+        )
+
+
+def return_minimal(func=None):
+    """
+    Decorator or context manager to enable the return-minimal mode.
+
+    Usage:
+
+        >>> with return_minimal():
+        ...     document = client.create_document(...)
+    """
+    # @return_minimal bare decorator syntax
+    if callable(func):
+        return ReturnMinimal()(func)
+    # @return_minimal() or context manager: with return_minimal(): ...
+    else:
+        return ReturnMinimal()
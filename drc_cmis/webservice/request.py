@@ -1,7 +1,10 @@
 import logging
+import re
 from typing import BinaryIO, List, Optional, Tuple, Union
 
-from drc_cmis.connections import get_session
+from drc_cmis.connections import get_session, register_round_trip
+from drc_cmis.identity_map import clear_identity_map
+from drc_cmis.single_flight import coalesce, make_key, register_write
 from drc_cmis.utils.exceptions import (
     CmisBaseException,
     CmisInvalidArgumentException,
@@ -15,6 +18,24 @@ from drc_cmis.utils.exceptions import (
 logger = logging.getLogger(__name__)
 
 
+# CMIS actions that don't modify anything in the DMS
+READ_ACTIONS = {
+    "getAllVersions",
+    "getChildren",
+    "getContentStream",
+    "getFolderParent",
+    "getObject",
+    "getObjectByPath",
+    "getObjectOfLatestVersion",
+    "getObjectParents",
+    "getProperties",
+    "getRepositories",
+    "getRepositoryInfo",
+    "getTypeDefinition",
+    "query",
+}
+
+
 class SOAPRequest:
     _boundary = "------=_Part_52_1132425564.1594208078802"
 
@@ -86,9 +107,30 @@ class SOAPRequest:
                 body += content_stream.read()  # Reads binary
 
         body += f"{self._boundary}--\n".encode("utf-8")
-        soap_response = self.session.post(
-            url, data=body, headers=self._headers, files=[]
-        )
+
+        def send_request():
+            register_round_trip()
+            return self.session.post(url, data=body, headers=self._headers, files=[])
+
+        action = re.search(r"<ns:(\w+)>", soap_envelope)
+        if action is not None and action.group(1) in READ_ACTIONS and not attachments:
+            # The security header differs for every request, so only the credentials
+            # and the body of the envelope identify the request
+            credentials = re.search(
+                r"<wsse:Username>.*</wsse:Password>", soap_envelope, re.DOTALL
+            )
+            soap_body = soap_envelope.partition("<soapenv:Body>")[2]
+            soap_response = coalesce(
+                make_key(url, credentials and credentials.group(0), soap_body),
+                send_request,
+            )
+        else:
+            # Objects fetched before a write operation can be outdated
+            clear_identity_map()
+            try:
+                soap_response = send_request()
+            finally:
+                register_write()
         if not soap_response.ok:
             error = soap_response.text
             if soap_response.status_code == 401:
@@ -116,11 +116,36 @@ def extract_repo_info_from_xml(xml_data: str) -> dict:
     return properties
 
 
-def extract_num_items(xml_data: str) -> int:
-    """Extract the number of items in the SOAP XML returned by a query"""
+def extract_num_items(xml_data: str) -> Optional[int]:
+    """Extract the number of items in the SOAP XML returned by a query
+
+    :return: int, the total number of results, or None if the DMS doesn't report it
+    """
+    parsed_xml = minidom.parseString(xml_data)
+    nodes = parsed_xml.getElementsByTagNameNS("*", "numItems")
+    if len(nodes) == 0 or nodes[0].firstChild is None:
+        return None
+    return int(nodes[0].firstChild.nodeValue.strip())
+
+
+def extract_has_more_items(xml_data: str) -> bool:
+    """Extract whether a query has more results than the ones in the SOAP XML"""
     parsed_xml = minidom.parseString(xml_data)
-    folder_id_node = parsed_xml.getElementsByTagName("numItems")[0]
-    return int(folder_id_node.firstChild.nodeValue)
+    nodes = parsed_xml.getElementsByTagNameNS("*", "hasMoreItems")
+    if len(nodes) == 0 or nodes[0].firstChild is None:
+        return False
+    return nodes[0].firstChild.nodeValue.strip().lower() == "true"
+
+
+def extract_failed_to_delete(xml_data: str) -> List[str]:
+    """Extract the objectIds of the objects that deleteTree could not delete"""
+    parsed_xml = minidom.parseString(xml_data)
+    object_ids = []
+    for failed_node in parsed_xml.getElementsByTagNameNS("*", "failedToDelete"):
+        for node in failed_node.getElementsByTagNameNS("*", "objectIds"):
+            if node.firstChild is not None:
+                object_ids.append(node.firstChild.nodeValue.strip())
+    return object_ids
 
 
 def extract_content_stream_properties_from_xml(xml_data: str) -> dict:
@@ -158,6 +183,7 @@ def make_soap_envelope(
     properties: Optional[dict] = None,
     statement: Optional[str] = None,
     object_id: Optional[str] = None,
+    source_id: Optional[str] = None,
     folder_id: Optional[str] = None,
     content_id: Optional[str] = None,
     content_filename: Optional[str] = None,
@@ -166,6 +192,11 @@ def make_soap_envelope(
     source_folder_id: Optional[str] = None,
     target_folder_id: Optional[str] = None,
     continue_on_failure: Optional[str] = None,
+    max_items: Optional[int] = None,
+    skip_count: Optional[int] = None,
+    property_filter: Optional[str] = None,
+    include_allowable_actions: Optional[str] = None,
+    include_relationships: Optional[str] = None,
 ) -> minidom.Document:
     """Create SOAP envelope from data provided
 
@@ -176,6 +207,7 @@ def make_soap_envelope(
     :param statement: str, SQL statement used in query requests
     :param object_id: str, ID of the node on which to act (e.g.
         workspace://SpacesStore/2bdd4f3d-851f-499b-99ec-142b82ce3c0d)
+    :param source_id: str, ID of the document to copy (e.g. needed when creating documents from source)
     :param folder_id: str, ID of a folder (e.g. needed when creating documents)
     :param content_id: str, ID of the content of a document (as the content will be a MTOM attachment)
     :param content_filename: str, name of the file that will be a MTOM attachment. Includes files extension.
@@ -184,6 +216,11 @@ def make_soap_envelope(
     :param source_folder_id: str, folder objectId from which to copy a document
     :param target_folder_id: str, folder objectId to which to copy a document
     :param continue_on_failure: str, whether to continue deleting after an error in the deleteTree call
+    :param max_items: int, maximum number of results returned by a query
+    :param skip_count: int, number of results to skip in a query
+    :param property_filter: str, comma separated list of the properties to return
+    :param include_allowable_actions: str, true or false whether to return the allowable actions
+    :param include_relationships: str, which relationships to return (e.g. none)
     :return: minidom document
     """
 
@@ -314,6 +351,45 @@ def make_soap_envelope(
         object_id_element.appendChild(object_id_text)
         action_element.appendChild(object_id_element)
 
+    # Selection of the returned properties
+    if property_filter is not None:
+        filter_element = xml_doc.createElement("ns:filter")
+        filter_text = xml_doc.createTextNode(property_filter)
+        filter_element.appendChild(filter_text)
+        action_element.appendChild(filter_element)
+
+    if include_allowable_actions is not None:
+        allowable_actions_element = xml_doc.createElement("ns:includeAllowableActions")
+        allowable_actions_text = xml_doc.createTextNode(include_allowable_actions)
+        allowable_actions_element.appendChild(allowable_actions_text)
+        action_element.appendChild(allowable_actions_element)
+
+    if include_relationships is not None:
+        relationships_element = xml_doc.createElement("ns:includeRelationships")
+        relationships_text = xml_doc.createTextNode(include_relationships)
+        relationships_element.appendChild(relationships_text)
+        action_element.appendChild(relationships_element)
+
+    # Paging of the query results
+    if max_items is not None:
+        max_items_element = xml_doc.createElement("ns:maxItems")
+        max_items_text = xml_doc.createTextNode(str(max_items))
+        max_items_element.appendChild(max_items_text)
+        action_element.appendChild(max_items_element)
+
+    if skip_count is not None:
+        skip_count_element = xml_doc.createElement("ns:skipCount")
+        skip_count_text = xml_doc.createTextNode(str(skip_count))
+        skip_count_element.appendChild(skip_count_text)
+        action_element.appendChild(skip_count_element)
+
+    # Source document
+    if source_id is not None:
+        source_id_element = xml_doc.createElement("ns:sourceId")
+        source_id_text = xml_doc.createTextNode(str(source_id))
+        source_id_element.appendChild(source_id_text)
+        action_element.appendChild(source_id_element)
+
     # File content
     if content_id is not None:
         filename = content_filename or get_random_string()
@@ -0,0 +1,398 @@
+import threading
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from drc_cmis.browser.client import CMISDRCClient
+from drc_cmis.browser.drc_document import Document, Gebruiksrechten
+from drc_cmis.bulk import chunked, run_concurrently
+from drc_cmis.client import CMISClient, QueryPage
+from drc_cmis.models import CMISConfig
+from drc_cmis.utils.exceptions import (
+    CmisInvalidArgumentException,
+    CmisNotSupportedException,
+    DocumentDoesNotExistError,
+    DocumentExistsError,
+)
+from drc_cmis.webservice.client import SOAPCMISClient
+from drc_cmis.webservice.drc_document import Gebruiksrechten as SOAPGebruiksrechten
+
+from .test_get_documents import make_document
+
+
+class RunConcurrentlyTests(SimpleTestCase):
+    def test_results_are_in_the_order_of_the_items(self):
+        results = run_concurrently(
+            lambda value: value * 2, [(i, i) for i in range(10)], concurrency=3
+        )
+
+        self.assertEqual([result.item for result in results], list(range(10)))
+        self.assertEqual([result.result for result in results], list(range(0, 20, 2)))
+
+    def test_errors_are_stored_per_item(self):
+        def func(value):
+            if value == 1:
+                raise ValueError("some error")
+            return value
+
+        results = run_concurrently(func, [("a", 0), ("b", 1), ("c", 2)], concurrency=2)
+
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertIsInstance(results[1].error, ValueError)
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+
+        def func(value):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            threading.Event().wait(0.01)
+            with lock:
+                running[0] -= 1
+
+        run_concurrently(func, [(i, i) for i in range(10)], concurrency=2)
+
+        self.assertLessEqual(max_running[0], 2)
+
+    @override_settings(CMIS_BULK_CONCURRENCY=1)
+    def test_single_thread(self):
+        thread_ids = set()
+
+        run_concurrently(
+            lambda value: thread_ids.add(threading.get_ident()), [(1, 1), (2, 2)]
+        )
+
+        self.assertEqual(thread_ids, {threading.get_ident()})
+
+    def test_chunked(self):
+        self.assertEqual(list(chunked([1, 2, 3, 4, 5], 2)), [[1, 2], [3, 4], [5]])
+
+
+class CreateDocumentsTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = CMISClient()
+        self.client.document_type = Document
+        self.client.base_url = f"http://dms.example.com/{self.id()}"
+        self.client._get_or_create_document_folder = Mock(
+            side_effect=lambda **kwargs: Mock(name="folder")
+        )
+        self.client._build_new_document_properties = Mock(
+            side_effect=lambda identification, bronorganisatie, data: {
+                "drc:document__identificatie": {"value": identification}
+            }
+        )
+        self.client._create_document_in_folder = Mock(
+            side_effect=lambda properties, *args: properties[
+                "drc:document__identificatie"
+            ]["value"]
+        )
+        self.client._register_document = Mock()
+
+    def _get_items(self, *identifications):
+        return [
+            {
+                "identification": identification,
+                "bronorganisatie": "159351741",
+                "data": {"titel": identification},
+            }
+            for identification in identifications
+        ]
+
+    def test_existing_documents_are_checked_at_once(self):
+        existing = Document(
+            {"properties": {"drc:document__identificatie": {"value": "doc-2"}}}
+        )
+        self.client._query_page = Mock(
+            return_value=QueryPage(results=[existing], has_more_items=False)
+        )
+
+        results = self.client.create_documents(
+            self._get_items("doc-1", "doc-2", "doc-3", "doc-1")
+        )
+
+        self.client._query_page.assert_called_once()
+        statement = self.client._query_page.call_args[0][1]
+        self.assertEqual(
+            statement,
+            "SELECT cmis:objectId, cmis:objectTypeId, drc:document__identificatie "
+            "FROM drc:document "
+            "WHERE drc:document__bronorganisatie = '159351741' "
+            "AND drc:document__identificatie IN ('doc-1', 'doc-2', 'doc-3')",
+        )
+        self.assertEqual([result.item for result in results], [0, 1, 2, 3])
+        self.assertEqual(
+            [result.result for result in results], ["doc-1", None, "doc-3", None]
+        )
+        self.assertIsInstance(results[1].error, DocumentExistsError)
+        self.assertIsInstance(results[3].error, DocumentExistsError)
+        self.assertEqual(self.client._register_document.call_count, 2)
+
+    def test_folders_are_resolved_once(self):
+        items = self._get_items("doc-1", "doc-2", "doc-3")
+        items[2]["zaak_data"] = {"url": "https://zaken.nl/zaak/1"}
+
+        self.client.create_documents(items, check_if_already_exists=False)
+
+        self.assertEqual(self.client._get_or_create_document_folder.call_count, 2)
+
+    def test_failed_upload(self):
+        self.client._create_document_in_folder.side_effect = [
+            "doc-1",
+            Exception("upload failed"),
+        ]
+
+        results = self.client.create_documents(
+            self._get_items("doc-1", "doc-2"),
+            concurrency=1,
+            check_if_already_exists=False,
+        )
+
+        self.assertEqual([result.ok for result in results], [True, False])
+        self.client._register_document.assert_called_once_with("doc-1")
+
+
+class DeleteDocumentsTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = CMISClient()
+        self.client.document_type = Document
+        self.client.base_url = f"http://dms.example.com/{self.id()}"
+
+        patcher = patch.object(Document, "cancel_checkout", autospec=True)
+        self.cancel_checkout = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(Document, "delete_all_versions", autospec=True)
+        self.delete_all_versions = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _make_document(self, drc_uuid, version_label="1.0", checked_out=False):
+        document = make_document(drc_uuid, version_label)
+        document.properties["cmis:isVersionSeriesCheckedOut"] = {"value": checked_out}
+        return document
+
+    def test_checkouts_are_cancelled_before_deleting(self):
+        pwc = self._make_document("uuid-2", "pwc", checked_out=True)
+        self.client.get_documents = Mock(
+            side_effect=[
+                {"uuid-1": self._make_document("uuid-1"), "uuid-2": pwc},
+                {"uuid-2": self._make_document("uuid-2", "1.1")},
+            ]
+        )
+
+        results = self.client.delete_documents(["uuid-1", "uuid-2", "uuid-3"])
+
+        self.assertEqual(
+            [result.item for result in results], ["uuid-1", "uuid-2", "uuid-3"]
+        )
+        self.assertEqual([result.ok for result in results], [True, True, False])
+        self.assertIsInstance(results[2].error, DocumentDoesNotExistError)
+        self.cancel_checkout.assert_called_once_with(pwc)
+        self.assertEqual(self.client.get_documents.call_args[0][0], ["uuid-2"])
+        deleted = {
+            call[0][0].objectId for call in self.delete_all_versions.call_args_list
+        }
+        self.assertEqual(deleted, {"uuid-1;1.0", "uuid-2;1.1"})
+
+    def test_failed_cancel_checkout(self):
+        pwc = self._make_document("uuid-1", "pwc", checked_out=True)
+        self.client.get_documents = Mock(return_value={"uuid-1": pwc})
+        self.cancel_checkout.side_effect = Exception("cancel failed")
+
+        results = self.client.delete_documents(["uuid-1"])
+
+        self.assertFalse(results[0].ok)
+        self.delete_all_versions.assert_not_called()
+
+    def test_delete_object_deletes_the_latest_version(self):
+        document = self._make_document("uuid-1")
+        latest_version = self._make_document("uuid-1", "1.1")
+        document._get_object_of_latest_version = Mock(return_value=latest_version)
+
+        document.delete_object()
+
+        self.cancel_checkout.assert_not_called()
+        self.delete_all_versions.assert_called_once_with(latest_version)
+
+
+class DeleteContentObjectsTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = CMISClient()
+        self.client.gebruiksrechten_type = Gebruiksrechten
+        self.client.base_url = f"http://dms.example.com/{self.id()}"
+
+    def test_objects_are_queried_at_once(self):
+        gebruiksrechten = Mock(
+            properties={"drc:gebruiksrechten__uuid": {"value": "uuid-1"}}
+        )
+        self.client._query_page = Mock(
+            return_value=QueryPage(results=[gebruiksrechten], has_more_items=False)
+        )
+
+        results = self.client.delete_content_objects(
+            ["uuid-1", "uuid-2"], object_type="gebruiksrechten"
+        )
+
+        statement = self.client._query_page.call_args[0][1]
+        self.assertEqual(
+            statement,
+            "SELECT * FROM drc:gebruiksrechten "
+            "WHERE drc:gebruiksrechten__uuid IN ('uuid-1', 'uuid-2')",
+        )
+        self.assertEqual([result.ok for result in results], [True, False])
+        gebruiksrechten.delete_object.assert_called_once_with()
+
+
+class BulkUpdatePropertiesTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = CMISDRCClient()
+
+        patcher = patch.object(
+            CMISDRCClient, "base_url", f"http://dms.example.com/{self.id()}"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.documents = [make_document(f"uuid-{i}") for i in range(3)]
+
+        patcher = patch.object(
+            Document,
+            "update_properties",
+            autospec=True,
+            side_effect=lambda document, properties: document,
+        )
+        self.update_properties = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_objects_are_updated_in_chunks(self):
+        def post_request(url, data):
+            object_ids = [
+                value for key, value in data.items() if key.startswith("objectId")
+            ]
+            # The last document is not updated
+            return [
+                {"id": object_id, "newId": f"{object_id}-new"}
+                for object_id in object_ids
+                if object_id != "uuid-2;1.0"
+            ]
+
+        self.client.post_request = Mock(side_effect=post_request)
+
+        with self.assertLogs("drc_cmis.browser.client", "WARNING") as logs:
+            results = self.client.bulk_update_properties(
+                self.documents, {"drc:document__verwijderd": "true"}, chunk_size=2
+            )
+
+        self.assertEqual(self.client.post_request.call_count, 2)
+        self.assertEqual(
+            self.client.post_request.call_args_list[0][1]["data"],
+            {
+                "cmisaction": "bulkUpdate",
+                "objectId[0]": "uuid-0;1.0",
+                "objectId[1]": "uuid-1;1.0",
+                "propertyId[0]": "drc:document__verwijderd",
+                "propertyValue[0]": "true",
+            },
+        )
+        self.assertEqual(
+            [result.result for result in results],
+            ["uuid-0;1.0-new", "uuid-1;1.0-new", "uuid-2;1.0"],
+        )
+        self.update_properties.assert_called_once_with(
+            self.documents[2], {"drc:document__verwijderd": "true"}
+        )
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("uuid-2;1.0", logs.output[0])
+
+    def test_fallback_without_bulk_update(self):
+        self.client.post_request = Mock(
+            side_effect=CmisNotSupportedException(405, "", "not supported", 405)
+        )
+
+        results = self.client.bulk_update_properties(
+            self.documents, {"drc:document__verwijderd": "true"}
+        )
+
+        self.assertEqual([result.ok for result in results], [True, True, True])
+        self.assertEqual(self.update_properties.call_count, 3)
+        self.assertFalse(self.client.supports_operation("bulkUpdate"))
+
+    def test_invalid_properties_are_raised(self):
+        self.client.post_request = Mock(
+            side_effect=CmisInvalidArgumentException(400, "", "invalid property", 400)
+        )
+
+        with self.assertRaises(CmisInvalidArgumentException):
+            self.client.bulk_update_properties(
+                self.documents, {"drc:document__onbekend": "true"}
+            )
+
+        self.update_properties.assert_not_called()
+        self.assertTrue(self.client.supports_operation("bulkUpdate"))
+
+
+@override_settings(CMIS_URL_MAPPING_ENABLED=False)
+class BulkUpdatePropertiesBindingsTests(TestCase):
+    """The properties are passed by CMIS property name to both bindings"""
+
+    properties = {
+        "drc:gebruiksrechten__omschrijving_voorwaarden": "Nieuwe voorwaarden",
+        "cmis:description": "Bijgewerkt",
+    }
+
+    def setUp(self):
+        super().setUp()
+        CMISConfig.objects.create()
+
+        for client_class in [CMISDRCClient, SOAPCMISClient]:
+            patcher = patch.object(
+                client_class, "base_url", f"http://dms.example.com/{self.id()}"
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_browser_binding(self):
+        client = CMISDRCClient()
+        client.post_request = Mock(return_value=[{"id": "1;1.0"}])
+        gebruiksrechten = Gebruiksrechten({"properties": {}})
+        gebruiksrechten.properties["cmis:objectId"] = {"value": "1;1.0"}
+
+        results = client.bulk_update_properties([gebruiksrechten], self.properties)
+
+        self.assertTrue(results[0].ok)
+        data = client.post_request.call_args[1]["data"]
+        self.assertEqual(
+            data["propertyId[0]"], "drc:gebruiksrechten__omschrijving_voorwaarden"
+        )
+        self.assertEqual(data["propertyValue[0]"], "Nieuwe voorwaarden")
+        self.assertEqual(data["propertyId[1]"], "cmis:description")
+        self.assertEqual(data["propertyValue[1]"], "Bijgewerkt")
+
+    def test_webservice_binding(self):
+        client = SOAPCMISClient()
+        gebruiksrechten = SOAPGebruiksrechten({"properties": {}})
+        gebruiksrechten.properties["cmis:objectId"] = {"value": "1;1.0"}
+
+        with patch.object(
+            SOAPGebruiksrechten,
+            "update_properties",
+            autospec=True,
+            side_effect=lambda cmis_object, properties: cmis_object,
+        ) as update_properties:
+            results = client.bulk_update_properties([gebruiksrechten], self.properties)
+
+        self.assertTrue(results[0].ok)
+        update_properties.assert_called_once_with(
+            gebruiksrechten,
+            {
+                "drc:gebruiksrechten__omschrijving_voorwaarden": {
+                    "value": "Nieuwe voorwaarden",
+                    "type": "propertyString",
+                },
+                "cmis:description": {"value": "Bijgewerkt", "type": "propertyString"},
+            },
+        )
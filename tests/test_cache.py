@@ -0,0 +1,212 @@
+import os
+import pickle
+import sqlite3
+import stat
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from django.core.cache import cache as django_cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from freezegun import freeze_time
+
+from drc_cmis.browser.drc_document import Folder
+from drc_cmis.cache import DjangoCache, LocMemCache, SharedMemoryCache, get_cache
+from drc_cmis.client import CMISClient
+
+
+class CacheBackendTestsMixin:
+    def get_cache(self, **kwargs):
+        raise NotImplementedError
+
+    def test_get_and_set(self):
+        cache = self.get_cache()
+
+        self.assertIsNone(cache.get("some-key"))
+        cache.set("some-key", {"some": "value"})
+
+        self.assertEqual(cache.get("some-key"), {"some": "value"})
+        self.assertEqual(cache.get_stats(), {"hits": 1, "misses": 1})
+
+    def test_namespaced_keys(self):
+        cache = self.get_cache()
+        other_cache = self.get_cache(name="other")
+
+        cache.set("some-key", "value")
+
+        self.assertIsNone(other_cache.get("some-key"))
+
+    def test_timeout(self):
+        cache = self.get_cache()
+
+        cache.set("some-key", "value", timeout=0)
+
+        self.assertIsNone(cache.get("some-key"))
+
+    def test_add_and_delete(self):
+        cache = self.get_cache()
+
+        self.assertTrue(cache.add("some-key", "value"))
+        self.assertFalse(cache.add("some-key", "other value"))
+        self.assertEqual(cache.get("some-key"), "value")
+
+        cache.delete("some-key")
+
+        self.assertIsNone(cache.get("some-key"))
+
+
+class LocMemCacheTests(CacheBackendTestsMixin, SimpleTestCase):
+    def get_cache(self, name="test", **kwargs):
+        return LocMemCache(name, **kwargs)
+
+    def test_least_recently_used_entries_are_removed(self):
+        cache = self.get_cache(max_entries=2)
+        cache.set("first", 1)
+        cache.set("second", 2)
+        cache.get("first")
+
+        cache.set("third", 3)
+
+        self.assertEqual(cache.get("first"), 1)
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual(cache.get("third"), 3)
+
+
+class DjangoCacheTests(CacheBackendTestsMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        django_cache.clear()
+
+    def get_cache(self, name="test", **kwargs):
+        return DjangoCache(name, **kwargs)
+
+    def test_keys_in_django_cache(self):
+        self.get_cache().set("some-key", "value")
+
+        self.assertEqual(django_cache.get("drc_cmis:test:some-key"), "value")
+
+
+class SharedMemoryCacheTests(CacheBackendTestsMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache.sqlite3")
+
+    def get_cache(self, name="test", **kwargs):
+        return SharedMemoryCache(name, path=self.path, **kwargs)
+
+    def test_shared_between_instances(self):
+        self.get_cache().set("some-key", "value")
+
+        self.assertEqual(self.get_cache().get("some-key"), "value")
+
+    def test_least_recently_used_entries_are_removed(self):
+        cache = self.get_cache(max_entries=2)
+        other_cache = self.get_cache(name="other", max_entries=2)
+        cache.set("first", 1)
+        cache.set("second", 2)
+        other_cache.set("first", 1)
+        cache.get("first")
+
+        cache.set("third", 3)
+
+        self.assertEqual(cache.get("first"), 1)
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual(other_cache.get("first"), 1)
+
+    @freeze_time("2020-07-27 12:00:00")
+    def test_least_recently_used_entries_are_removed_with_frozen_time(self):
+        cache = self.get_cache(max_entries=2)
+        cache.set("first", 1)
+        cache.set("second", 2)
+        cache.get("first")
+
+        cache.set("third", 3)
+
+        self.assertEqual(cache.get("first"), 1)
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual(cache.get("third"), 3)
+
+    def test_path_is_required(self):
+        with self.assertRaises(ImproperlyConfigured):
+            SharedMemoryCache("test")
+
+    def test_file_is_private(self):
+        self.get_cache().set("some-key", "value")
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+    def test_file_accessible_by_others_is_refused(self):
+        with open(self.path, "w"):
+            pass
+        os.chmod(self.path, 0o666)
+
+        with self.assertRaises(ImproperlyConfigured):
+            self.get_cache().get("some-key")
+
+    def test_unsigned_values_are_ignored(self):
+        cache = self.get_cache()
+        cache.set("some-key", "value")
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            "UPDATE drc_cmis_cache SET value = ?", (pickle.dumps("planted value"),)
+        )
+        connection.commit()
+        connection.close()
+
+        self.assertIsNone(cache.get("some-key"))
+
+
+class GetCacheTests(SimpleTestCase):
+    def test_defaults(self):
+        self.assertIsInstance(get_cache("repository_info"), LocMemCache)
+        self.assertIsInstance(get_cache("queries"), DjangoCache)
+        self.assertIsNone(get_cache("folders"))
+        self.assertIs(get_cache("repository_info"), get_cache("repository_info"))
+
+    @override_settings(
+        CMIS_CACHES={
+            "folders": {
+                "BACKEND": "drc_cmis.cache.DjangoCache",
+                "TIMEOUT": 60,
+                "OPTIONS": {"ALIAS": "default"},
+            }
+        }
+    )
+    def test_configured(self):
+        cache = get_cache("folders")
+
+        self.assertIsInstance(cache, DjangoCache)
+        self.assertEqual(cache.default_timeout, 60)
+        self.assertEqual(cache.alias, "default")
+
+    @override_settings(CMIS_METADATA_CACHE_ENABLED=True, CMIS_METADATA_CACHE_TIMEOUT=5)
+    def test_legacy_metadata_settings(self):
+        cache = get_cache("metadata")
+
+        self.assertIsInstance(cache, DjangoCache)
+        self.assertEqual(cache.default_timeout, 5)
+
+
+@override_settings(CMIS_CACHES={"folders": {"BACKEND": "drc_cmis.cache.LocMemCache"}})
+class FolderCacheTests(SimpleTestCase):
+    def test_folders_are_cached(self):
+        client = CMISClient()
+        client.folder_type = Folder
+        child_folder = SimpleNamespace(
+            properties={
+                "cmis:objectId": {"value": "child-id"},
+                "cmis:name": {"value": "child"},
+            }
+        )
+        parent = Mock(objectId="parent-id")
+        parent.get_child_folder.return_value = child_folder
+
+        client.get_or_create_folder("child", parent)
+        folder = client.get_or_create_folder("child", parent)
+
+        parent.get_child_folder.assert_called_once()
+        self.assertEqual(folder.properties["cmis:objectId"]["value"], "child-id")
@@ -1,18 +1,24 @@
 import datetime
 import io
 import os
+import tempfile
 import uuid
 from unittest import skipIf
 from unittest.mock import patch
 
-from django.test import TestCase, tag
+from django.core.cache import cache
+from django.test import TestCase, override_settings, tag
 from django.utils import timezone
 
 import pytz
 from freezegun import freeze_time
 
-from drc_cmis.models import CMISConfig, UrlMapping
+from drc_cmis.client import CMISClient
+from drc_cmis.connections import track_round_trips
+from drc_cmis.identity_map import use_identity_map
+from drc_cmis.models import CMISConfig, DocumentIndexEntry, UrlMapping
 from drc_cmis.utils.exceptions import (
+    CmisNotSupportedException,
     DocumentDoesNotExistError,
     DocumentExistsError,
     DocumentLockedException,
@@ -21,6 +27,7 @@ from drc_cmis.utils.exceptions import (
     FolderDoesNotExistError,
     LockDidNotMatchException,
 )
+from drc_cmis.utils.mapper import mapper
 
 from .mixins import DMSMixin
 
@@ -467,6 +474,54 @@ class CMISClientContentObjectsTests(DMSMixin, TestCase):
         with self.assertRaises(DocumentDoesNotExistError):
             self.cmis_client.get_content_object(drc_uuid=oio.uuid, object_type="oio")
 
+    def test_delete_content_objects(self):
+        gebruiksrechten = [
+            self.cmis_client.create_content_object(
+                data={}, object_type="gebruiksrechten"
+            )
+            for _ in range(2)
+        ]
+        missing_uuid = str(uuid.uuid4())
+
+        results = self.cmis_client.delete_content_objects(
+            [gebruiksrechten[0].uuid, missing_uuid, gebruiksrechten[1].uuid],
+            object_type="gebruiksrechten",
+        )
+
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertIsInstance(results[1].error, DocumentDoesNotExistError)
+        for content_object in gebruiksrechten:
+            with self.assertRaises(DocumentDoesNotExistError):
+                self.cmis_client.get_content_object(
+                    drc_uuid=content_object.uuid, object_type="gebruiksrechten"
+                )
+
+    def test_bulk_update_properties(self):
+        gebruiksrechten = [
+            self.cmis_client.create_content_object(
+                data={}, object_type="gebruiksrechten"
+            )
+            for _ in range(3)
+        ]
+        properties = {
+            mapper(
+                "omschrijving_voorwaarden", type="gebruiksrechten"
+            ): "Nieuwe voorwaarden"
+        }
+
+        results = self.cmis_client.bulk_update_properties(gebruiksrechten, properties)
+
+        self.assertEqual(
+            [result.item for result in results],
+            [content_object.objectId for content_object in gebruiksrechten],
+        )
+        self.assertTrue(all(result.ok for result in results))
+        for content_object in gebruiksrechten:
+            updated = self.cmis_client.get_content_object(
+                drc_uuid=content_object.uuid, object_type="gebruiksrechten"
+            )
+            self.assertEqual(updated.omschrijving_voorwaarden, "Nieuwe voorwaarden")
+
     @patch("drc_cmis.webservice.drc_document.ObjectInformatieObject._reorganise_files")
     def test_delete_oio(self, m):
         oio = self.cmis_client.create_content_object(data={}, object_type="oio")
@@ -651,6 +706,48 @@ class CMISClientOIOTests(DMSMixin, TestCase):
             zaak_folder.objectId, document.get_parent_folders()[0].objectId
         )
 
+    def test_create_zaak_oio_with_document_created_in_zaak_folder(self):
+        properties = {
+            "bronorganisatie": "159351741",
+            "creatiedatum": timezone.now(),
+            "titel": "detailed summary",
+            "bestandsnaam": "dummy.txt",
+            "vertrouwelijkheidaanduiding": "openbaar",
+        }
+        document = self.cmis_client.create_document(
+            identification="9124c668-db3f-4198-8823-4c21fed430d0",
+            data=properties,
+            content=io.BytesIO(b"some file content"),
+            bronorganisatie="159351741",
+            zaak_data=self.zaak,
+            zaaktype_data=self.zaaktype,
+        )
+
+        # The document is created directly in the zaak folder
+        zaak_folder = self.cmis_client.get_or_create_zaak_folder(
+            self.zaaktype, self.zaak
+        )
+        self.assertEqual(
+            zaak_folder.objectId, document.get_parent_folders()[0].objectId
+        )
+
+        oio = {
+            "object": self.zaak_url,
+            "informatieobject": f"https://drc.utrechtproeftuin.nl/api/v1/documenten/{document.uuid}",
+            "object_type": "zaak",
+        }
+        with patch.object(
+            type(document), "move_object", autospec=True
+        ) as mock_move_object:
+            self.cmis_client.create_oio(
+                oio_data=oio, zaak_data=self.zaak, zaaktype_data=self.zaaktype
+            )
+
+        mock_move_object.assert_not_called()
+        self.assertEqual(
+            zaak_folder.objectId, document.get_parent_folders()[0].objectId
+        )
+
     def test_create_zaak_oio_with_linked_document(self):
         # Create document
         properties = {
@@ -1187,6 +1284,55 @@ class CMISClientOIOTests(DMSMixin, TestCase):
             other_folder.objectId, document_copy.get_parent_folders()[0].objectId
         )
 
+    def test_get_documents_for_zaak(self):
+        documents = [
+            self.cmis_client.create_document(
+                identification=str(uuid.uuid4()),
+                bronorganisatie="159351741",
+                data={"titel": f"document {i}"},
+                content=io.BytesIO(b"some file content"),
+            )
+            for i in range(2)
+        ]
+        # The first document is moved to the zaak folder
+        self.cmis_client.create_oio(
+            oio_data={
+                "object": self.zaak_url,
+                "informatieobject": f"https://drc.utrechtproeftuin.nl/api/v1/documenten/{documents[0].uuid}",
+                "object_type": "zaak",
+            },
+            zaak_data=self.zaak,
+            zaaktype_data=self.zaaktype,
+        )
+        # The second document is related to another zaak first, so it is copied
+        for zaak_data, zaaktype_data in [
+            (self.another_zaak, self.another_zaaktype),
+            (self.zaak, self.zaaktype),
+        ]:
+            self.cmis_client.create_oio(
+                oio_data={
+                    "object": zaak_data["url"],
+                    "informatieobject": f"https://drc.utrechtproeftuin.nl/api/v1/documenten/{documents[1].uuid}",
+                    "object_type": "zaak",
+                },
+                zaak_data=zaak_data,
+                zaaktype_data=zaaktype_data,
+            )
+
+        zaak_documents = list(
+            self.cmis_client.get_documents_for_zaak(
+                self.zaak_url, properties=["drc:kopie_van"]
+            )
+        )
+
+        self.assertEqual(len(zaak_documents), 2)
+        originals = [document for document in zaak_documents if not document.kopie_van]
+        copies = [document for document in zaak_documents if document.kopie_van]
+        self.assertEqual([document.uuid for document in originals], [documents[0].uuid])
+        self.assertEqual(
+            [document.kopie_van for document in copies], [documents[1].uuid]
+        )
+
 
 @freeze_time("2020-07-27 12:00:00")
 class CMISClientGebruiksrechtenTests(DMSMixin, TestCase):
@@ -1846,6 +1992,50 @@ class CMISClientDocumentTests(DMSMixin, TestCase):
         day_folder = month_folder.get_child_folder(name="27")
         self.assertIsNotNone(day_folder)
 
+    def test_create_document_in_zaak_folder(self):
+        zaaktype = {
+            "url": "https://openzaak.utrechtproeftuin.nl/catalogi/api/v1/zaaktypen/0119dd4e-7be9-477e-bccf-75023b1453c1",
+            "identificatie": 1,
+            "omschrijving": "Melding Openbare Ruimte",
+        }
+        zaak = {
+            "url": "https://openzaak.utrechtproeftuin.nl/zaken/api/v1/zaken/1c8e36be-338c-4c07-ac5e-1adf55bec04a",
+            "identificatie": "1bcfd0d6-c817-428c-a3f4-4047038c184d",
+            "zaaktype": zaaktype["url"],
+            "bronorganisatie": "509381406",
+        }
+        data = {
+            "creatiedatum": timezone.now(),
+            "titel": "detailed summary",
+        }
+
+        document = self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            bronorganisatie="159351741",
+            data=data,
+            content=io.BytesIO(b"some file content"),
+            zaak_data=zaak,
+            zaaktype_data=zaaktype,
+        )
+
+        parent_folder = document.get_parent_folders()[0]
+        self.assertEqual(
+            parent_folder.name, "zaak-1bcfd0d6-c817-428c-a3f4-4047038c184d"
+        )
+
+        # The 'other' folder is not created
+        root_folder = self.cmis_client.get_folder(self.cmis_client.root_folder_id)
+        self.assertIsNone(root_folder.get_child_folder(name="TestDRC"))
+
+    def test_create_document_in_zaak_folder_without_zaaktype(self):
+        with self.assertRaises(ValueError):
+            self.cmis_client.create_document(
+                identification=str(uuid.uuid4()),
+                bronorganisatie="159351741",
+                data={"titel": "detailed summary"},
+                zaak_data={"identificatie": "1bcfd0d6-c817-428c-a3f4-4047038c184d"},
+            )
+
     def test_lock_document(self):
         data = {
             "creatiedatum": timezone.now(),
@@ -1917,6 +2107,33 @@ class CMISClientDocumentTests(DMSMixin, TestCase):
 
         self.assertFalse(unlocked_doc.isVersionSeriesCheckedOut)
 
+    def test_lock_and_unlock_document_round_trips(self):
+        document = self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            bronorganisatie="159351741",
+            data={"titel": "detailed summary"},
+            content=io.BytesIO(b"some file content"),
+        )
+        lock = str(uuid.uuid4())
+
+        with track_round_trips() as round_trips:
+            self.cmis_client.lock_document(drc_uuid=document.uuid, lock=lock)
+
+        # Retrieving the document, checking out and storing the lock
+        self.assertLessEqual(round_trips.count, 3)
+        pwc = document.get_latest_version()
+        self.assertEqual(pwc.lock, lock)
+
+        with track_round_trips() as round_trips:
+            unlocked_doc = self.cmis_client.unlock_document(
+                drc_uuid=document.uuid, lock=lock
+            )
+
+        # Retrieving the PWC, checking in (and retrieving the new version)
+        self.assertLessEqual(round_trips.count, 3)
+        self.assertFalse(unlocked_doc.isVersionSeriesCheckedOut)
+        self.assertFalse(unlocked_doc.lock)
+
     def test_unlock_document_with_wrong_lock(self):
         data = {
             "creatiedatum": timezone.now(),
@@ -2031,6 +2248,76 @@ class CMISClientDocumentTests(DMSMixin, TestCase):
         new_content.seek(0)
         self.assertEqual(posted_content.read(), new_content.read())
 
+    def test_update_document_only_sends_changed_properties(self):
+        properties = {
+            "creatiedatum": datetime.date(2020, 7, 27),
+            "titel": "detailed summary",
+            "auteur": "test_auteur",
+            "bestandsnaam": "dummy.txt",
+            "beschrijving": "test_beschrijving",
+            "versie": 1,
+        }
+        document = self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            data=properties,
+            content=io.BytesIO(b"some file content"),
+            bronorganisatie="159351741",
+        )
+
+        lock = str(uuid.uuid4())
+        self.cmis_client.lock_document(drc_uuid=document.uuid, lock=lock)
+
+        with patch(
+            f"{type(document).__module__}.Document.update_properties", autospec=True
+        ) as mock_update:
+            self.cmis_client.update_document(
+                drc_uuid=document.uuid,
+                lock=lock,
+                data={**properties, "auteur": "updated auteur"},
+            )
+
+        mock_update.assert_called_once()
+        self.assertEqual(
+            list(mock_update.call_args[0][1].keys()),
+            [mapper("auteur", type="document")],
+        )
+
+        with patch(
+            f"{type(document).__module__}.Document.update_properties", autospec=True
+        ) as mock_update:
+            self.cmis_client.update_document(
+                drc_uuid=document.uuid, lock=lock, data=properties
+            )
+
+        mock_update.assert_not_called()
+
+    def test_update_document_round_trips(self):
+        document = self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            data={"titel": "detailed summary", "auteur": "test_auteur"},
+            content=io.BytesIO(b"Content before update"),
+            bronorganisatie="159351741",
+        )
+        lock = str(uuid.uuid4())
+        self.cmis_client.lock_document(drc_uuid=document.uuid, lock=lock)
+
+        with track_round_trips() as round_trips:
+            updated_doc = self.cmis_client.update_document(
+                drc_uuid=document.uuid,
+                lock=lock,
+                data={"auteur": "updated auteur", "bestandsnaam": "updated.txt"},
+                content=io.BytesIO(b"Content after update"),
+            )
+
+        # Retrieving the PWC, setting the content and updating the properties
+        self.assertEqual(round_trips.count, 3)
+        self.assertEqual(updated_doc.auteur, "updated auteur")
+        self.assertEqual(updated_doc.titel, "detailed summary")
+        self.assertEqual(updated_doc.contentStreamLength, len("Content after update"))
+        self.assertEqual(
+            updated_doc.get_content_stream().read(), b"Content after update"
+        )
+
     def test_update_document_empty_content_unlock_fails(self):
         identification = str(uuid.uuid4())
         properties = {
@@ -2191,6 +2478,69 @@ class CMISClientDocumentTests(DMSMixin, TestCase):
         self.assertEqual(copied_document.kopie_van, document.uuid)
         self.assertNotEqual(copied_document.uuid, document.uuid)
 
+    def test_copy_document_does_not_transfer_content(self):
+        document = self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            bronorganisatie="159351741",
+            data={"titel": "detailed summary", "bestandsnaam": "dummy.txt"},
+            content=io.BytesIO(b"some file content"),
+        )
+        other_base_folder = self.cmis_client.get_or_create_other_folder()
+        destination_folder = self.cmis_client.create_folder(
+            "DestinationFolder", other_base_folder.objectId
+        )
+
+        with patch(
+            f"{type(document).__module__}.Document.get_content_stream",
+            autospec=True,
+        ) as mock_get_content:
+            copied_document = self.cmis_client.copy_document(
+                document, destination_folder
+            )
+
+        mock_get_content.assert_not_called()
+        self.assertEqual(copied_document.titel, "detailed summary - copy")
+        self.assertEqual(copied_document.kopie_van, document.uuid)
+        self.assertEqual(copied_document.bestandsnaam, "dummy.txt")
+        self.assertEqual(
+            copied_document.get_content_stream().read(), b"some file content"
+        )
+
+    def test_copy_document_create_from_source_not_supported(self):
+        document = self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            bronorganisatie="159351741",
+            data={"titel": "detailed summary", "bestandsnaam": "dummy.txt"},
+            content=io.BytesIO(b"some file content"),
+        )
+        other_base_folder = self.cmis_client.get_or_create_other_folder()
+        destination_folder = self.cmis_client.create_folder(
+            "DestinationFolder", other_base_folder.objectId
+        )
+        self.addCleanup(CMISClient._unsupported_operations.clear)
+
+        with patch.object(
+            type(self.cmis_client),
+            "_copy_document_from_source",
+            side_effect=CmisNotSupportedException(
+                status=405, url="", message="", code="notSupported"
+            ),
+        ) as mock_copy_from_source:
+            copied_document = self.cmis_client.copy_document(
+                document, destination_folder
+            )
+            self.cmis_client.copy_document(document, destination_folder)
+
+        # The DMS is only asked once
+        mock_copy_from_source.assert_called_once()
+        self.assertFalse(
+            self.cmis_client.supports_operation("createDocumentFromSource")
+        )
+        self.assertEqual(copied_document.kopie_van, document.uuid)
+        self.assertEqual(
+            copied_document.get_content_stream().read(), b"some file content"
+        )
+
     def test_delete_document(self):
         data = {
             "creatiedatum": datetime.date(2020, 7, 27),
@@ -2209,6 +2559,313 @@ class CMISClientDocumentTests(DMSMixin, TestCase):
         with self.assertRaises(DocumentDoesNotExistError):
             self.cmis_client.get_document(drc_uuid=document.uuid)
 
+    def test_delete_documents(self):
+        documents = [
+            self.cmis_client.create_document(
+                identification=str(uuid.uuid4()),
+                bronorganisatie="159351741",
+                data={"titel": f"document {i}"},
+                content=io.BytesIO(b"some file content"),
+            )
+            for i in range(3)
+        ]
+        self.cmis_client.lock_document(
+            drc_uuid=documents[0].uuid, lock=str(uuid.uuid4())
+        )
+        missing_uuid = str(uuid.uuid4())
+
+        results = self.cmis_client.delete_documents(
+            [document.uuid for document in documents] + [missing_uuid],
+            concurrency=2,
+        )
+
+        self.assertEqual(
+            [result.item for result in results],
+            [document.uuid for document in documents] + [missing_uuid],
+        )
+        self.assertEqual([result.ok for result in results], [True, True, True, False])
+        self.assertIsInstance(results[3].error, DocumentDoesNotExistError)
+        for document in documents:
+            with self.assertRaises(DocumentDoesNotExistError):
+                self.cmis_client.get_document(drc_uuid=document.uuid)
+
+    def test_get_document_with_identity_map(self):
+        document = self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            bronorganisatie="159351741",
+            data={"titel": "detailed summary"},
+            content=io.BytesIO(b"some file content"),
+        )
+
+        with use_identity_map():
+            first = self.cmis_client.get_document(drc_uuid=document.uuid)
+            with track_round_trips() as round_trips:
+                second = self.cmis_client.get_document(drc_uuid=document.uuid)
+            self.assertEqual(round_trips.count, 0)
+            self.assertIs(first, second)
+
+            lock = str(uuid.uuid4())
+            self.cmis_client.lock_document(drc_uuid=document.uuid, lock=lock)
+            locked = self.cmis_client.get_document(drc_uuid=document.uuid)
+
+        self.assertIsNot(locked, first)
+        self.assertEqual(locked.lock, lock)
+
+    @override_settings(CMIS_METADATA_CACHE_ENABLED=True)
+    def test_get_document_with_metadata_cache(self):
+        cache.clear()
+        document = self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            bronorganisatie="159351741",
+            data={"titel": "detailed summary"},
+            content=io.BytesIO(b"some file content"),
+        )
+        self.cmis_client.get_document(drc_uuid=document.uuid)
+
+        with track_round_trips() as round_trips:
+            cached = self.cmis_client.get_document(drc_uuid=document.uuid)
+
+        self.assertEqual(round_trips.count, 0)
+        self.assertEqual(cached.titel, "detailed summary")
+        self.assertEqual(cached.objectId, document.objectId)
+
+        lock = str(uuid.uuid4())
+        self.cmis_client.lock_document(drc_uuid=document.uuid, lock=lock)
+        locked = self.cmis_client.get_document(drc_uuid=document.uuid)
+
+        self.assertEqual(locked.versionLabel, "pwc")
+        self.assertEqual(locked.lock, lock)
+
+    def test_get_content_stream_with_content_cache(self):
+        document = self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            bronorganisatie="159351741",
+            data={"titel": "detailed summary"},
+            content=io.BytesIO(b"some file content"),
+        )
+        document = self.cmis_client.get_document(drc_uuid=document.uuid)
+
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(CMIS_CONTENT_CACHE_DIR=directory):
+                self.assertEqual(
+                    document.get_content_stream().read(), b"some file content"
+                )
+                with track_round_trips() as round_trips:
+                    content = document.get_content_stream()
+
+                self.assertEqual(round_trips.count, 0)
+                self.assertEqual(content.read(), b"some file content")
+                content.close()
+
+    @override_settings(CMIS_QUERY_CACHE_TIMEOUTS={"document": 30})
+    def test_query_with_query_cache(self):
+        cache.clear()
+        identification = str(uuid.uuid4())
+        document = self.cmis_client.create_document(
+            identification=identification,
+            bronorganisatie="159351741",
+            data={"titel": "detailed summary"},
+            content=io.BytesIO(b"some file content"),
+        )
+        query_kwargs = {
+            "return_type_name": "document",
+            "lhs": ["drc:document__identificatie = '%s'"],
+            "rhs": [identification],
+        }
+        self.cmis_client.query(**query_kwargs)
+
+        with track_round_trips() as round_trips:
+            results = self.cmis_client.query(**query_kwargs)
+
+        self.assertEqual(round_trips.count, 0)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].uuid, document.uuid)
+
+        self.cmis_client.delete_document(drc_uuid=document.uuid)
+
+        self.assertEqual(self.cmis_client.query(**query_kwargs), [])
+
+    def test_iter_query(self):
+        bronorganisatie = str(uuid.uuid4().int)[:9]
+        documents = [
+            self.cmis_client.create_document(
+                identification=str(uuid.uuid4()),
+                bronorganisatie=bronorganisatie,
+                data={"titel": f"document {i}"},
+                content=io.BytesIO(b"some file content"),
+            )
+            for i in range(3)
+        ]
+
+        with track_round_trips() as round_trips:
+            results = self.cmis_client.iter_query(
+                return_type_name="document",
+                lhs=["drc:document__bronorganisatie = '%s'"],
+                rhs=[bronorganisatie],
+                order_by=["drc:document__titel DESC"],
+                page_size=2,
+            )
+            first_result = next(results)
+
+            self.assertEqual(round_trips.count, 1)
+            self.assertEqual(first_result.titel, "document 2")
+
+            other_results = list(results)
+
+        self.assertEqual(round_trips.count, 2)
+        self.assertEqual(
+            [result.uuid for result in [first_result] + other_results],
+            [document.uuid for document in reversed(documents)],
+        )
+
+    def test_query_columnar(self):
+        bronorganisatie = str(uuid.uuid4().int)[:9]
+        documents = [
+            self.cmis_client.create_document(
+                identification=str(uuid.uuid4()),
+                bronorganisatie=bronorganisatie,
+                data={"titel": f"document {i}"},
+                content=io.BytesIO(b"some file content"),
+            )
+            for i in range(3)
+        ]
+
+        result = self.cmis_client.query(
+            return_type_name="document",
+            lhs=["drc:document__bronorganisatie = '%s'"],
+            rhs=[bronorganisatie],
+            properties=["drc:document__uuid", "drc:document__titel"],
+            columnar=True,
+        )
+
+        self.assertEqual(len(result), 3)
+        self.assertEqual(
+            set(result.column("drc:document__uuid")),
+            {document.uuid for document in documents},
+        )
+
+        pages = self.cmis_client.iter_query(
+            return_type_name="document",
+            lhs=["drc:document__bronorganisatie = '%s'"],
+            rhs=[bronorganisatie],
+            order_by=["drc:document__titel"],
+            page_size=2,
+            columnar=True,
+        )
+        self.assertEqual(
+            [page.column("drc:document__titel") for page in pages],
+            [["document 0", "document 1"], ["document 2"]],
+        )
+
+    def test_query_with_projection(self):
+        document = self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            bronorganisatie="159351741",
+            data={"titel": "detailed summary"},
+            content=io.BytesIO(b"some file content"),
+        )
+
+        results = self.cmis_client.query(
+            return_type_name="document",
+            lhs=["drc:document__uuid = '%s'"],
+            rhs=[document.uuid],
+            properties=["drc:document__uuid"],
+        )
+
+        self.assertEqual(len(results), 1)
+        self.assertNotIn("drc:document__titel", results[0].properties)
+
+        with track_round_trips() as round_trips:
+            self.assertEqual(results[0].uuid, document.uuid)
+            self.assertEqual(round_trips.count, 0)
+
+            # The other properties are retrieved when needed
+            self.assertEqual(results[0].titel, "detailed summary")
+            self.assertEqual(round_trips.count, 1)
+
+    def test_exists_and_count(self):
+        bronorganisatie = str(uuid.uuid4().int)[:9]
+        for i in range(3):
+            self.cmis_client.create_document(
+                identification=str(uuid.uuid4()),
+                bronorganisatie=bronorganisatie,
+                data={"titel": f"document {i}"},
+                content=io.BytesIO(b"some file content"),
+            )
+
+        lhs = ["drc:document__bronorganisatie = '%s'"]
+
+        self.assertTrue(
+            self.cmis_client.exists("document", lhs=lhs, rhs=[bronorganisatie])
+        )
+        self.assertEqual(
+            self.cmis_client.count("document", lhs=lhs, rhs=[bronorganisatie]), 3
+        )
+        self.assertFalse(
+            self.cmis_client.exists("document", lhs=lhs, rhs=["000000000"])
+        )
+        self.assertEqual(
+            self.cmis_client.count("document", lhs=lhs, rhs=["000000000"]), 0
+        )
+
+    def test_get_documents(self):
+        documents = [
+            self.cmis_client.create_document(
+                identification=str(uuid.uuid4()),
+                bronorganisatie="159351741",
+                data={"titel": f"document {i}"},
+                content=io.BytesIO(b"some file content"),
+            )
+            for i in range(3)
+        ]
+        lock = str(uuid.uuid4())
+        self.cmis_client.lock_document(drc_uuid=documents[0].uuid, lock=lock)
+        missing_uuid = str(uuid.uuid4())
+
+        retrieved = self.cmis_client.get_documents(
+            [document.uuid for document in documents] + [missing_uuid], chunk_size=2
+        )
+
+        self.assertEqual(
+            set(retrieved),
+            {document.uuid for document in documents},
+        )
+        self.assertEqual(retrieved[documents[0].uuid].versionLabel, "pwc")
+        self.assertEqual(retrieved[documents[2].uuid].titel, "document 2")
+
+    def test_create_documents(self):
+        identification = str(uuid.uuid4())
+        self.cmis_client.create_document(
+            identification=identification,
+            bronorganisatie="159351741",
+            data={"titel": "existing document"},
+        )
+        items = [
+            {
+                "identification": str(uuid.uuid4()),
+                "bronorganisatie": "159351741",
+                "data": {"titel": f"document {i}", "bestandsnaam": f"file-{i}.txt"},
+                "content": io.BytesIO(b"some file content"),
+            }
+            for i in range(3)
+        ] + [
+            {
+                "identification": identification,
+                "bronorganisatie": "159351741",
+                "data": {"titel": "duplicate document"},
+            }
+        ]
+
+        results = self.cmis_client.create_documents(items, concurrency=2)
+
+        self.assertEqual([result.item for result in results], [0, 1, 2, 3])
+        self.assertEqual([result.ok for result in results], [True, True, True, False])
+        self.assertIsInstance(results[3].error, DocumentExistsError)
+        for i, result in enumerate(results[:3]):
+            document = self.cmis_client.get_document(drc_uuid=result.result.uuid)
+            self.assertEqual(document.titel, f"document {i}")
+            self.assertEqual(document.get_content_stream().read(), b"some file content")
+
     def test_same_identificatie_different_bronorganisatie(self):
         identification = str(uuid.uuid4())
         properties = {
@@ -2277,6 +2934,74 @@ class CMISClientDocumentTests(DMSMixin, TestCase):
         self.assertEqual(doc_2.identificatie, "IDENTIFICATIE-2")
 
 
+@tag("alfresco")
+@override_settings(CMIS_DOCUMENT_INDEX_ENABLED=True)
+@freeze_time("2020-07-27 12:00:00")
+class CMISClientDocumentIndexTests(DMSMixin, TestCase):
+    def _create_document(self):
+        return self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            bronorganisatie="159351741",
+            data={"titel": "detailed summary"},
+            content=io.BytesIO(b"some file content"),
+        )
+
+    def test_create_document_registers_version_series(self):
+        document = self._create_document()
+
+        entry = DocumentIndexEntry.objects.get(uuid=document.uuid)
+        self.assertEqual(entry.version_series_id, document.versionSeriesId)
+
+    def test_get_document_by_id(self):
+        document = self._create_document()
+
+        with track_round_trips() as round_trips:
+            retrieved_document = self.cmis_client.get_document(drc_uuid=document.uuid)
+
+        self.assertEqual(round_trips.count, 1)
+        self.assertEqual(retrieved_document.uuid, document.uuid)
+
+    def test_get_checked_out_document_by_id(self):
+        document = self._create_document()
+        document.checkout()
+
+        retrieved_document = self.cmis_client.get_document(drc_uuid=document.uuid)
+
+        self.assertEqual(retrieved_document.versionLabel, "pwc")
+        self.assertEqual(retrieved_document.uuid, document.uuid)
+
+    def test_outdated_entry_is_repaired(self):
+        document = self._create_document()
+        other_document = self._create_document()
+        DocumentIndexEntry.objects.filter(uuid=document.uuid).update(
+            version_series_id=other_document.versionSeriesId
+        )
+
+        retrieved_document = self.cmis_client.get_document(drc_uuid=document.uuid)
+
+        self.assertEqual(retrieved_document.uuid, document.uuid)
+        entry = DocumentIndexEntry.objects.get(uuid=document.uuid)
+        self.assertEqual(entry.version_series_id, document.versionSeriesId)
+
+    def test_missing_entry_is_added(self):
+        document = self._create_document()
+        DocumentIndexEntry.objects.all().delete()
+
+        retrieved_document = self.cmis_client.get_document(drc_uuid=document.uuid)
+
+        self.assertEqual(retrieved_document.uuid, document.uuid)
+        self.assertTrue(DocumentIndexEntry.objects.filter(uuid=document.uuid).exists())
+
+    def test_delete_document_removes_entry(self):
+        document = self._create_document()
+
+        self.cmis_client.delete_document(drc_uuid=document.uuid)
+
+        self.assertFalse(DocumentIndexEntry.objects.filter(uuid=document.uuid).exists())
+        with self.assertRaises(DocumentDoesNotExistError):
+            self.cmis_client.get_document(drc_uuid=document.uuid)
+
+
 class CMISQueryTest(DMSMixin, TestCase):
     @classmethod
     def setUpTestData(cls):
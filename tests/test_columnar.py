@@ -0,0 +1,145 @@
+import datetime
+import io
+import json
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+import pytz
+
+from drc_cmis.columnar import ColumnarResult, _Column
+
+DATA = [
+    {
+        "properties": {
+            "drc:document__titel": {"value": "first"},
+            "drc:document__status": {"value": "definitief"},
+            "drc:document__bestandsomvang": {"value": 17},
+            "drc:document__creatiedatum": {
+                "value": 1595851200000,
+                "type": "datetime",
+            },
+        }
+    },
+    {
+        "properties": {
+            "drc:document__titel": {"value": "second"},
+            "drc:document__status": {"value": None},
+            "drc:document__bestandsomvang": {"value": None},
+            "drc:document__creatiedatum": {
+                "value": datetime.datetime(2020, 7, 28, 12, 0, tzinfo=pytz.utc)
+            },
+        }
+    },
+    {
+        "properties": {
+            "drc:document__titel": {"value": "third"},
+            "drc:document__status": {"value": "definitief"},
+            "drc:document__bestandsomvang": {"value": Decimal("1.5")},
+            "drc:kopie_van": {"value": "some-uuid"},
+        }
+    },
+]
+
+
+class ColumnarResultTests(SimpleTestCase):
+    def test_columns(self):
+        result = ColumnarResult.from_data(DATA)
+
+        self.assertEqual(len(result), 3)
+        self.assertEqual(
+            result.column("drc:document__titel"), ["first", "second", "third"]
+        )
+        self.assertEqual(
+            result.column("drc:document__bestandsomvang"), [17.0, None, 1.5]
+        )
+        self.assertEqual(
+            result.column("drc:document__creatiedatum"),
+            [
+                datetime.datetime(2020, 7, 27, 12, 0, tzinfo=pytz.utc),
+                datetime.datetime(2020, 7, 28, 12, 0, tzinfo=pytz.utc),
+                None,
+            ],
+        )
+        # Properties that only some rows have
+        self.assertEqual(result.column("drc:kopie_van"), [None, None, "some-uuid"])
+
+    def test_strings_are_stored_once(self):
+        result = ColumnarResult.from_data(DATA)
+
+        column = result._columns["drc:document__status"]
+        self.assertEqual(column.strings, ["definitief"])
+        self.assertEqual(column.values.typecode, "I")
+
+    def test_mixed_types(self):
+        result = ColumnarResult.from_data(
+            [
+                {"properties": {"some:property": {"value": 1}}},
+                {"properties": {"some:property": {"value": ["a", "b"]}}},
+            ]
+        )
+
+        self.assertEqual(result.column("some:property"), [1, ["a", "b"]])
+
+    def test_integer_overflow(self):
+        column = _Column()
+        column.append(1)
+        column.append(2**70)
+        column.append(None)
+
+        self.assertEqual(column.kind, "object")
+        self.assertEqual(list(column), [1, 2**70, None])
+
+    def test_time_zone(self):
+        result = ColumnarResult.from_data(DATA, time_zone="Europe/Amsterdam")
+
+        self.assertEqual(
+            result.row(0)["drc:document__creatiedatum"].isoformat(),
+            "2020-07-27T14:00:00+02:00",
+        )
+
+    def test_where(self):
+        result = ColumnarResult.from_data(DATA)
+
+        definitief = result.where(
+            "drc:document__status", lambda status: status == "definitief"
+        )
+
+        self.assertEqual(definitief.column("drc:document__titel"), ["first", "third"])
+        self.assertEqual(len(result), 3)
+
+    def test_filter(self):
+        result = ColumnarResult.from_data(DATA)
+
+        filtered = result.filter(lambda row: row["drc:kopie_van"] is None)
+
+        self.assertEqual(filtered.column("drc:document__titel"), ["first", "second"])
+
+    def test_to_csv(self):
+        result = ColumnarResult.from_data(DATA)
+        output = io.StringIO()
+
+        result.to_csv(output, columns=["drc:document__titel", "drc:kopie_van"])
+
+        self.assertEqual(
+            output.getvalue().splitlines(),
+            [
+                "drc:document__titel,drc:kopie_van",
+                "first,",
+                "second,",
+                "third,some-uuid",
+            ],
+        )
+
+    def test_to_ndjson(self):
+        result = ColumnarResult.from_data(DATA)
+        output = io.StringIO()
+
+        result.to_ndjson(output)
+
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(
+            rows[0]["drc:document__creatiedatum"], "2020-07-27T12:00:00+00:00"
+        )
+        self.assertIsNone(rows[1]["drc:document__status"])
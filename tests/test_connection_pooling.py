@@ -1,6 +1,11 @@
 from unittest.mock import patch
 
-from drc_cmis.connections import get_session, use_cmis_connection_pool
+from drc_cmis.browser.request import Request
+from drc_cmis.connections import (
+    get_session,
+    track_round_trips,
+    use_cmis_connection_pool,
+)
 
 
 def test_no_wrapped_block(requests_mock):
@@ -81,3 +86,23 @@ def test_closed_session_is_new_instance():
 
     session2 = get_session()
     assert session2 is not session1
+
+
+def test_track_round_trips(requests_mock):
+    requests_mock.get(
+        "https://example.com",
+        json={},
+        headers={"Content-Type": "application/json"},
+    )
+    request = Request()
+
+    request.get_request("https://example.com", "user", "password")
+    with track_round_trips() as outer:
+        request.get_request("https://example.com", "user", "password")
+        with track_round_trips() as inner:
+            request.get_request("https://example.com", "user", "password")
+
+    request.get_request("https://example.com", "user", "password")
+
+    assert outer.count == 2
+    assert inner.count == 1
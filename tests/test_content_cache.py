@@ -0,0 +1,137 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase
+
+from drc_cmis.content_cache import ContentCache
+
+
+def _make_document(version_label: str = "1.0", length: int = 17) -> SimpleNamespace:
+    properties = {
+        "cmis:objectId": f"workspace://SpacesStore/some-id;{version_label}",
+        "cmis:versionLabel": version_label,
+        "cmis:contentStreamLength": length,
+    }
+    return SimpleNamespace(
+        properties={name: {"value": value} for name, value in properties.items()}
+    )
+
+
+class ContentCacheTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = ContentCache(self.directory.name, max_size=1200)
+
+    def test_get_key(self):
+        key = self.cache.get_key(_make_document())
+
+        self.assertIsNotNone(key)
+        self.assertEqual(key, self.cache.get_key(_make_document()))
+        self.assertNotEqual(key, self.cache.get_key(_make_document("1.1")))
+
+    def test_pwc_is_not_cached(self):
+        self.assertIsNone(self.cache.get_key(_make_document("pwc")))
+
+    def test_get_or_fetch(self):
+        fetch = Mock(return_value=io.BytesIO(b"some file content"))
+        key = self.cache.get_key(_make_document())
+
+        first = self.cache.get_or_fetch(key, fetch)
+        second = self.cache.get_or_fetch(key, fetch)
+
+        self.assertEqual(first.read(), b"some file content")
+        self.assertEqual(second.read(), b"some file content")
+        self.assertEqual(bytes(second.getbuffer()), b"some file content")
+        fetch.assert_called_once()
+
+    def test_corrupt_file_is_fetched_again(self):
+        key = self.cache.get_key(_make_document())
+        self.cache.set(key, io.BytesIO(b"some file content"))
+        with open(self.cache._get_path(key), "wb") as content_file:
+            content_file.write(b"some other content")
+
+        self.assertIsNone(self.cache.get(key))
+        self.assertFalse(os.path.exists(self.cache._get_path(key)))
+
+    def test_checksum_is_verified_once(self):
+        key = self.cache.get_key(_make_document())
+        self.cache.set(key, io.BytesIO(b"some file content"))
+
+        with patch(
+            "drc_cmis.content_cache.hashlib.sha256", wraps=hashlib.sha256
+        ) as sha256:
+            self.assertEqual(self.cache.get(key).read(), b"some file content")
+            sha256.assert_not_called()
+
+            # Another process only verifies the file when it first opens it
+            other_cache = ContentCache(self.directory.name, max_size=1200)
+            other_cache.get(key)
+            other_cache.get(key)
+            self.assertEqual(sha256.call_count, 1)
+
+    def test_directory_is_scanned_when_the_cache_is_full(self):
+        keys = [self.cache.get_key(_make_document(f"1.{i}")) for i in range(4)]
+
+        with patch("drc_cmis.content_cache.os.scandir", wraps=os.scandir) as scandir:
+            self.cache.set(keys[0], io.BytesIO(b"x" * 400))
+            scan_count = scandir.call_count
+            self.cache.set(keys[1], io.BytesIO(b"x" * 400))
+            self.cache.set(keys[2], io.BytesIO(b"x" * 400))
+            self.assertEqual(scandir.call_count, scan_count)
+
+            self.cache.set(keys[3], io.BytesIO(b"x" * 400))
+            self.assertGreater(scandir.call_count, scan_count)
+
+        self.assertEqual(self.cache._size, 800)
+
+    def test_least_recently_used_files_are_evicted(self):
+        keys = [self.cache.get_key(_make_document(f"1.{i}")) for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.set(key, io.BytesIO(b"x" * 400))
+            # Make sure the files have different modification times
+            os.utime(self.cache._get_path(key), (i, i))
+
+        self.cache.get(keys[0])
+        self.cache.set(
+            self.cache.get_key(_make_document("2.0")), io.BytesIO(b"x" * 400)
+        )
+
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+
+    def test_concurrent_fetches_are_coalesced(self):
+        key = self.cache.get_key(_make_document())
+        started = threading.Event()
+        release = threading.Event()
+
+        def fetch():
+            started.set()
+            release.wait(5)
+            return io.BytesIO(b"some file content")
+
+        fetch_mock = Mock(side_effect=fetch)
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    self.cache.get_or_fetch(key, fetch_mock).read()
+                )
+            )
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(results, [b"some file content"] * 3)
+        fetch_mock.assert_called_once()
@@ -1,11 +1,19 @@
 import io
 import os
 from unittest import skipIf
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 
+from drc_cmis.connections import track_round_trips
 from drc_cmis.models import CMISConfig, UrlMapping
+from drc_cmis.utils.exceptions import CmisRuntimeException
+from drc_cmis.webservice.client import SOAPCMISClient
+from drc_cmis.webservice.drc_document import (
+    Folder,
+    Gebruiksrechten,
+    ObjectInformatieObject,
+)
 
 from .mixins import DMSMixin
 
@@ -240,6 +248,60 @@ class DeleteOIORelationTests(DMSMixin, TestCase):
             default_related_data_folder.objectId,
         )
 
+    def test_delete_oio_round_trips_do_not_depend_on_number_of_files(self):
+        document = self.cmis_client.create_document(
+            identification="9124c668-db3f-4198-8823-4c21fed430d0",
+            data=self.document,
+            content=io.BytesIO(b"some file content"),
+            bronorganisatie="159351741",
+        )
+        gebruiksrechten_data = {
+            "informatieobject": f"https://drc.utrechtproeftuin.nl/api/v1/documenten/{document.uuid}",
+            "startdatum": "2018-12-24T00:00:00Z",
+            "omschrijving_voorwaarden": "Een hele set onredelijke voorwaarden",
+        }
+        self.cmis_client.create_gebruiksrechten(data=gebruiksrechten_data)
+
+        # Relate the document to both zaken, so that there is a copy in the zaak2 folder
+        for zaak in [self.zaak1, self.zaak2]:
+            oio = self.cmis_client.create_oio(
+                oio_data={
+                    "zaak": zaak["url"],
+                    "informatieobject": f"https://drc.utrechtproeftuin.nl/api/v1/documenten/{document.uuid}",
+                    "object_type": "zaak",
+                },
+                zaak_data=zaak,
+                zaaktype_data=self.zaaktype,
+            )
+
+        # Other documents in the zaak2 folder
+        for i in range(3):
+            self.cmis_client.create_document(
+                identification=f"other-document-{i}",
+                data=self.document,
+                content=io.BytesIO(b"some file content"),
+                bronorganisatie="159351741",
+                zaak_data=self.zaak2,
+                zaaktype_data=self.zaaktype,
+            )
+
+        gebruiksrechten_type = self.cmis_client.gebruiksrechten_type
+        with patch.object(
+            gebruiksrechten_type,
+            "get_parent_folders",
+            autospec=True,
+            side_effect=gebruiksrechten_type.get_parent_folders,
+        ) as mock_get_parent_folders:
+            with track_round_trips() as round_trips:
+                oio.delete_object()
+
+        mock_get_parent_folders.assert_not_called()
+        self.assertLessEqual(round_trips.count, 8)
+        zaak2_folder = self.cmis_client.query(
+            "zaak", lhs=["drc:zaak__url = '%s'"], rhs=[self.zaak2["url"]]
+        )[0]
+        self.assertEqual(3, len(zaak2_folder.get_children_documents()))
+
     @patch("drc_cmis.webservice.drc_document.ObjectInformatieObject._reorganise_files")
     def test_delete_bio_does_not_rearrange_files(self, m_reorganise_files):
         # Creating the document in the default folder
@@ -273,3 +335,155 @@ class DeleteOIORelationTests(DMSMixin, TestCase):
         oio2.delete_object()
 
         m_reorganise_files.assert_not_called()
+
+
+def make_object_data(object_type_id, **properties):
+    properties["cmis:objectTypeId"] = object_type_id
+    return {
+        "properties": {name: {"value": value} for name, value in properties.items()}
+    }
+
+
+@override_settings(CMIS_URL_MAPPING_ENABLED=False)
+class WebserviceRelatedObjectsTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        for name, value in [
+            ("user", "user"),
+            ("password", "password"),
+            ("main_repo_id", "repo-1"),
+            ("base_url", f"http://dms.example.com/{self.id()}"),
+        ]:
+            patcher = patch.object(SOAPCMISClient, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = patch.object(SOAPCMISClient, "request", return_value="<xml/>")
+        self.request = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(
+            SOAPCMISClient, "get_object_type_id_prefix", return_value=""
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for name in ["extract_xml_from_soap", "pretty_xml"]:
+            patcher = patch(
+                f"drc_cmis.webservice.drc_document.{name}", side_effect=lambda xml: xml
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_children_are_listed_page_by_page(self):
+        folder = Folder(make_object_data("cmis:folder", **{"cmis:objectId": "1"}))
+        pages = [
+            [
+                make_object_data("drc:gebruiksrechten"),
+                make_object_data("cmis:folder"),
+            ],
+            [make_object_data("drc:gebruiksrechten")],
+        ]
+
+        with patch(
+            "drc_cmis.webservice.drc_document.extract_object_properties_from_xml",
+            side_effect=pages,
+        ), patch(
+            "drc_cmis.webservice.drc_document.extract_has_more_items",
+            side_effect=[True, False],
+        ):
+            children = folder.get_children_content_objects(
+                Gebruiksrechten,
+                properties=["drc:gebruiksrechten__informatieobject"],
+                page_size=2,
+            )
+
+        self.assertEqual(len(children), 2)
+        self.assertEqual(self.request.call_count, 2)
+        envelopes = [call[1]["soap_envelope"] for call in self.request.call_args_list]
+        self.assertIn("maxItems>2<", envelopes[0])
+        self.assertIn("skipCount>0<", envelopes[0])
+        self.assertIn("skipCount>2<", envelopes[1])
+        self.assertIn("drc:gebruiksrechten__informatieobject", envelopes[0])
+
+    def test_gebruiksrechten_are_queried_in_folder(self):
+        oio = ObjectInformatieObject(
+            make_object_data(
+                "drc:oio",
+                **{"drc:oio__informatieobject": "https://drc.nl/api/v1/documenten/1"},
+            )
+        )
+        related_data_folder = Mock(objectId="folder-1")
+        gebruiksrechten_data = make_object_data(
+            "drc:gebruiksrechten",
+            **{
+                "drc:gebruiksrechten__informatieobject": (
+                    "https://drc.nl/api/v1/documenten/1"
+                )
+            },
+        )
+
+        with patch(
+            "drc_cmis.webservice.drc_document.extract_object_properties_from_xml",
+            return_value=[gebruiksrechten_data],
+        ):
+            gebruiksrechten = oio._get_gebruiksrechten(related_data_folder)
+
+        self.assertIsNotNone(gebruiksrechten)
+        related_data_folder.get_children_content_objects.assert_not_called()
+        envelope = self.request.call_args[1]["soap_envelope"]
+        self.assertIn("IN_FOLDER('folder-1')", envelope)
+        self.assertIn(
+            "drc:gebruiksrechten__informatieobject = "
+            "'https://drc.nl/api/v1/documenten/1'",
+            envelope,
+        )
+
+    def test_gebruiksrechten_fallback_without_in_folder_queries(self):
+        oio = ObjectInformatieObject(
+            make_object_data(
+                "drc:oio",
+                **{"drc:oio__informatieobject": "https://drc.nl/api/v1/documenten/1"},
+            )
+        )
+        gebruiksrechten = Gebruiksrechten(
+            make_object_data(
+                "drc:gebruiksrechten",
+                **{
+                    "drc:gebruiksrechten__informatieobject": (
+                        "https://drc.nl/api/v1/documenten/1"
+                    )
+                },
+            ),
+            partial=True,
+        )
+        related_data_folder = Mock(objectId="folder-1")
+        related_data_folder.get_children_content_objects.return_value = [
+            gebruiksrechten
+        ]
+        self.request.side_effect = CmisRuntimeException(
+            500, "", "notSupported: IN_FOLDER", 500
+        )
+
+        self.assertEqual(oio._get_gebruiksrechten(related_data_folder), gebruiksrechten)
+        self.assertFalse(oio.client.supports_operation("query_in_folder"))
+
+        # The query is not tried again
+        self.request.reset_mock()
+        oio._get_gebruiksrechten(related_data_folder)
+
+        self.request.assert_not_called()
+        related_data_folder.get_children_content_objects.assert_called_with(
+            Gebruiksrechten, properties=["drc:gebruiksrechten__informatieobject"]
+        )
+
+    def test_reorganise_files_without_related_document(self):
+        oio = ObjectInformatieObject(make_object_data("drc:oio"))
+        oio.get_parent_folders = Mock(return_value=[Mock()])
+        oio._get_related_document = Mock(return_value=None)
+        oio._get_gebruiksrechten = Mock()
+
+        oio._reorganise_files()
+
+        oio._get_gebruiksrechten.assert_not_called()
+        self.request.assert_not_called()
@@ -10,8 +10,13 @@ from django.utils import timezone
 
 from freezegun import freeze_time
 
+from drc_cmis.client import CMISClient
 from drc_cmis.models import CMISConfig, UrlMapping
-from drc_cmis.utils.exceptions import DocumentDoesNotExistError, FolderDoesNotExistError
+from drc_cmis.utils.exceptions import (
+    CmisNotSupportedException,
+    DocumentDoesNotExistError,
+    FolderDoesNotExistError,
+)
 from drc_cmis.webservice.utils import URLTooLongException
 
 from .mixins import DMSMixin
@@ -691,6 +696,57 @@ class CMISDocumentTests(DMSMixin, TestCase):
         self.assertEqual(all_versions[3].versionLabel, "1.0")
 
     @tag("alfresco")
+    def test_get_latest_version_resolved_by_id(self):
+        document = self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            data={"titel": "detailed summary"},
+            content=io.BytesIO(b"some file content"),
+            bronorganisatie="159351741",
+        )
+
+        with patch.object(
+            type(document), "_query_latest_version", autospec=True
+        ) as mock_query:
+            latest_version = document.get_latest_version()
+            self.assertEqual(latest_version.uuid, document.uuid)
+            self.assertFalse(latest_version.isVersionSeriesCheckedOut)
+
+            document.checkout()
+
+            pwc = document.get_latest_version()
+            self.assertEqual(pwc.versionLabel, "pwc")
+            self.assertEqual(document.get_private_working_copy().objectId, pwc.objectId)
+
+            document.delete_object()
+
+        mock_query.assert_not_called()
+        with self.assertRaises(DocumentDoesNotExistError):
+            document.get_latest_version()
+
+    def test_get_latest_version_not_supported(self):
+        document = self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            data={"titel": "detailed summary"},
+            content=io.BytesIO(b"some file content"),
+            bronorganisatie="159351741",
+        )
+        document.checkout()
+        self.addCleanup(CMISClient._unsupported_operations.clear)
+
+        with patch.object(
+            type(self.cmis_client),
+            "get_object_of_latest_version",
+            side_effect=CmisNotSupportedException(
+                status=405, url="", message="", code="notSupported"
+            ),
+        ):
+            pwc = document.get_latest_version()
+
+        self.assertEqual(pwc.versionLabel, "pwc")
+        self.assertFalse(
+            self.cmis_client.supports_operation("getObjectOfLatestVersion")
+        )
+
     def test_delete_document_with_pwc(self):
         identification = str(uuid.uuid4())
         data = {
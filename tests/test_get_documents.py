@@ -0,0 +1,216 @@
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from drc_cmis.browser.drc_document import Document
+from drc_cmis.client import CMISClient, QueryPage
+from drc_cmis.models import DocumentIndexEntry
+from drc_cmis.utils.exceptions import (
+    CmisInvalidArgumentException,
+    CmisNotSupportedException,
+    DocumentDoesNotExistError,
+)
+
+
+def make_document(
+    drc_uuid: str, version_label: str = "1.0", checked_out: bool = False
+) -> Document:
+    return Document(
+        {
+            "properties": {
+                "cmis:objectId": {"value": f"{drc_uuid};{version_label}"},
+                "cmis:versionLabel": {"value": version_label},
+                "cmis:isVersionSeriesCheckedOut": {"value": checked_out},
+                "drc:document__uuid": {"value": drc_uuid},
+            }
+        }
+    )
+
+
+@override_settings(CMIS_GET_DOCUMENTS_CHUNK_SIZE=2)
+class GetDocumentsTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = CMISClient()
+        self.client.document_type = Document
+        self.client.base_url = f"http://dms.example.com/{self.id()}"
+        self.client._get_known_document = Mock(return_value=None)
+        self.client._remember_document = Mock()
+
+    def test_documents_are_queried_in_chunks(self):
+        def query_page(return_type, statement, **kwargs):
+            results = [make_document("uuid-1"), make_document("uuid-1", "pwc")]
+            if "uuid-3" in statement:
+                results = [make_document("uuid-3")]
+            return QueryPage(results=results, has_more_items=False)
+
+        self.client._query_page = Mock(side_effect=query_page)
+
+        documents = self.client.get_documents(["uuid-1", "uuid-2", "uuid-3", "uuid-1"])
+
+        self.assertEqual(self.client._query_page.call_count, 2)
+        first_statement = self.client._query_page.call_args_list[0][0][1]
+        self.assertEqual(
+            first_statement,
+            "SELECT * FROM drc:document "
+            "WHERE drc:document__uuid IN ('uuid-1', 'uuid-2')",
+        )
+        self.assertEqual(set(documents), {"uuid-1", "uuid-3"})
+        self.assertEqual(documents["uuid-1"].versionLabel, "pwc")
+
+    def test_fallback_without_in_queries(self):
+        self.client._query_page = Mock(
+            side_effect=CmisNotSupportedException(405, "", "not supported", 405)
+        )
+        self.client.get_document = Mock(
+            side_effect=[make_document("uuid-1"), DocumentDoesNotExistError("missing")]
+        )
+
+        documents = self.client.get_documents(["uuid-1", "uuid-2"])
+
+        self.assertEqual(set(documents), {"uuid-1"})
+        self.assertFalse(self.client.supports_operation("query_in"))
+
+    def test_invalid_in_query_does_not_disable_in_queries(self):
+        self.client._query_page = Mock(
+            side_effect=CmisInvalidArgumentException(400, "", "invalid query", 400)
+        )
+        self.client.get_document = Mock(return_value=make_document("uuid-1"))
+
+        documents = self.client.get_documents(["uuid-1"])
+
+        self.assertEqual(set(documents), {"uuid-1"})
+        self.assertTrue(self.client.supports_operation("query_in"))
+
+    @override_settings(CMIS_UNSUPPORTED_OPERATION_TIMEOUT=60)
+    def test_unsupported_operations_are_tried_again_later(self):
+        with patch("drc_cmis.client.time.monotonic", return_value=1000):
+            self.client.mark_operation_unsupported("query_in")
+            self.assertFalse(self.client.supports_operation("query_in"))
+
+        with patch("drc_cmis.client.time.monotonic", return_value=1060):
+            self.assertTrue(self.client.supports_operation("query_in"))
+
+
+class GetDocumentsForZaakTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = CMISClient()
+        self.client.document_type = Document
+        self.client.base_url = f"http://dms.example.com/{self.id()}"
+        self.client._remember_document = Mock()
+        self.zaak_folder = Mock(objectId="zaak-folder-id")
+        self.client.query = Mock(return_value=[self.zaak_folder])
+
+    def test_documents_are_queried_in_the_zaak_folder_tree(self):
+        self.client._query_page = Mock(
+            return_value=QueryPage(
+                results=[
+                    make_document("uuid-1"),
+                    make_document("uuid-2", "pwc", checked_out=True),
+                    make_document("uuid-2", checked_out=True),
+                ],
+                has_more_items=False,
+            )
+        )
+
+        documents = list(self.client.get_documents_for_zaak("https://zaken.nl/zaak/1"))
+
+        statement = self.client._query_page.call_args[0][1]
+        self.assertEqual(
+            statement, "SELECT * FROM drc:document WHERE IN_TREE('zaak-folder-id')"
+        )
+        self.assertEqual(
+            [(document.uuid, document.versionLabel) for document in documents],
+            [("uuid-1", "1.0"), ("uuid-2", "pwc")],
+        )
+
+    def test_fallback_without_in_tree_queries(self):
+        self.client._query_page = Mock(
+            side_effect=CmisNotSupportedException(405, "", "not supported", 405)
+        )
+        self.zaak_folder.get_children_documents.return_value = [make_document("uuid-1")]
+
+        documents = list(self.client.get_documents_for_zaak("https://zaken.nl/zaak/1"))
+
+        self.assertEqual([document.uuid for document in documents], ["uuid-1"])
+        self.assertFalse(self.client.supports_operation("query_in_tree"))
+
+    def test_unknown_zaak(self):
+        self.client.query.return_value = []
+
+        self.assertEqual(
+            list(self.client.get_documents_for_zaak("https://zaken.nl/1")), []
+        )
+
+    def test_pages_are_requested_lazily(self):
+        self.client._query_page = Mock(
+            side_effect=[
+                QueryPage(
+                    results=[
+                        make_document("uuid-1", checked_out=True),
+                        make_document("uuid-2"),
+                    ],
+                    has_more_items=True,
+                ),
+                QueryPage(
+                    results=[make_document("uuid-1", "pwc", checked_out=True)],
+                    has_more_items=False,
+                ),
+            ]
+        )
+
+        documents = self.client.get_documents_for_zaak(
+            "https://zaken.nl/zaak/1", page_size=2
+        )
+
+        self.client._query_page.assert_not_called()
+        self.assertEqual(next(documents).uuid, "uuid-2")
+        self.client._query_page.assert_called_once()
+        # The private working copy on the next page is preferred
+        self.assertEqual(
+            [(document.uuid, document.versionLabel) for document in documents],
+            [("uuid-1", "pwc")],
+        )
+        self.assertEqual(self.client._query_page.call_args[1]["skip_count"], 2)
+
+
+@override_settings(CMIS_DOCUMENT_INDEX_ENABLED=True)
+class DocumentIndexTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = CMISClient()
+        self.client.document_type = Document
+        self.client.base_url = f"http://dms.example.com/{self.id()}"
+
+    def _make_document(self, version_series_id: str) -> Document:
+        document = make_document("uuid-1")
+        document.properties.update(
+            {
+                "cmis:versionSeriesId": {"value": version_series_id},
+                "cmis:isVersionSeriesCheckedOut": {"value": False},
+            }
+        )
+        return document
+
+    def test_index_hits_are_not_written(self):
+        DocumentIndexEntry.objects.create(uuid="uuid-1", version_series_id="series-1")
+        document = self._make_document("series-1")
+        self.client.get_object_of_latest_version = Mock(return_value=document)
+
+        # Only the lookup of the entry
+        with self.assertNumQueries(1):
+            self.assertIs(self.client._get_known_document("uuid-1"), document)
+
+    def test_queried_documents_heal_the_index(self):
+        DocumentIndexEntry.objects.create(uuid="uuid-1", version_series_id="series-1")
+        document = self._make_document("series-2")
+
+        self.client._remember_document(document, "uuid-1")
+
+        entry = DocumentIndexEntry.objects.get(uuid="uuid-1")
+        self.assertEqual(entry.version_series_id, "series-2")
+
+        # The entry is up to date, so it is only checked
+        with self.assertNumQueries(1):
+            self.client._remember_document(document, "uuid-1")
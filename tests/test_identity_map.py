@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+from drc_cmis.browser.request import Request
+from drc_cmis.identity_map import (
+    add_to_identity_map,
+    get_from_identity_map,
+    use_identity_map,
+)
+
+
+def _make_document(object_id: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        properties={
+            "cmis:objectId": {"value": object_id},
+            "drc:document__uuid": {"value": "some-uuid"},
+        }
+    )
+
+
+def test_no_wrapped_block():
+    document = _make_document("some-id")
+
+    add_to_identity_map(document, drc_uuid="some-uuid")
+
+    assert get_from_identity_map("objectId", "some-id") is None
+    assert get_from_identity_map("uuid", "some-uuid") is None
+
+
+def test_nested_blocks():
+    document = _make_document("some-id")
+
+    with use_identity_map():
+        with use_identity_map():
+            add_to_identity_map(document, drc_uuid="some-uuid")
+
+        assert get_from_identity_map("objectId", "some-id") is document
+        assert get_from_identity_map("uuid", "some-uuid") is document
+
+    with use_identity_map():
+        assert get_from_identity_map("objectId", "some-id") is None
+
+
+def test_only_remembered_by_uuid_if_given():
+    document = _make_document("some-id")
+
+    with use_identity_map():
+        add_to_identity_map(document)
+
+        assert get_from_identity_map("objectId", "some-id") is document
+        assert get_from_identity_map("uuid", "some-uuid") is None
+
+
+def test_cleared_by_write_operations(requests_mock):
+    requests_mock.post(
+        "https://example.com",
+        json={},
+        headers={"Content-Type": "application/json"},
+    )
+    request = Request()
+    document = _make_document("some-id")
+
+    @use_identity_map
+    def do_calls():
+        add_to_identity_map(document)
+
+        request.post_request(
+            "https://example.com",
+            {"cmisaction": "query", "statement": "SELECT * FROM drc:document"},
+            "user",
+            "password",
+        )
+        assert get_from_identity_map("objectId", "some-id") is document
+
+        request.post_request(
+            "https://example.com",
+            {"cmisaction": "update", "objectId": "some-id"},
+            "user",
+            "password",
+        )
+        assert get_from_identity_map("objectId", "some-id") is None
+
+    do_calls()
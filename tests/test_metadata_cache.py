@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from drc_cmis.browser.drc_document import Document
+from drc_cmis.client import CMISClient
+from drc_cmis.identity_map import use_identity_map
+from drc_cmis.metadata_cache import (
+    cache_document_properties,
+    get_cached_document_properties,
+    invalidate_document_properties,
+)
+
+
+def _make_document(**extra_properties) -> SimpleNamespace:
+    properties = {
+        "cmis:objectId": "some-id;1.0",
+        "cmis:versionLabel": "1.0",
+        "cmis:changeToken": "1",
+        "cmis:isVersionSeriesCheckedOut": False,
+        "drc:document__uuid": "some-uuid",
+        **extra_properties,
+    }
+    return SimpleNamespace(
+        properties={name: {"value": value} for name, value in properties.items()}
+    )
+
+
+@override_settings(CMIS_METADATA_CACHE_ENABLED=True)
+class MetadataCacheTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_cache_properties(self):
+        cache_document_properties(_make_document(), "some-uuid")
+
+        properties = get_cached_document_properties("some-uuid")
+
+        self.assertEqual(properties["cmis:objectId"], {"value": "some-id;1.0"})
+        self.assertEqual(properties["cmis:versionLabel"], {"value": "1.0"})
+
+    def test_checked_out_documents_are_not_cached(self):
+        cache_document_properties(
+            _make_document(**{"cmis:isVersionSeriesCheckedOut": True}), "some-uuid"
+        )
+        cache_document_properties(
+            _make_document(**{"cmis:versionLabel": "pwc"}), "other-uuid"
+        )
+
+        self.assertIsNone(get_cached_document_properties("some-uuid"))
+        self.assertIsNone(get_cached_document_properties("other-uuid"))
+
+    def test_invalidate(self):
+        cache_document_properties(_make_document(), "some-uuid")
+
+        invalidate_document_properties("some-uuid")
+
+        self.assertIsNone(get_cached_document_properties("some-uuid"))
+
+    @override_settings(CMIS_METADATA_CACHE_ENABLED=False)
+    def test_disabled(self):
+        cache_document_properties(_make_document(), "some-uuid")
+
+        self.assertIsNone(get_cached_document_properties("some-uuid"))
+        self.assertIsNone(cache.get("drc_cmis:metadata:some-uuid"))
+
+
+@override_settings(CMIS_METADATA_CACHE_ENABLED=True)
+class KnownDocumentTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = CMISClient()
+        self.client.document_type = Document
+        self.client.base_url = f"http://dms.example.com/{self.id()}"
+        cache_document_properties(
+            _make_document(**{"cmis:versionSeriesId": "some-id"}), "some-uuid"
+        )
+
+    def test_hits_are_not_written_back(self):
+        with use_identity_map():
+            with patch("drc_cmis.client.cache_document_properties") as cache_mock:
+                first = self.client._get_known_document("some-uuid")
+                second = self.client._get_known_document("some-uuid")
+
+        self.assertIs(first, second)
+        cache_mock.assert_not_called()
+
+    def test_cache_is_not_validated_by_default(self):
+        self.client.get_object_of_latest_version = Mock()
+
+        document = self.client._get_known_document("some-uuid")
+
+        self.assertEqual(document.objectId, "some-id;1.0")
+        self.client.get_object_of_latest_version.assert_not_called()
+
+    @override_settings(CMIS_METADATA_CACHE_VALIDATE=True)
+    def test_current_version(self):
+        self.client.get_object_of_latest_version = Mock(
+            return_value=Document(_make_document().__dict__)
+        )
+
+        document = self.client._get_known_document("some-uuid")
+
+        self.assertEqual(document.objectId, "some-id;1.0")
+        self.assertEqual(
+            self.client.get_object_of_latest_version.call_args[1]["properties"],
+            ["cmis:changeToken", "cmis:isVersionSeriesCheckedOut"],
+        )
+
+    @override_settings(CMIS_METADATA_CACHE_VALIDATE=True)
+    def test_changed_version(self):
+        self.client.get_object_of_latest_version = Mock(
+            return_value=Document(_make_document(**{"cmis:changeToken": "2"}).__dict__)
+        )
+
+        self.assertIsNone(self.client._get_known_document("some-uuid"))
+        self.assertIsNone(get_cached_document_properties("some-uuid"))
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from drc_cmis.query_cache import (
+    cache_query_results,
+    get_cached_query_results,
+    invalidate_queries,
+)
+
+STATEMENT = "SELECT * FROM drc:oio WHERE drc:oio__informatieobject = 'some-url'"
+
+
+def _make_object(object_id: str) -> SimpleNamespace:
+    return SimpleNamespace(properties={"cmis:objectId": {"value": object_id}})
+
+
+@override_settings(CMIS_QUERY_CACHE_TIMEOUTS={"oio": 30, "gebruiksrechten": 30})
+class QueryCacheTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_cache_results(self):
+        cache_query_results("oio", STATEMENT, [_make_object("1"), _make_object("2")])
+
+        results = get_cached_query_results("oio", STATEMENT)
+
+        self.assertEqual(
+            results,
+            [{"cmis:objectId": {"value": "1"}}, {"cmis:objectId": {"value": "2"}}],
+        )
+
+    def test_statement_is_normalized(self):
+        cache_query_results("oio", STATEMENT, [])
+
+        results = get_cached_query_results("oio", f"  {STATEMENT.replace(' ', '  ')}")
+
+        self.assertEqual(results, [])
+
+    def test_type_without_timeout_is_not_cached(self):
+        statement = "SELECT * FROM drc:zaakfolder"
+        cache_query_results("zaak", statement, [_make_object("1")])
+
+        self.assertIsNone(get_cached_query_results("zaak", statement))
+
+    def test_invalidate_type(self):
+        statement = "SELECT * FROM drc:gebruiksrechten"
+        cache_query_results("oio", STATEMENT, [])
+        cache_query_results("gebruiksrechten", statement, [])
+
+        invalidate_queries("oio")
+
+        self.assertIsNone(get_cached_query_results("oio", STATEMENT))
+        self.assertEqual(get_cached_query_results("gebruiksrechten", statement), [])
+
+    def test_invalidate_all_types(self):
+        statement = "SELECT * FROM drc:gebruiksrechten"
+        cache_query_results("oio", STATEMENT, [])
+        cache_query_results("gebruiksrechten", statement, [])
+
+        invalidate_queries()
+
+        self.assertIsNone(get_cached_query_results("oio", STATEMENT))
+        self.assertIsNone(get_cached_query_results("gebruiksrechten", statement))
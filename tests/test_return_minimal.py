@@ -0,0 +1,165 @@
+import io
+import os
+import re
+import uuid
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase
+
+from freezegun import freeze_time
+
+from drc_cmis.webservice.client import SOAPCMISClient
+from drc_cmis.webservice.drc_document import Document
+from drc_cmis.webservice.minimal import is_return_minimal, return_minimal
+
+from .mixins import DMSMixin
+
+
+def get_cmis_actions(mock_request) -> list:
+    return [
+        re.search(r"<ns:(\w+)>", call.kwargs["soap_envelope"]).group(1)
+        for call in mock_request.call_args_list
+    ]
+
+
+def test_nested_blocks():
+    assert not is_return_minimal()
+
+    with return_minimal():
+        with return_minimal():
+            assert is_return_minimal()
+        assert is_return_minimal()
+
+    assert not is_return_minimal()
+
+
+def test_decorator():
+    @return_minimal
+    def do_calls():
+        return is_return_minimal()
+
+    assert do_calls()
+    assert not is_return_minimal()
+
+
+@skipIf(
+    os.getenv("CMIS_BINDING") != "WEBSERVICE",
+    "The return-minimal mode only applies to the webservice binding",
+)
+@freeze_time("2020-07-27 12:00:00")
+class ReturnMinimalTests(DMSMixin, TestCase):
+    def _create_document(self):
+        return self.cmis_client.create_document(
+            identification=str(uuid.uuid4()),
+            bronorganisatie="159351741",
+            data={
+                "titel": "detailed summary",
+                "bestandsnaam": "dummy.txt",
+                "versie": 1,
+            },
+            content=io.BytesIO(b"some file content"),
+        )
+
+    def test_create_document(self):
+        self.cmis_client.get_or_create_other_folder()
+
+        with patch.object(
+            SOAPCMISClient,
+            "request",
+            autospec=True,
+            side_effect=SOAPCMISClient.request,
+        ) as mock_request:
+            with return_minimal():
+                document = self._create_document()
+
+        self.assertNotIn("getObject", get_cmis_actions(mock_request))
+        self.assertEqual(document.titel, "detailed summary")
+        self.assertEqual(document.versie, 1)
+
+    def test_unknown_property_is_fetched_lazily(self):
+        with return_minimal():
+            document = self._create_document()
+
+        with patch.object(
+            SOAPCMISClient,
+            "request",
+            autospec=True,
+            side_effect=SOAPCMISClient.request,
+        ) as mock_request:
+            # Known locally
+            self.assertEqual(document.bestandsnaam, "dummy.txt")
+            self.assertEqual(mock_request.call_count, 0)
+
+            # Only known by the DMS
+            self.assertEqual(document.contentStreamLength, len("some file content"))
+            self.assertEqual(get_cmis_actions(mock_request), ["getObject"])
+
+            # The object now holds all the properties
+            self.assertIsNotNone(document.versionSeriesId)
+            self.assertEqual(mock_request.call_count, 1)
+
+    def test_update_properties(self):
+        document = self._create_document()
+        pwc = document.checkout()
+
+        with patch.object(
+            SOAPCMISClient,
+            "request",
+            autospec=True,
+            side_effect=SOAPCMISClient.request,
+        ) as mock_request:
+            with return_minimal():
+                updated_pwc = pwc.update_properties(
+                    self.cmis_client.document_type.build_properties(
+                        {"titel": "updated title"}, new=False
+                    )
+                )
+
+        self.assertEqual(get_cmis_actions(mock_request), ["updateProperties"])
+        self.assertEqual(updated_pwc.titel, "updated title")
+        self.assertEqual(updated_pwc.bestandsnaam, "dummy.txt")
+
+
+class DocumentUpdateTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        for name, value in [
+            ("user", "user"),
+            ("password", "password"),
+            ("main_repo_id", "repo-1"),
+        ]:
+            patcher = patch.object(SOAPCMISClient, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = patch.object(SOAPCMISClient, "request", return_value="<xml/>")
+        self.request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for name in ["extract_xml_from_soap", "pretty_xml"]:
+            patcher = patch(
+                f"drc_cmis.webservice.drc_document.{name}", side_effect=lambda xml: xml
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_properties_are_updated_on_the_new_object_id(self):
+        document = Document({"properties": {"cmis:objectId": {"value": "doc;1.0"}}})
+        properties = {
+            "drc:document__titel": {"value": "new title", "type": "propertyString"}
+        }
+
+        with patch.object(
+            Document, "set_content_stream", return_value="doc;1.1"
+        ), patch(
+            "drc_cmis.webservice.drc_document.extract_object_properties_from_xml",
+            return_value=[{"properties": {"objectId": {"value": "doc;1.2"}}}],
+        ):
+            updated = document.update(properties, content=io.BytesIO(b"content"))
+
+        envelope = self.request.call_args[1]["soap_envelope"]
+        self.assertIn("updateProperties", envelope)
+        self.assertIn("objectId>doc;1.1<", envelope)
+        self.assertEqual(updated.objectId, "doc;1.2")
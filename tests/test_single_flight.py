@@ -0,0 +1,88 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+from django.test import SimpleTestCase, override_settings
+
+from drc_cmis.single_flight import coalesce, make_key, register_write
+
+
+class SingleFlightTests(SimpleTestCase):
+    def _run_concurrently(self, func, num_threads=5):
+        """Call ``coalesce`` from several threads while ``func`` is in flight"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_func():
+            started.set()
+            release.wait(timeout=5)
+            return func()
+
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            leader = executor.submit(coalesce, "some-key", blocking_func)
+            started.wait(timeout=5)
+            waiters = [
+                executor.submit(coalesce, "some-key", blocking_func)
+                for _ in range(num_threads - 1)
+            ]
+            # Give the waiters the time to join the call in flight
+            threading.Event().wait(0.1)
+            release.set()
+
+        return [leader] + waiters
+
+    def test_identical_calls_are_coalesced(self):
+        func = Mock(return_value="some result")
+
+        futures = self._run_concurrently(func)
+
+        func.assert_called_once()
+        self.assertEqual([future.result() for future in futures], ["some result"] * 5)
+
+    def test_exceptions_are_fanned_out(self):
+        func = Mock(side_effect=ValueError("some error"))
+
+        futures = self._run_concurrently(func)
+
+        func.assert_called_once()
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result()
+
+    def test_calls_after_a_write_are_not_coalesced(self):
+        release = threading.Event()
+        func = Mock(return_value="some result")
+
+        def blocking_func():
+            release.wait(timeout=5)
+            return func()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(coalesce, "some-key", blocking_func)
+            threading.Event().wait(0.1)
+            register_write()
+            second = executor.submit(coalesce, "some-key", blocking_func)
+            release.set()
+
+        self.assertEqual(first.result(), "some result")
+        self.assertEqual(second.result(), "some result")
+        self.assertEqual(func.call_count, 2)
+
+    def test_keys_do_not_contain_the_credentials(self):
+        key = make_key("GET", "http://dms.example.com", "user", "secret-password")
+
+        self.assertNotIn("secret-password", key)
+        self.assertEqual(
+            key, make_key("GET", "http://dms.example.com", "user", "secret-password")
+        )
+        self.assertNotEqual(
+            key, make_key("GET", "http://dms.example.com", "user", "other-password")
+        )
+
+    @override_settings(CMIS_SINGLE_FLIGHT_ENABLED=False)
+    def test_disabled(self):
+        func = Mock(return_value="some result")
+
+        self._run_concurrently(func)
+
+        self.assertEqual(func.call_count, 5)
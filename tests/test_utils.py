@@ -1,16 +1,37 @@
+import datetime
 import os
 import re
 import uuid
+from decimal import Decimal
 from unittest import skipIf
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
+
+import pytz
 
 from drc_cmis.models import CMISConfig, UrlMapping
+from drc_cmis.utils.query import (
+    Comparison,
+    In,
+    InTree,
+    IsNull,
+    Or,
+    Query,
+    build_property_filter,
+    build_select_list,
+    compile_query,
+    format_literal,
+    parse_conditions,
+)
+from drc_cmis.utils.utils import property_values_equal
 from drc_cmis.webservice.drc_document import Document
 from drc_cmis.webservice.utils import (
     NoURLMappingException,
     expand_url,
     extract_content,
+    extract_failed_to_delete,
+    extract_has_more_items,
+    extract_num_items,
     extract_repository_ids_from_xml,
     make_soap_envelope,
     shrink_url,
@@ -47,6 +68,74 @@ class WebserviceUtilsTests(TestCase):
             all_repositories_ids[0], "5341cc88-b2f6-4476-aff3-4add269dcb09"
         )
 
+    def test_extract_has_more_items(self):
+        alfresco_soap_envelope = '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body><queryResponse xmlns="http://docs.oasis-open.org/ns/cmis/messaging/200908/" xmlns:ns2="http://docs.oasis-open.org/ns/cmis/core/200908/"><objects><ns2:hasMoreItems>true</ns2:hasMoreItems><ns2:numItems>3</ns2:numItems></objects></queryResponse></soap:Body></soap:Envelope>'
+
+        self.assertTrue(extract_has_more_items(alfresco_soap_envelope))
+        self.assertFalse(
+            extract_has_more_items(alfresco_soap_envelope.replace("true", "false"))
+        )
+
+    def test_extract_num_items(self):
+        alfresco_soap_envelope = '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body><queryResponse xmlns="http://docs.oasis-open.org/ns/cmis/messaging/200908/" xmlns:ns2="http://docs.oasis-open.org/ns/cmis/core/200908/"><objects><ns2:hasMoreItems>true</ns2:hasMoreItems><ns2:numItems>3</ns2:numItems></objects></queryResponse></soap:Body></soap:Envelope>'
+
+        self.assertEqual(extract_num_items(alfresco_soap_envelope), 3)
+        self.assertIsNone(
+            extract_num_items(
+                alfresco_soap_envelope.replace("<ns2:numItems>3</ns2:numItems>", "")
+            )
+        )
+
+    def test_extract_failed_to_delete(self):
+        soap_envelope = '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body><deleteTreeResponse xmlns="http://docs.oasis-open.org/ns/cmis/messaging/200908/"><failedToDelete><objectIds>object-1</objectIds><objectIds>object-2</objectIds></failedToDelete></deleteTreeResponse></soap:Body></soap:Envelope>'
+
+        self.assertEqual(
+            extract_failed_to_delete(soap_envelope), ["object-1", "object-2"]
+        )
+        self.assertEqual(
+            extract_failed_to_delete(
+                soap_envelope.replace("<objectIds>object-1</objectIds>", "").replace(
+                    "<objectIds>object-2</objectIds>", ""
+                )
+            ),
+            [],
+        )
+
+    def test_make_query_envelope_with_paging(self):
+        soap_envelope = make_soap_envelope(
+            auth=("user", "password"),
+            repository_id="some-repo-id",
+            statement="SELECT * FROM drc:document",
+            cmis_action="query",
+            max_items=10,
+            skip_count=20,
+        ).toxml()
+
+        self.assertIn(
+            "<ns:statement>SELECT * FROM drc:document</ns:statement>"
+            "<ns:maxItems>10</ns:maxItems><ns:skipCount>20</ns:skipCount>",
+            soap_envelope,
+        )
+
+    def test_make_get_object_envelope_with_filter(self):
+        soap_envelope = make_soap_envelope(
+            auth=("user", "password"),
+            repository_id="some-repo-id",
+            object_id="some-object-id",
+            cmis_action="getObject",
+            property_filter="cmis:objectId,cmis:name",
+            include_allowable_actions="false",
+            include_relationships="none",
+        ).toxml()
+
+        self.assertIn(
+            "<ns:objectId>some-object-id</ns:objectId>"
+            "<ns:filter>cmis:objectId,cmis:name</ns:filter>"
+            "<ns:includeAllowableActions>false</ns:includeAllowableActions>"
+            "<ns:includeRelationships>none</ns:includeRelationships>",
+            soap_envelope,
+        )
+
 
 @skipIf(
     os.getenv("CMIS_BINDING") != "WEBSERVICE",
@@ -196,3 +285,153 @@ class WebserviceContentTests(DMSMixin, TestCase):
         self.assertIn(
             "<ns:mimeType>application/octet-stream</ns:mimeType>", soap_envelope.toxml()
         )
+
+
+class QueryUtilsTests(SimpleTestCase):
+    def test_build_select_list(self):
+        self.assertEqual(build_select_list(), "*")
+        self.assertEqual(
+            build_select_list(["drc:document__uuid", "cmis:objectId"]),
+            "cmis:objectId, cmis:objectTypeId, drc:document__uuid",
+        )
+
+    def test_build_property_filter(self):
+        self.assertIsNone(build_property_filter())
+        self.assertEqual(
+            build_property_filter(["drc:kopie_van"]),
+            "cmis:objectId,cmis:objectTypeId,drc:kopie_van",
+        )
+
+    def test_format_literal(self):
+        cases = [
+            ("it's", "'it\\'s'"),
+            (
+                uuid.UUID("d06f86e0-1c3a-49cf-b5cd-01c079cf8147"),
+                "'d06f86e0-1c3a-49cf-b5cd-01c079cf8147'",
+            ),
+            (True, "true"),
+            (17, "17"),
+            (Decimal("1.5"), "1.5"),
+            (
+                datetime.datetime(
+                    2020, 7, 27, 14, 0, tzinfo=pytz.timezone("Etc/GMT-2")
+                ),
+                "TIMESTAMP '2020-07-27T12:00:00.000Z'",
+            ),
+            (datetime.date(2020, 7, 27), "TIMESTAMP '2020-07-27T00:00:00.000Z'"),
+        ]
+        for value, literal in cases:
+            with self.subTest(value=value):
+                self.assertEqual(format_literal(value), literal)
+
+    def test_query_statement(self):
+        query = Query(
+            "drc:document",
+            where=[
+                Comparison("drc:document__titel", "it's"),
+                In("drc:document__uuid", ["uuid-1", "uuid-2"]),
+                Or(IsNull("drc:kopie_van"), InTree("folder-id")),
+            ],
+            properties=["drc:document__uuid"],
+            order_by=["cmis:creationDate DESC"],
+        )
+
+        self.assertEqual(
+            query.get_statement(),
+            "SELECT cmis:objectId, cmis:objectTypeId, drc:document__uuid "
+            "FROM drc:document WHERE drc:document__titel = 'it\\'s' "
+            "AND drc:document__uuid IN ('uuid-1', 'uuid-2') "
+            "AND (drc:kopie_van IS NULL OR IN_TREE('folder-id')) "
+            "ORDER BY cmis:creationDate DESC",
+        )
+
+    def test_statement_shape_is_compiled_once(self):
+        compile_query.cache_clear()
+
+        for value in ["first", "second", "third"]:
+            Query(
+                "drc:document", [Comparison("drc:document__titel", value)]
+            ).get_statement()
+
+        self.assertEqual(compile_query.cache_info().misses, 1)
+        self.assertEqual(compile_query.cache_info().hits, 2)
+
+    def test_parse_conditions(self):
+        where = parse_conditions(
+            lhs=["drc:zaak__url = '%s'", "(cmis:name = '%s' OR cmis:name = '%s')"],
+            rhs=["https://zaken.nl/zaak/1", "a", "b"],
+        )
+
+        self.assertEqual(
+            Query("drc:zaakfolder", where).get_statement(),
+            "SELECT * FROM drc:zaakfolder WHERE drc:zaak__url = 'https://zaken.nl/zaak/1' "
+            "AND (cmis:name = 'a' OR cmis:name = 'b')",
+        )
+
+    def test_map_values(self):
+        query = Query("drc:oio", [Comparison("drc:oio__zaak", "https://long.nl/1")])
+
+        mapped_query = query.map_values(
+            lambda column, value: value.replace("long", "short")
+        )
+
+        self.assertEqual(
+            mapped_query.get_statement(),
+            "SELECT * FROM drc:oio WHERE drc:oio__zaak = 'https://short.nl/1'",
+        )
+
+
+class PropertyValuesEqualTests(SimpleTestCase):
+    def test_equal_values(self):
+        amsterdam = pytz.timezone("Europe/Amsterdam")
+        cases = [
+            ("some title", "some title"),
+            (None, ""),
+            ("", None),
+            (True, "true"),
+            (False, "False"),
+            (17, "17"),
+            (17, 17),
+            (1.5, Decimal("1.5")),
+            (
+                datetime.datetime(2020, 7, 27, 12, 0, tzinfo=pytz.utc),
+                "2020-07-27T12:00:00.000Z",
+            ),
+            (
+                amsterdam.localize(datetime.datetime(2020, 7, 27, 14, 0)),
+                datetime.datetime(2020, 7, 27, 12, 0, tzinfo=pytz.utc),
+            ),
+            (
+                datetime.datetime(2020, 7, 27, 0, 0, tzinfo=pytz.utc),
+                datetime.date(2020, 7, 27),
+            ),
+            (
+                datetime.datetime(2020, 7, 27, 0, 0, tzinfo=pytz.utc),
+                "2020-07-27T00:00:00.000Z",
+            ),
+        ]
+
+        for current, new in cases:
+            with self.subTest(current=current, new=new):
+                self.assertTrue(property_values_equal(current, new))
+
+    def test_different_values(self):
+        cases = [
+            ("some title", "other title"),
+            ("some title", None),
+            (None, "some title"),
+            (True, "false"),
+            (17, "18"),
+            (
+                datetime.datetime(2020, 7, 27, 12, 0, tzinfo=pytz.utc),
+                "2020-07-27T13:00:00.000Z",
+            ),
+            (
+                datetime.datetime(2020, 7, 27, 0, 0, tzinfo=pytz.utc),
+                datetime.date(2020, 7, 28),
+            ),
+        ]
+
+        for current, new in cases:
+            with self.subTest(current=current, new=new):
+                self.assertFalse(property_values_equal(current, new))